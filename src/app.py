@@ -1,12 +1,23 @@
+from dotenv import load_dotenv
+
+# load environment variables from .env file (before the src modules read their settings)
+load_dotenv()
+
 import dash
 import dash_bootstrap_components as dbc
 from dash import Dash, dcc, html
-from dotenv import load_dotenv
+from flask import abort, request
 import logging
+import os
+import threading
 
 from src.callbacks.register_callbacks import register_all_callbacks
+from src.metrics.warmup import warm_page_caches_when_ready
 from src.partials import navbar, footer
-from src.services.db_service import init_db
+from src.routes.export_routes import EXPORT_PATH_PREFIX
+from src.routes.register_routes import register_all_routes
+from src.services.db_service import init_db_in_background, wait_for_db
+from src.utils.background import make_background_callback_manager
 from src.utils.log_config import setup_logging
 
 # create logger
@@ -15,16 +26,27 @@ logger = logging.getLogger(__name__)
 # set up logging
 setup_logging()
 
-# load environment variables from .env file
-load_dotenv()
+# requests that query the database wait up to this long for the connection
+DB_INIT_WAIT_SECONDS = float(os.getenv("DB_INIT_WAIT_SECONDS", "15"))
 
-# initialize the database
+# precompute the current month's pages once the database is connected
+CACHE_WARMUP = os.getenv("CACHE_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# initialize the database in the background, so the server can bind immediately
 try:
-    init_db()
+    init_db_in_background()
 except Exception as e:
     logger.critical(f"Database initialization failed: Program must exit")
     raise
 
+if CACHE_WARMUP:
+    threading.Thread(
+        target=warm_page_caches_when_ready,
+        args=(DB_INIT_WAIT_SECONDS,),
+        name="cache-warmup",
+        daemon=True
+    ).start()
+
 # initialize the app
 app = Dash(
     __name__,
@@ -33,7 +55,9 @@ app = Dash(
     # use BS Flatly theme and icons
     external_stylesheets=[dbc.themes.FLATLY, dbc.icons.BOOTSTRAP],
     # suppress callback exceptions
-    suppress_callback_exceptions=True
+    suppress_callback_exceptions=True,
+    # run heavy callbacks (background=True) in subprocesses, polled by the browser
+    background_callback_manager=make_background_callback_manager()
 )
 
 # define layout 
@@ -44,6 +68,8 @@ def serve_layout():
             dcc.Loading(
                 type="default",
                 className="viewport-loader",
+                # only page navigation; cards show their own loaders while their callbacks run
+                target_components={"_pages_content": "children"},
                 children=dbc.Container(dash.page_container, className="mt-4"),
             ),
             footer
@@ -60,6 +86,18 @@ register_all_callbacks(app)
 # set server for deployment
 server = app.server
 
+# register plain Flask routes (exports)
+register_all_routes(server)
+
+# requests that query the database: Dash callbacks and exports
+DB_REQUEST_PREFIXES = (f"{app.config.requests_pathname_prefix}_dash-update-component", EXPORT_PATH_PREFIX)
+
+@server.before_request
+def wait_for_db_connection():
+    """Holds database-backed requests until the background connection is registered."""
+    if request.path.startswith(DB_REQUEST_PREFIXES) and not wait_for_db(DB_INIT_WAIT_SECONDS):
+        abort(503, description="Database connection is not ready")
+
 # run the app
 if __name__ == '__main__':
     app.run(debug=False)
\ No newline at end of file
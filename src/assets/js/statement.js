@@ -0,0 +1,24 @@
+// clientside callbacks for the restaurant statement page
+//
+// the server sends every month's table rows for the selected year once
+// (restaurant-statement-store); switching months only selects rows here.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    statement: {
+        // rows of the selected month from the year payload
+        selectMonthRows: function (month, payload) {
+            if (!payload || !payload.rows || month === null || month === undefined) {
+                return [];
+            }
+            return payload.rows[String(month)] || [];
+        },
+
+        // download links for the selected month and year
+        buildExportLinks: function (month, year, exportPaths) {
+            const query = "?month=" + month + "&year=" + year;
+            return exportPaths.map(function (path) {
+                return path + query;
+            });
+        }
+    }
+});
@@ -0,0 +1,41 @@
+# registers one independent callback per dashboard card
+#
+# each card loads only its own data path and has its own loading state and
+# error fallback, so fast cards render first and one failure only affects its card
+
+from typing import Any, Callable
+
+from dash import Input, Output
+
+from src.utils.decorators import handle_callback_errors
+
+
+def register_card_callback(
+    app,
+    output: Output,
+    data_function: Callable[[int, int], dict],
+    build_card: Callable[[dict], Any],
+    fallback_output: Any,
+) -> None:
+    """
+    Registers a callback updating one card from the selected month/year.
+
+    Args:
+        app (Dash): The Dash app.
+        output (Output): The card's output (e.g. Output("profit-card", "children")).
+        data_function (Callable[[int, int], dict]): The card's cached data path, called with (month, year).
+        build_card (Callable[[dict], Any]): Builds the card's output from the data.
+        fallback_output (Any): The output shown if loading or building the card fails.
+    """
+    def update_card(month, year):
+        data = data_function(month, year)
+        return build_card(data)
+
+    # name the callback after its card, for error logs and tracing spans
+    update_card.__name__ = f"update_{output.component_id.replace('-', '_')}"
+
+    app.callback(
+        output,
+        Input("month-dropdown", "value"),
+        Input("year-dropdown", "value"),
+    )(handle_callback_errors(fallback_outputs=fallback_output)(update_card))
@@ -1,84 +1,88 @@
 # contains callbacks related to the event page visualizations
+#
+# every card has its own callback (see card_callbacks); cards built from the
+# same metrics share one cached, coalesced computation
 
-from dash import Input, Output
+from dash import Output
 
+from src.callbacks.card_callbacks import register_card_callback
 from src.components.core.ui_helpers import make_error_card
 from src.components.events import event_page_builders
 from src.metrics.events import event_metrics
-from src.utils.decorators import handle_callback_errors
 
 # fallback outputs for error handling
-EVENT_PAGE_ERROR_FALLBACKS = (
-    make_error_card(),
-    {},
-    make_error_card(),
-    make_error_card(),
-    make_error_card(),
-    make_error_card(),
-    {},
-)
+CHART_ERROR_FALLBACK = {}
+CARD_ERROR_FALLBACK = make_error_card()
 
 def get_event_callbacks(app):
-    @app.callback(
+    """Registers one callback per Event dashboard card, updated from the selected month/year."""
+    # revenue, cost, count and average sales cards
+    register_card_callback(
+        app,
         Output("event-monthly-summary-card", "children"),
-        Output("event-ytd-bar-chart", "figure"),
-        Output("num-events-card", "children"),
-        Output("num-high-value-events-card", "children"),
-        Output("avg-event-sales-card", "children"),
-        Output("top-five-events-card", "children"),
-        Output("event-type-pie-chart", "figure"),
-        Input("month-dropdown", "value"),
-        Input("year-dropdown", "value"),
-    )
-    @handle_callback_errors(fallback_outputs=EVENT_PAGE_ERROR_FALLBACKS)
-    def update_event_page(month, year):
-        """Update all Event dashboard visual components based on selected month/year."""
-
-        # get all data
-        data = event_metrics.get_events_page_data(month, year)
-
-        # build visualizations
-        event_monthly_summary_card = event_page_builders.build_events_monthly_summary_card(
+        event_metrics.get_events_kpi_data,
+        lambda data: event_page_builders.build_events_monthly_summary_card(
             data["monthly_revenue_metrics"],
             data["py_monthly_revenue_metrics"]
-        )
-
-        events_ytd_bar_chart = event_page_builders.build_events_ytd_bar_chart(
+        ),
+        CARD_ERROR_FALLBACK,
+    )
+    register_card_callback(
+        app,
+        Output("event-ytd-bar-chart", "figure"),
+        event_metrics.get_events_kpi_data,
+        lambda data: event_page_builders.build_events_ytd_bar_chart(
             data["ytd_summary_metrics"]
-        )
-
-        num_events_card = event_page_builders.build_num_events_card(
+        ),
+        CHART_ERROR_FALLBACK,
+    )
+    register_card_callback(
+        app,
+        Output("num-events-card", "children"),
+        event_metrics.get_events_kpi_data,
+        lambda data: event_page_builders.build_num_events_card(
             data["num_events_monthly"],
             data["num_events_ytd"]
-        )
-
-        num_high_value_events_card = event_page_builders.build_num_high_value_events_card(
-            data["num_high_value_events_monthly"],
-            data["num_high_value_events_ytd"]
-        )
-
-        avg_event_sales_card = event_page_builders.build_avg_event_sales_card(
+        ),
+        CARD_ERROR_FALLBACK,
+    )
+    register_card_callback(
+        app,
+        Output("avg-event-sales-card", "children"),
+        event_metrics.get_events_kpi_data,
+        lambda data: event_page_builders.build_avg_event_sales_card(
             data["avg_event_sales_monthly"],
             data["avg_event_sales_ytd"]
-        )
+        ),
+        CARD_ERROR_FALLBACK,
+    )
 
-        top_five_events_monthly_card = event_page_builders.build_top_five_monthly_events_card(
+    # high value events, top events and sales by type
+    register_card_callback(
+        app,
+        Output("num-high-value-events-card", "children"),
+        event_metrics.get_events_high_value_counts,
+        lambda data: event_page_builders.build_num_high_value_events_card(
+            data["num_high_value_events_monthly"],
+            data["num_high_value_events_ytd"]
+        ),
+        CARD_ERROR_FALLBACK,
+    )
+    register_card_callback(
+        app,
+        Output("top-five-events-card", "children"),
+        event_metrics.get_events_top_five,
+        lambda data: event_page_builders.build_top_five_monthly_events_card(
             data["top_five_events_monthly"]
-        )
-
-        event_type_pie_chart = event_page_builders.build_event_type_pie_chart(
+        ),
+        CARD_ERROR_FALLBACK,
+    )
+    register_card_callback(
+        app,
+        Output("event-type-pie-chart", "figure"),
+        event_metrics.get_events_by_type_data,
+        lambda data: event_page_builders.build_event_type_pie_chart(
             data["events_by_type_df"]
-        )
-
-
-        return (
-            event_monthly_summary_card,
-            events_ytd_bar_chart,
-            num_events_card,
-            num_high_value_events_card,
-            avg_event_sales_card,
-            top_five_events_monthly_card,
-            event_type_pie_chart
-        )
-
-        
\ No newline at end of file
+        ),
+        CHART_ERROR_FALLBACK,
+    )
@@ -1,24 +1,68 @@
 # contains callbacks related to the restaurant statement page table
-from dash import Input, Output
+#
+# the year's rows are computed on the server once per year, as a background
+# callback (see utils/background), and stored in the browser; month switches
+# select rows with clientside callbacks (assets/js/statement.js)
+#
+# background jobs run in forked processes that exit when done, so the job
+# reconnects to the database and skips the page caches; the background
+# manager's result cache reuses its payload instead
+from dash import ClientsideFunction, Input, Output, State
 
 from src.components.core import statement_builder
 from src.metrics.restaurant import statement_metrics
+from src.services.db_service import reconnect_after_fork
 from src.utils.decorators import handle_callback_errors
 
 
 # fallback outputs for error handling
-RESTAURANT_STATEMENT_PAGE_ERROR_FALLBACKS = ([],)
+RESTAURANT_STATEMENT_PAGE_ERROR_FALLBACKS = (None,)
 
 def get_restaurant_statement_callbacks(app):
+    # a new year while a job runs replaces the job; leaving the page cancels it
     @app.callback(
-        Output("restaurant-statement-table", "data"),
-        Input("month-dropdown", "value"),
+        Output("restaurant-statement-store", "data"),
         Input("year-dropdown", "value"),
+        background=True,
+        progress=[
+            Output("restaurant-statement-progress", "value"),
+            Output("restaurant-statement-progress", "label"),
+        ],
+        running=[
+            (Output("restaurant-statement-progress", "style"), {"visibility": "visible"}, {"visibility": "hidden"}),
+        ],
+        cancel=[Input("_pages_location", "pathname")],
+        interval=500,
     )
     @handle_callback_errors(fallback_outputs=RESTAURANT_STATEMENT_PAGE_ERROR_FALLBACKS)
-    def update_restaurant_statement_page(month, year):
+    def update_restaurant_statement_store(set_progress, year):
+        reconnect_after_fork()
+
+        set_progress((10, "Loading statement"))
+        metrics_by_month = statement_metrics.get_statement_metrics_by_month(year)
+
+        set_progress((80, "Building statement"))
+        payload = statement_builder.build_statement_year_payload(metrics_by_month, year)
+
+        set_progress((100, ""))
+        return payload
+
+
+    # select the month's rows in the browser
+    app.clientside_callback(
+        ClientsideFunction(namespace="statement", function_name="selectMonthRows"),
+        Output("restaurant-statement-table", "data"),
+        Input("month-dropdown", "value"),
+        Input("restaurant-statement-store", "data"),
+    )
+
 
-        metrics = statement_metrics.get_statement_metrics(month, year)
-        rows = statement_builder.build_statement_rows(metrics)
-        
-        return rows
\ No newline at end of file
+    # point the download buttons at the exports for the selected month/year
+    app.clientside_callback(
+        ClientsideFunction(namespace="statement", function_name="buildExportLinks"),
+        Output("restaurant-statement-export-link", "href"),
+        Output("restaurant-sales-export-link", "href"),
+        Input("month-dropdown", "value"),
+        Input("year-dropdown", "value"),
+        State("restaurant-statement-export-paths", "data"),
+    )
@@ -2,12 +2,12 @@
 
 from src.metrics.metrics_helpers import compute_percentage, format_metric
 
-def build_budget_table_rows(budget_docs: list[object]) -> list[dict]:
+def build_budget_table_rows(budget_docs: list[dict]) -> list[dict]:
     """
     Builds a list of rows for the budget table based on the combined budget documents.
 
     Args:
-        budget_docs (list[object]): A list of combined budget documents for a given year.
+        budget_docs (list[dict]): A list of combined budget documents for a given year.
 
     Returns:
         list[dict]: A list of rows for the budget table.
@@ -18,16 +18,16 @@ def build_budget_table_rows(budget_docs: list[object]) -> list[dict]:
     
     # iterate through the budget documents and populate the months dictionary
     for doc in budget_docs:
-        months[doc.month] = {
-            "food_sales": doc.food_sales,
-            "bev_sales": doc.bev_sales,
-            "event_sales": doc.event_sales,
-            "total_sales": doc.total_sales,
-            "food_cost": doc.food_cost,
-            "bev_cost": doc.bev_cost,
-            "event_cost": doc.event_cost,
-            "total_cost": doc.total_cost,
-            "gross_profit": doc.gross_profit
+        months[doc["month"]] = {
+            "food_sales": doc.get("food_sales", 0.0),
+            "bev_sales": doc.get("bev_sales", 0.0),
+            "event_sales": doc.get("event_sales", 0.0),
+            "total_sales": doc.get("total_sales", 0.0),
+            "food_cost": doc.get("food_cost", 0.0),
+            "bev_cost": doc.get("bev_cost", 0.0),
+            "event_cost": doc.get("event_cost", 0.0),
+            "total_cost": doc.get("total_cost", 0.0),
+            "gross_profit": doc.get("gross_profit", 0.0)
         }
     
     # helper function to build a row in the table
@@ -8,6 +8,19 @@ from src.metrics.metrics_helpers import format_metric
 
 
 
+def make_card_loader(component) -> dcc.Loading:
+    """
+    Wraps a card (or chart) in its own loading indicator, shown only while the card's callback runs.
+
+    Args:
+        component (Component): The card or chart updated by a callback.
+
+    Returns:
+        dcc.Loading: The component wrapped in a dcc.Loading.
+    """
+    return dcc.Loading(component, type="circle", delay_show=150)
+
+
 def make_chart_card(title: str, chart: dcc.Graph, footer: str = None) -> dbc.Card:
     """
     Returns a dbc.Card object with the title, chart, and footer.
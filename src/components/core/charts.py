@@ -1,44 +1,184 @@
 # contains reusable chart components for the dashboard
+#
+# charts are built with plotly.graph_objects and returned as plain figure dicts:
+# - every figure shares one lightweight layout template, extracted once from
+#   plotly's default template, instead of shipping the full template each time
+# - numbers are rounded to display precision (FIGURE_PRECISION)
+# - figures are cached by a hash of their inputs, so unchanged data is not rebuilt
+#
+# configured with environment variables (defaults in brackets):
+#   FIGURE_CACHE_SIZE     number of figures kept per worker [128]
+
+import hashlib
+import json
+from functools import lru_cache, wraps
+from typing import TYPE_CHECKING, Any, Callable
 
-import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
 
+from src.utils.cache import PageCache, count_event
+from src.utils.resilience import get_env_number
+from src.utils.tracing import traced
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FIGURE_CACHE_SIZE = int(get_env_number("FIGURE_CACHE_SIZE", 128))
+
+# decimals kept for plotted values (cents, or hundredths of a percent)
+FIGURE_PRECISION = 2
+
+# trace fields holding the plotted values
+ROUNDED_TRACE_FIELDS = ("x", "y", "values")
+
+# parts of plotly's default template the dashboard charts use
+TEMPLATE_LAYOUT_KEYS = (
+    "autotypenumbers", "colorway", "font", "hoverlabel", "hovermode",
+    "paper_bgcolor", "plot_bgcolor", "title", "xaxis", "yaxis",
+)
+TEMPLATE_TRACE_TYPES = ("bar", "pie", "scatter")
+
+# built figures by input hash, shared by every chart
+figure_cache = PageCache(FIGURE_CACHE_SIZE)
+
+
+@lru_cache(maxsize=None)
+def get_layout_template() -> dict:
+    """Returns the serialized template shared by every figure."""
+    import plotly.io as pio
+
+    template = pio.templates["plotly"].to_plotly_json()
+    return {
+        "data": {trace_type: template["data"][trace_type] for trace_type in TEMPLATE_TRACE_TYPES},
+        "layout": {key: template["layout"][key] for key in TEMPLATE_LAYOUT_KEYS},
+    }
+
+
+def make_figure(data: list, **layout: Any) -> go.Figure:
+    """
+    Creates a figure without plotly's default template.
+
+    The shared template is set when the figure is serialized (see to_figure_dict).
+    """
+    return go.Figure(data=data, layout=go.Layout(template={}, **layout))
+
+
+def get_colors(keys: list, color_map: dict) -> list[str]:
+    """Returns the theme color of each key, using the template colorway for keys missing from the color map."""
+    colorway = get_layout_template()["layout"]["colorway"]
+    return [color_map.get(key, colorway[i % len(colorway)]) for i, key in enumerate(keys)]
+
+
+def round_values(values: Any) -> Any:
+    """Rounds the numbers of a trace field to FIGURE_PRECISION decimals."""
+    if hasattr(values, "tolist"):
+        values = values.tolist()
+    if not isinstance(values, (list, tuple)):
+        return values
+    return [round(value, FIGURE_PRECISION) if isinstance(value, float) else value for value in values]
+
+
+def to_figure_dict(fig: go.Figure) -> dict:
+    """Serializes a figure with rounded values and the shared layout template."""
+    figure = fig.to_plotly_json()
+    for trace in figure["data"]:
+        for field in ROUNDED_TRACE_FIELDS:
+            if field in trace:
+                trace[field] = round_values(trace[field])
+    figure["layout"]["template"] = get_layout_template()
+    return figure
+
+
+def to_key_value(value: Any) -> Any:
+    """Converts chart inputs json cannot encode (DataFrames, numpy values) for hashing."""
+    if hasattr(value, "to_dict") and hasattr(value, "columns"):
+        return value.to_dict("split")
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def get_figure_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    """Returns a hash of a chart function and its inputs."""
+    inputs = json.dumps([func.__qualname__, args, kwargs], sort_keys=True, default=to_key_value)
+    return hashlib.sha1(inputs.encode()).hexdigest()
+
+
+def cached_figure(func: Callable[..., go.Figure]) -> Callable[..., dict]:
+    """
+    A decorator to serialize and cache the figures a chart function builds.
+
+    Figures are cached by a hash of the function's inputs, so the same data
+    returns the same dict; callers must not modify it.
+
+    Args:
+        func (Callable[..., go.Figure]): The chart function.
+
+    Returns:
+        Callable[..., dict]: The wrapped function, returning figure dicts.
+    """
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> dict:
+        key = get_figure_key(func, args, kwargs)
+        entry = figure_cache.get(key)
+        if entry is not None:
+            count_event(func, "figure_hits")
+            return entry.value
+
+        count_event(func, "figure_misses")
+        figure = to_figure_dict(func(*args, **kwargs))
+        figure_cache.set(key, figure)
+        return figure
+    return wrapper
+
+
+def get_column(data: "pd.DataFrame | dict | list[dict]", column: str) -> list:
+    """Returns a column of a DataFrame, a dict of columns or a list of records as a list."""
+    if hasattr(data, "columns"):
+        return data[column].tolist()
+    if isinstance(data, dict):
+        return list(data[column])
+    return [row[column] for row in data]
+
+
+@traced("figure.make_pie_chart")
+@cached_figure
 def make_pie_chart(
-        data: pd.DataFrame,
+        data: "pd.DataFrame | dict | list[dict]",
         names: str,
         values: str,
         color_map: dict | None = None,
         **kwargs: dict) -> go.Figure:
-    
+
     """
     Creates a pie chart from the given data.
 
     Parameters:
-    data (pd.DataFrame): A pandas DataFrame containing the data to plot.
-    names (str): The column name in the DataFrame to use for the pie chart labels.
-    values (str): The column name in the DataFrame to use for the pie chart values.
-    color_map (dict | None): A dictionary containing the theme colors to use for each metric.
+    data (pd.DataFrame | dict | list[dict]): A DataFrame, dict of columns or list of records to plot.
+    names (str): The column name in the data to use for the pie chart labels.
+    values (str): The column name in the data to use for the pie chart values.
+    color_map (dict | None): A dictionary containing the theme colors to use for each label;
+        labels missing from it get the template colors.
     **kwargs (dict): Additional keyword arguments to pass to plotly.graph_objects.Pie.
 
     Returns:
-    go.Figure: The pie chart figure.
+    dict: The pie chart figure.
     """
-    fig = px.pie(data,
-                 names=names,
-                 values=values,
-                 hover_name=names,
-                 color=names,
-                 color_discrete_map=color_map,
-                 **kwargs)
-    
-    fig.update_traces(
-        hovertemplate="<b>%{label}</b><br>%{value}<extra></extra>"
+    labels = get_column(data, names)
+
+    pie = go.Pie(
+        labels=labels,
+        values=get_column(data, values),
+        marker=dict(colors=get_colors(labels, color_map)) if color_map else None,
+        hovertemplate="<b>%{label}</b><br>%{value}<extra></extra>",
+        **kwargs
     )
 
-    return fig
+    return make_figure([pie], margin=dict(t=60))
 
 
+@traced("figure.make_budget_donut")
+@cached_figure
 def make_budget_donut(actual: float, budgeted: float, color_map: dict | None = None) -> go.Figure:
     # calculate the percentage of actual compared to budgeted revenue
     percent = (actual / budgeted) * 100
@@ -46,24 +186,19 @@ def make_budget_donut(actual: float, budgeted: float, color_map: dict | None = N
     # calculate the remaining percentage
     remaining = max(100 - chart_percent, 0.01)
 
-    # create a DataFrame with the label and value for each slice
-    df = pd.DataFrame({
-        "Label": ["Actual %", "Remaining %"],
-        "Value": [chart_percent, remaining]
-    })
-
-    # create a pie chart
-    fig = go.Figure(go.Pie(
-        labels=df["Label"],
-        values=df["Value"],
+    # create a pie chart with one slice for the actual and one for the remaining percentage
+    donut = go.Pie(
+        labels=["Actual %", "Remaining %"],
+        values=[chart_percent, remaining],
         hole=0.7,
         marker=dict(colors=[color_map["actual"], color_map["remaining"]]) if color_map else None,
         textinfo='none',
         hoverinfo='none'
-    ))
+    )
 
     # add an annotation to the chart with the percentage value
-    fig.update_layout(
+    return make_figure(
+        [donut],
         annotations=[dict(
             text=f"{percent:.0f}%",
             x=0.5, y=0.5,
@@ -74,39 +209,43 @@ def make_budget_donut(actual: float, budgeted: float, color_map: dict | None = N
         showlegend=False,
         margin=dict(t=0, b=0, l=0, r=0)
     )
-    
-    return fig
 
 
+@traced("figure.make_grouped_revenue_bar_chart")
+@cached_figure
 def make_grouped_revenue_bar_chart(data: dict, color_map: dict | None = None, **kwargs: dict) -> go.Figure:
     """
     Creates a grouped bar chart from the given data.
 
     Parameters:
     data (dict): A dictionary containing the data to plot.
-    color_map (dict | None): A dictionary containing the theme colors to use for each metric.
+    color_map (dict | None): A dictionary containing the theme colors to use for each metric;
+        metrics missing from it get the template colors.
     **kwargs (dict): Additional keyword arguments to pass to plotly.graph_objects.Bar.
 
     Returns:
-    go.Figure: The grouped bar chart figure.
+    dict: The grouped bar chart figure.
     """
     categories = list(data.keys())
     categories_display = [category.title() for category in categories]
     metrics = list(next(iter(data.values())).keys())
     metrics_display = [metric.title() for metric in metrics]
 
-    fig = go.Figure()
+    colors = get_colors(metrics, color_map) if color_map else [None] * len(metrics)
 
-    for metric, metric_display in zip(metrics, metrics_display):
-        fig.add_bar(
+    bars = [
+        go.Bar(
             x=categories_display,
             y=[data[category][metric] for category in categories],
             name=metric_display,
-            marker_color=color_map[metric] if color_map else None,
+            marker_color=color,
             **kwargs
         )
-    
-    fig.update_layout(
+        for metric, metric_display, color in zip(metrics, metrics_display, colors)
+    ]
+
+    return make_figure(
+        bars,
         barmode='group',
         xaxis_title="",
         yaxis_title="",
@@ -115,45 +254,88 @@ def make_grouped_revenue_bar_chart(data: dict, color_map: dict | None = None, **
         showlegend=True,
     )
 
-    return fig
 
+@traced("figure.make_bar_chart")
+@cached_figure
+def make_bar_chart(
+        data: "pd.DataFrame | dict | list[dict]",
+        x: str,
+        y: str,
+        color_map: dict | None = None,
+        **kwargs: dict) -> go.Figure:
+    """
+    Creates a bar chart with one bar per x value.
 
-def make_bar_chart(data: dict, x: str, y: str, color_map: dict | None = None, **kwargs: dict) -> go.Figure:
-    if isinstance(data, dict):
-        data = pd.DataFrame(data)
-
-    if color_map:
-        fig = px.bar(
-            data_frame=data,
-            x=x,
-            y=y,
-            color=x,
-            color_discrete_map=color_map,
-            **kwargs
-        )
-    else:
-        fig = px.bar(data_frame=data, x=x, y=y, **kwargs)
+    Parameters:
+    data (pd.DataFrame | dict | list[dict]): A DataFrame, dict of columns or list of records to plot.
+    x (str): The column name of the data to use as x values.
+    y (str): The column name of the data to use as y values.
+    color_map (dict | None): A dictionary containing the theme colors to use for each x value;
+        x values missing from it get the template colors.
+    **kwargs (dict): Additional keyword arguments to pass to plotly.graph_objects.Bar.
+
+    Returns:
+    dict: The bar chart figure.
+    """
+    x_values = get_column(data, x)
 
-    fig.update_layout(
+    bar = go.Bar(
+        x=x_values,
+        y=get_column(data, y),
+        marker_color=get_colors(x_values, color_map) if color_map else None,
+        **kwargs
+    )
+
+    return make_figure(
+        [bar],
+        xaxis_title=x,
+        yaxis_title=y,
         margin=dict(l=5, r=5, t=5, b=5),
         showlegend=False,
     )
 
-    return fig
 
-
-def make_line_chart(data: pd.DataFrame, x: str, y: str, **kwargs: dict) -> go.Figure:
+@traced("figure.make_line_chart")
+@cached_figure
+def make_line_chart(
+        data: "pd.DataFrame | dict | list[dict]",
+        x: str,
+        y: str,
+        labels: dict | None = None,
+        markers: bool = False,
+        color: str | None = None,
+        yaxis: dict | None = None) -> go.Figure:
     """
-    Creates a line chart from the given DataFrame.
+    Creates a line chart from the given data.
 
     Parameters:
-    data (pd.DataFrame): The DataFrame containing the data to plot.
+    data (pd.DataFrame | dict | list[dict]): A DataFrame, dict of columns or list of records to plot.
     x (str): The column name of the data to use as x values.
     y (str): The column name of the data to use as y values.
-    *kwargs (dict): Additional keyword arguments to pass to plotly.express.line.
+    labels (dict | None): Display names of the x and y columns, used for axis titles and hover text.
+    markers (bool): Whether to draw a marker at each point.
+    color (str | None): The line color.
+    yaxis (dict | None): Additional y axis settings (e.g. tickformat).
 
     Returns:
-    go.Figure: The line chart figure.
+    dict: The line chart figure.
     """
-    fig = px.line(data, x=x, y=y, **kwargs)
-    return fig
+    labels = labels or {}
+    x_label = labels.get(x, x)
+    y_label = labels.get(y, y)
+
+    line = go.Scatter(
+        x=get_column(data, x),
+        y=get_column(data, y),
+        mode="lines+markers" if markers else "lines",
+        line_color=color,
+        hovertemplate=f"{x_label}=%{{x}}<br>{y_label}=%{{y}}<extra></extra>",
+        showlegend=False,
+    )
+
+    return make_figure(
+        [line],
+        xaxis_title=x_label,
+        yaxis=dict(title_text=y_label, **(yaxis or {})),
+        margin=dict(t=60),
+    )
@@ -1,10 +1,72 @@
 # builds a list of dictionaries to represent the restaurant statement page table rows
 
+from src.metrics.metric_types import StatementMetrics
 from src.metrics.metrics_helpers import compute_percentage, format_metric
 from src.utils.constants import STATEMENT_SECTION_HEADERS
 
+# statement table value columns, in display order
+VALUE_COLUMNS = (
+    "mtd_actual", "mtd_budget", "mtd_pct_budget", "mtd_py", "mtd_pct_py",
+    "ytd_actual", "ytd_budget", "ytd_pct_budget", "ytd_py", "ytd_pct_py",
+)
 
-def build_statement_rows(metrics: dict) -> list[dict]:
+# empty section header row, copied for each header
+EMPTY_ROW_VALUES = dict.fromkeys(VALUE_COLUMNS)
+
+# statement sections: (header index, scenario block, line items as (label, block field), value unit)
+STATEMENT_LINES = (
+    (0, "revenue", (("Food", "food_revenue"), ("Beverage", "beverage_revenue"), ("Total", "total_revenue")), None),
+    (1, "cost", (("Food", "food_cost"), ("Beverage", "beverage_cost"), ("Total", "total_cost")), None),
+    (2, "cost", (("Food", "food_cost_pct"), ("Beverage", "beverage_cost_pct")), "%"),
+)
+
+
+def display_value(value, unit: str | None):
+    """Formats a value with its unit, or returns it unchanged when the line has no unit."""
+    return format_metric(value, unit) if unit else value
+
+
+def build_line_row(line_item: str, metrics: StatementMetrics, block: str, field: str, unit: str | None) -> dict:
+    """
+    Builds one statement table row from a single field of each scenario block.
+
+    Args:
+        line_item (str): the name of the line item
+        metrics (StatementMetrics): the metrics for the restaurant statement page table
+        block (str): the scenario block to read from ("revenue", "cost" or "profit")
+        field (str): the field of the block to read
+        unit (str | None): the unit used to format the values, or None to keep raw values
+
+    Returns:
+        dict: a dictionary representing one statement table row
+    """
+    actual = getattr(metrics.actual, block)
+    budgeted = getattr(metrics.budgeted, block)
+    prior_year = getattr(metrics.prior_year, block)
+
+    mtd_actual = getattr(actual.mtd, field)
+    mtd_budget = getattr(budgeted.mtd, field)
+    mtd_py = getattr(prior_year.mtd, field)
+    ytd_actual = getattr(actual.ytd, field)
+    ytd_budget = getattr(budgeted.ytd, field)
+    ytd_py = getattr(prior_year.ytd, field)
+
+    return {
+        "line_item": line_item,
+        "mtd_actual": display_value(mtd_actual, unit),
+        "mtd_budget": display_value(mtd_budget, unit),
+        "mtd_pct_budget": compute_percentage(mtd_actual, mtd_budget, as_fraction=True),
+        "mtd_py": display_value(mtd_py, unit),
+        "mtd_pct_py": compute_percentage(mtd_actual, mtd_py, as_fraction=True),
+        "ytd_actual": display_value(ytd_actual, unit),
+        "ytd_budget": display_value(ytd_budget, unit),
+        "ytd_pct_budget": compute_percentage(ytd_actual, ytd_budget, as_fraction=True),
+        "ytd_py": display_value(ytd_py, unit),
+        "ytd_pct_py": compute_percentage(ytd_actual, ytd_py, as_fraction=True),
+    }
+
+
+def build_statement_rows(metrics: StatementMetrics) -> list[dict]:
     """
     Builds a list of dictionaries to represent the restaurant statement page table.
 
@@ -22,147 +84,38 @@ def build_statement_rows(metrics: dict) -> list[dict]:
     - ytd_pct_py: the percentage of actual YTD value of the prior year vs actual YTD value
 
     Args:
-    metrics (dict): a dictionary containing the metrics for the restaurant statement page table
+    metrics (StatementMetrics): the metrics for the restaurant statement page table
 
     Returns:
     list[dict]: a list of dictionaries representing the restaurant statement page table
     """
     rows = []
 
-    # revenues
-    rows.append({
-        "line_item": STATEMENT_SECTION_HEADERS[0],
-        "mtd_actual": None,
-        "mtd_budget": None,
-        "mtd_pct_budget": None,
-        "mtd_py": None,
-        "mtd_pct_py": None,
-        "ytd_actual": None,
-        "ytd_budget": None,
-        "ytd_pct_budget": None,
-        "ytd_py": None,
-        "ytd_pct_py": None,
-    })
-    
-    # loop through categories and fill in the data
-    for category in ["Food", "Beverage", "Total"]:
-        mtd_actual = metrics["actual"]["revenue"]["mtd"][f"{category.lower()}_revenue"]
-        mtd_budget = metrics["budgeted"]["revenue"]["mtd"][f"{category.lower()}_revenue"]
-        mtd_py = metrics["prior_year"]["revenue"]["mtd"][f"{category.lower()}_revenue"]
-        ytd_actual = metrics["actual"]["revenue"]["ytd"][f"{category.lower()}_revenue"]
-        ytd_budget = metrics["budgeted"]["revenue"]["ytd"][f"{category.lower()}_revenue"]
-        ytd_py = metrics["prior_year"]["revenue"]["ytd"][f"{category.lower()}_revenue"]
-
-        rows.append({
-            "line_item": category,
-            "mtd_actual": mtd_actual,
-            "mtd_budget": mtd_budget,
-            "mtd_pct_budget": compute_percentage(mtd_actual, mtd_budget, as_fraction=True),
-            "mtd_py": mtd_py,
-            "mtd_pct_py": compute_percentage(mtd_actual, mtd_py, as_fraction=True),
-            "ytd_actual": ytd_actual,
-            "ytd_budget": ytd_budget,
-            "ytd_pct_budget": compute_percentage(ytd_actual, ytd_budget, as_fraction=True),
-            "ytd_py": ytd_py,
-            "ytd_pct_py": compute_percentage(ytd_actual, ytd_py, as_fraction=True),
-        })
-
-    # costs
-    rows.append({
-        "line_item": STATEMENT_SECTION_HEADERS[1],
-        "mtd_actual": None,
-        "mtd_budget": None,
-        "mtd_pct_budget": None,
-        "mtd_py": None,
-        "mtd_pct_py": None,
-        "ytd_actual": None,
-        "ytd_budget": None,
-        "ytd_pct_budget": None,
-        "ytd_py": None,
-        "ytd_pct_py": None,
-    })
-    
-    # loop through categories and fill in the data
-    for category in ["Food", "Beverage", "Total"]:
-        mtd_actual = metrics["actual"]["cost"]["mtd"][f"{category.lower()}_cost"]
-        mtd_budget = metrics["budgeted"]["cost"]["mtd"][f"{category.lower()}_cost"]
-        mtd_py = metrics["prior_year"]["cost"]["mtd"][f"{category.lower()}_cost"]
-        ytd_actual = metrics["actual"]["cost"]["ytd"][f"{category.lower()}_cost"]
-        ytd_budget = metrics["budgeted"]["cost"]["ytd"][f"{category.lower()}_cost"]
-        ytd_py = metrics["prior_year"]["cost"]["ytd"][f"{category.lower()}_cost"]
-
-        rows.append({
-            "line_item": category,
-            "mtd_actual": mtd_actual,
-            "mtd_budget": mtd_budget,
-            "mtd_pct_budget": compute_percentage(mtd_actual, mtd_budget, as_fraction=True),
-            "mtd_py": mtd_py,
-            "mtd_pct_py": compute_percentage(mtd_actual, mtd_py, as_fraction=True),
-            "ytd_actual": ytd_actual,
-            "ytd_budget": ytd_budget,
-            "ytd_pct_budget": compute_percentage(ytd_actual, ytd_budget, as_fraction=True),
-            "ytd_py": ytd_py,
-            "ytd_pct_py": compute_percentage(ytd_actual, ytd_py, as_fraction=True),
-        })
-    
-    # cogs percentage
-    rows.append({
-        "line_item": STATEMENT_SECTION_HEADERS[2],
-        "mtd_actual": None,
-        "mtd_budget": None,
-        "mtd_pct_budget": None,
-        "mtd_py": None,
-        "mtd_pct_py": None,
-        "ytd_actual": None,
-        "ytd_budget": None,
-        "ytd_pct_budget": None,
-        "ytd_py": None,
-        "ytd_pct_py": None,
-    })
-    
-    # loop through categories and fill in the data
-    for category in ["Food", "Beverage"]:
-        mtd_actual = metrics["actual"]["cost"]["mtd"][f"{category.lower()}_cost_pct"]
-        mtd_budget = metrics["budgeted"]["cost"]["mtd"][f"{category.lower()}_cost_pct"]
-        mtd_py = metrics["prior_year"]["cost"]["mtd"][f"{category.lower()}_cost_pct"]
-        ytd_actual = metrics["actual"]["cost"]["ytd"][f"{category.lower()}_cost_pct"]
-        ytd_budget = metrics["budgeted"]["cost"]["ytd"][f"{category.lower()}_cost_pct"]
-        ytd_py = metrics["prior_year"]["cost"]["ytd"][f"{category.lower()}_cost_pct"]
-
-        rows.append({
-            "line_item": category,
-            "mtd_actual": format_metric(mtd_actual, "%"),
-            "mtd_budget": format_metric(mtd_budget, "%"),
-            "mtd_pct_budget": compute_percentage(mtd_actual, mtd_budget, as_fraction=True),
-            "mtd_py": format_metric(mtd_py, "%"),
-            "mtd_pct_py": compute_percentage(mtd_actual, mtd_py, as_fraction=True),
-            "ytd_actual": format_metric(ytd_actual, "%"),
-            "ytd_budget": format_metric(ytd_budget, "%"),
-            "ytd_pct_budget": compute_percentage(ytd_actual, ytd_budget, as_fraction=True),
-            "ytd_py": format_metric(ytd_py, "%"),
-            "ytd_pct_py": compute_percentage(ytd_actual, ytd_py, as_fraction=True),
-        })
-    
+    # revenues, costs and cogs percentage
+    for header_index, block, line_items, unit in STATEMENT_LINES:
+        rows.append({"line_item": STATEMENT_SECTION_HEADERS[header_index], **EMPTY_ROW_VALUES})
+
+        for line_item, field in line_items:
+            rows.append(build_line_row(line_item, metrics, block, field, unit))
+
     # profit
-    mtd_actual = metrics["actual"]["profit"]["mtd"]["gross_profit"]
-    mtd_budget = metrics["budgeted"]["profit"]["mtd"]["gross_profit"]
-    mtd_py = metrics["prior_year"]["profit"]["mtd"]["gross_profit"]
-    ytd_actual = metrics["actual"]["profit"]["ytd"]["gross_profit"]
-    ytd_budget = metrics["budgeted"]["profit"]["ytd"]["gross_profit"]
-    ytd_py = metrics["prior_year"]["profit"]["ytd"]["gross_profit"]
-
-    rows.append({
-        "line_item": STATEMENT_SECTION_HEADERS[3],
-        "mtd_actual": mtd_actual,
-        "mtd_budget": mtd_budget,
-        "mtd_pct_budget": compute_percentage(mtd_actual, mtd_budget, as_fraction=True),
-        "mtd_py": mtd_py,
-        "mtd_pct_py": compute_percentage(mtd_actual, mtd_py, as_fraction=True),
-        "ytd_actual": ytd_actual,
-        "ytd_budget": ytd_budget,
-        "ytd_pct_budget": compute_percentage(ytd_actual, ytd_budget, as_fraction=True),
-        "ytd_py": ytd_py,
-        "ytd_pct_py": compute_percentage(ytd_actual, ytd_py, as_fraction=True),
-    })
+    rows.append(build_line_row(STATEMENT_SECTION_HEADERS[3], metrics, "profit", "gross_profit", None))
 
-    return rows
\ No newline at end of file
+    return rows
+
+
+def build_statement_year_payload(metrics_by_month: dict[int, StatementMetrics], year: int) -> dict:
+    """
+    Builds the statement table rows of every month of a year, for the browser to switch between.
+
+    Args:
+    metrics_by_month (dict[int, StatementMetrics]): the statement metrics of each calendar month
+    year (int): the calendar year
+
+    Returns:
+    dict: the year and the statement table rows of each month, keyed by the month as a string (JSON object keys)
+    """
+    return {
+        "year": year,
+        "rows": {str(month): build_statement_rows(metrics) for month, metrics in metrics_by_month.items()},
+    }
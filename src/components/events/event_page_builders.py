@@ -1,16 +1,19 @@
 # builds the charts and cards for the events page
 
+from typing import TYPE_CHECKING
+
 import dash_bootstrap_components as dbc
-import pandas as pd
-import plotly.graph_objects as go
 
 from src.components.core import cards, charts
 from src.components.core.ui_helpers import get_variance_color
 from src.utils.constants import THEME_COLORS
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 #------- charts -------
-def build_event_type_pie_chart(events_by_type_df: pd.DataFrame) -> go.Figure:
+def build_event_type_pie_chart(events_by_type_df: "pd.DataFrame") -> dict:
     """
     Builds a pie chart of total sales grouped by event type.
 
@@ -18,7 +21,7 @@ def build_event_type_pie_chart(events_by_type_df: pd.DataFrame) -> go.Figure:
         events_by_type_df (pd.DataFrame): A pandas DataFrame containing the event type and total sales for each event type.
 
     Returns:
-        go.Figure: A pie chart of total sales grouped by event type.
+        dict: A pie chart of total sales grouped by event type.
     """
     event_type_pie_chart_colors = {
             "Holiday Party": THEME_COLORS["success"],
@@ -34,20 +37,19 @@ def build_event_type_pie_chart(events_by_type_df: pd.DataFrame) -> go.Figure:
         names="event_type",
         values="total_sales",
         color_map=event_type_pie_chart_colors,
-        title="",
     )
 
     return event_type_pie_chart
 
-def build_events_ytd_bar_chart(ytd_summary_metrics: dict) -> go.Figure:
+def build_events_ytd_bar_chart(ytd_summary_metrics: dict) -> dict:
     """
-    Builds a plotly.graph_objects.Figure containing a bar chart of year-to-date (YTD) summary metrics.
+    Builds a figure containing a bar chart of year-to-date (YTD) summary metrics.
 
     Args:
         ytd_summary_metrics (dict): A dictionary containing the YTD summary metrics.
 
     Returns:
-        go.Figure: A plotly.graph_objects.Figure object containing a bar chart of YTD summary metrics.
+        dict: A figure containing a bar chart of YTD summary metrics.
     """
     events_ytd_bar_chart_colors = {
             "actual": THEME_COLORS["success"],
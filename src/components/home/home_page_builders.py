@@ -1,7 +1,5 @@
 # builds the charts and cards for the home page
 
-import pandas as pd
-import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 
 from src.components.core import cards, charts
@@ -9,7 +7,7 @@ from src.components.core.ui_helpers import get_donut_chart_colors, get_variance_
 from src.utils.constants import THEME_COLORS
 
 # ------- charts -------
-def build_donut_chart(monthly_revenue_metrics: dict) -> go.Figure:
+def build_donut_chart(monthly_revenue_metrics: dict) -> dict:
     """
     Builds a donut chart based on the given monthly revenue metrics.
 
@@ -18,7 +16,7 @@ def build_donut_chart(monthly_revenue_metrics: dict) -> go.Figure:
         and variance for the month.
 
     Returns:
-    go.Figure: A donut chart figure object.
+    dict: A donut chart figure.
     """
     donut_colors = get_donut_chart_colors(
             monthly_revenue_metrics['total_revenue'],
@@ -34,22 +32,22 @@ def build_donut_chart(monthly_revenue_metrics: dict) -> go.Figure:
     return donut_chart
 
 
-def build_revenue_breakdown_pie_chart(ytd_revenue_metrics: dict) -> go.Figure:
+def build_revenue_breakdown_pie_chart(ytd_revenue_metrics: dict) -> dict:
     """
-    Builds a plotly.graph_objects.Figure containing a pie chart of year-to-date (YTD) revenue breakdown metrics.
+    Builds a figure containing a pie chart of year-to-date (YTD) revenue breakdown metrics.
 
     Parameters:
         ytd_revenue_metrics (dict): A dictionary containing the YTD revenue breakdown metrics.
 
     Returns:
-        go.Figure: A plotly.graph_objects.Figure object containing a pie chart of YTD revenue breakdown metrics.
+        dict: A figure containing a pie chart of YTD revenue breakdown metrics.
     """
     revenue_breakdown_pie_chart_colors = {
             "Restaurant": THEME_COLORS["info"],
             "Events": THEME_COLORS["danger"],
         }
 
-    revenue_breakdown_df = pd.DataFrame([
+    revenue_breakdown = [
         {
             "name": "Restaurant",
             "value": ytd_revenue_metrics['restaurant_revenue'],
@@ -59,10 +57,10 @@ def build_revenue_breakdown_pie_chart(ytd_revenue_metrics: dict) -> go.Figure:
             "name": "Events",
             "value": ytd_revenue_metrics['event_revenue'],
         }
-    ])
+    ]
 
     revenue_breakdown_pie = charts.make_pie_chart(
-        data=revenue_breakdown_df,
+        data=revenue_breakdown,
         names="name",
         values="value",
         color_map=revenue_breakdown_pie_chart_colors
@@ -1,14 +1,12 @@
 # builds the charts and cards for the restaurant snapshot
 
-import pandas as pd
-import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 
 from src.components.core import cards, charts
 from src.utils.constants import THEME_COLORS
 
 # ------- charts -------
-def build_avg_Sales_by_day_chart(avg_sales_by_day: list[dict]) -> go.Figure:
+def build_avg_Sales_by_day_chart(avg_sales_by_day: list[dict]) -> dict:
     """
     Builds a line chart of average total sales per day of the week.
 
@@ -17,11 +15,10 @@ def build_avg_Sales_by_day_chart(avg_sales_by_day: list[dict]) -> go.Figure:
         total sales for each day.
 
     Returns:
-        go.Figure: A line chart of average total sales per day of the week.
+        dict: A line chart of average total sales per day of the week.
     """
-    avg_sales_by_day_df = pd.DataFrame(avg_sales_by_day)
     avg_sales_by_day_line_chart = charts.make_line_chart(
-        avg_sales_by_day_df,
+        avg_sales_by_day,
         x="day_of_week",
         y="average_sales",
         markers=True,
@@ -29,18 +26,18 @@ def build_avg_Sales_by_day_chart(avg_sales_by_day: list[dict]) -> go.Figure:
             "day_of_week": "Day of Week",
             "average_sales": "Average Sales"
         },
-        color_discrete_sequence = [THEME_COLORS["info"]]
-    )
-    avg_sales_by_day_line_chart.update_yaxes(
-        tickprefix="$",
-        separatethousands=True,
-        tickformat=",.0f"
+        color=THEME_COLORS["info"],
+        yaxis=dict(
+            tickprefix="$",
+            separatethousands=True,
+            tickformat=",.0f"
+        )
     )
 
     return avg_sales_by_day_line_chart
 
 
-def build_sales_by_category_pie_chart(sales_by_category: dict) -> go.Figure:
+def build_sales_by_category_pie_chart(sales_by_category: dict) -> dict:
     """
     Builds a pie chart of total sales grouped by category.
 
@@ -48,19 +45,17 @@ def build_sales_by_category_pie_chart(sales_by_category: dict) -> go.Figure:
         sales_by_category (dict): A dictionary containing the category and total sales for each category.
 
     Returns:
-        go.Figure: A pie chart of total sales grouped by category.
+        dict: A pie chart of total sales grouped by category.
     """
-    sales_by_category_df = pd.DataFrame(sales_by_category)
     sales_by_category_pie_chart_colors = {
             "Food": THEME_COLORS["danger"],
             "Beverage": THEME_COLORS["info"],
     }
     sales_by_category_pie_chart = charts.make_pie_chart(
-            data=sales_by_category_df,
+            data=sales_by_category,
             names="Category",
             values="Total Sales",
             color_map=sales_by_category_pie_chart_colors,
-            title="",
         )
     
     return sales_by_category_pie_chart
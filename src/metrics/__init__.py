@@ -14,3 +14,9 @@ from . import restaurant
 
 # metrics helpers
 from . import metrics_helpers
+
+# compact metric result types
+from . import metric_types
+
+# declarative metric registry and query planner
+from . import metric_registry
\ No newline at end of file
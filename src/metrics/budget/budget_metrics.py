@@ -1,8 +1,10 @@
 # executes aggregates for the budget page
 
 from src.services import budget
+from src.utils.cache import page_data
 
-def get_annual_budget_data(year: int) -> list:
+@page_data("get_annual_budget_data", 1, cached=False)
+def get_annual_budget_data(year: int) -> list[dict]:
     """
     Retrieves a list of combined budget documents for a given year.
 
@@ -10,6 +12,6 @@ def get_annual_budget_data(year: int) -> list:
         year (int): The year for which to retrieve the combined budget documents.
 
     Returns:
-        list: A list of combined budget documents for the specified year.
+        list[dict]: A list of combined budget documents for the specified year.
     """
     return budget.combined_budget_service.get_annual_budget_docs(year)
@@ -1,60 +1,201 @@
 # executes aggregates and structures results for banquet page callback
 
-import pandas as pd
+from typing import TYPE_CHECKING, Any
 
+from src.metrics.metric_registry import Metric, compute_metrics, compute_monthly_metrics, get_comparisons
 from src.metrics.metrics_helpers import compute_total, compute_gross_profit
-from src.services import budget, event_service
+from src.services import event_service
 from src.utils import dates
+from src.utils.cache import page_data
 
-def get_events_page_data(month: int, year: int) -> dict:
+if TYPE_CHECKING:
+    import pandas as pd
+
+# per-card data paths: each card's callback loads only what it shows, and cards
+# sharing a path are coalesced and cached by page_data
+
+@page_data("get_events_kpi_data", 6)
+def get_events_kpi_data(month: int, year: int) -> dict:
     """
-    Retrieves a dictionary containing the monthly and year-to-date events metrics for a given month and year.
+    Retrieves the banquet page's revenue, cost, event count and average sales metrics.
 
     Args:
         month (int): The month for which to retrieve the event metrics.
         year (int): The year for which to retrieve the event metrics.
 
     Returns:
-        dict: A dictionary containing the monthly and year-to-date event metrics.
+        dict: The revenue, YTD summary, event count and average sales entries of the banquet page data.
+    """
+    return assemble_events_kpi_data(month, year)
+
+
+@page_data("get_events_high_value_counts", 1)
+def get_events_high_value_counts(month: int, year: int) -> dict:
+    """
+    Retrieves the monthly and YTD number of high value events of the year and the prior year.
+
+    Args:
+        month (int): The month for which to retrieve the event counts.
+        year (int): The year for which to retrieve the event counts.
+
+    Returns:
+        dict: The "num_high_value_events_monthly" and "num_high_value_events_ytd" entries of the banquet page data.
+    """
+    return compute_num_events_above_threshold(year, month, 4000)
+
+
+@page_data("get_events_top_five", 1)
+def get_events_top_five(month: int, year: int) -> dict:
+    """
+    Retrieves the month's top five events by sales.
+
+    Args:
+        month (int): The month for which to retrieve the top events.
+        year (int): The year for which to retrieve the top events.
+
+    Returns:
+        dict: The "top_five_events_monthly" entry of the banquet page data.
+    """
+    return assemble_events_top_five(month, year)
+
+
+@page_data("get_events_by_type_data", 1)
+def get_events_by_type_data(month: int, year: int) -> dict:
+    """
+    Retrieves the YTD event sales by event type.
+
+    Args:
+        month (int): The month for which to retrieve the sales by event type.
+        year (int): The year for which to retrieve the sales by event type.
+
+    Returns:
+        dict: The "events_by_type_df" entry of the banquet page data.
+    """
+    return assemble_events_by_type(month, year)
+
+
+def assemble_events_kpi_data(month: int, year: int) -> dict:
+    """
+    Computes and assembles the banquet page's scalar metrics with the planner.
+
+    Args:
+        month (int): The calendar month (1-12).
+        year (int): The calendar year.
+
+    Returns:
+        dict: The monthly revenue metrics of the year and the prior year, the YTD summary,
+        and the monthly and YTD event counts and average sales.
+    """
+    values = compute_metrics(get_events_metrics(), month, year)
+    return {
+        "monthly_revenue_metrics": get_events_monthly_revenue_metrics(values, month, year),
+        "py_monthly_revenue_metrics": get_events_monthly_revenue_metrics(values, month, year, prior_year=True),
+        "ytd_summary_metrics": get_events_ytd_summary_metrics(values),
+        "num_events_monthly": compute_num_events(values, "mtd"),
+        "num_events_ytd": compute_num_events(values, "ytd"),
+        "avg_event_sales_monthly": compute_avg_event_sales(values, "mtd"),
+        "avg_event_sales_ytd": compute_avg_event_sales(values, "ytd"),
+    }
+
+
+def assemble_events_top_five(month: int, year: int) -> dict:
+    """Retrieves the month's top five events by sales."""
+    return {"top_five_events_monthly": get_top_n_events("monthly", year, month, 5)}
+
+
+def assemble_events_by_type(month: int, year: int) -> dict:
+    """Retrieves the YTD event sales by event type."""
+    return {"events_by_type_df": get_events_by_type("ytd", year, month)}
+
+
+@page_data("get_events_trend_data", 3, cached=False)
+def get_events_trend_data(year: int) -> dict:
+    """
+    Retrieves the banquet page's scalar metrics for every month of a year at once, for trend charts.
+
+    Args:
+        year (int): The year for which to retrieve the event metrics.
+
+    Returns:
+        dict: The same revenue, count and average sales metrics as get_events_kpi_data, each
+        value a numpy array of the 12 monthly values (January first). Threshold counts,
+        top events and events by type are not included.
     """
+    import numpy as np
+
+    values = compute_monthly_metrics(get_events_metrics(), year)
+    months = np.arange(1, 13)
     return {
-        "monthly_revenue_metrics": get_events_monthly_revenue_metrics(month, year),
-        "py_monthly_revenue_metrics": get_events_monthly_revenue_metrics(month, year - 1),
-        "ytd_summary_metrics": get_events_ytd_summary_metrics(month, year),
-        "num_events_monthly": compute_num_events("monthly", year, month),
-        "num_events_ytd": compute_num_events("ytd", year, month),
-        "num_high_value_events_monthly": compute_num_events_above_threshold("monthly", year, month, 4000),
-        "num_high_value_events_ytd": compute_num_events_above_threshold("ytd", year, month, 4000),
-        "avg_event_sales_monthly": compute_avg_event_sales("monthly", year, month),
-        "avg_event_sales_ytd": compute_avg_event_sales("ytd", year, month),
-        "top_five_events_monthly": get_top_n_events("monthly", year, month, 5),
-        "events_by_type_df": get_events_by_type("ytd", year, month)
+        "monthly_revenue_metrics": get_events_monthly_revenue_metrics(values, months, year),
+        "py_monthly_revenue_metrics": get_events_monthly_revenue_metrics(values, months, year, prior_year=True),
+        "ytd_summary_metrics": get_events_ytd_summary_metrics(values),
+        "num_events_monthly": compute_num_events(values, "mtd"),
+        "num_events_ytd": compute_num_events(values, "ytd"),
+        "avg_event_sales_monthly": compute_avg_event_sales(values, "mtd"),
+        "avg_event_sales_ytd": compute_avg_event_sales(values, "ytd"),
     }
 
 
-def get_events_monthly_revenue_metrics(month: int, year: int) -> dict:
+def get_events_metrics() -> list[Metric]:
     """
-    Retrieves monthly revenue metrics for events.
+    Declares the scalar metrics of the banquet page for the planner.
+
+    Returns:
+        list[Metric]: The monthly revenue metrics for the current and prior year, the
+        YTD revenue and cost summary, and the event counts and average sales.
+    """
+    metrics = []
+    for prior_year in (False, True):
+        actual, budgeted = get_comparisons(prior_year)
+        metrics += [
+            Metric("sales", "events", "mtd", budgeted),
+            Metric("food_sales", "events", "mtd", actual),
+            Metric("bev_sales", "events", "mtd", actual),
+        ]
+    for comparison in ("actual", "budget", "prior_year"):
+        metrics += [
+            Metric("sales", "events", "ytd", comparison),
+            Metric("cost", "events", "ytd", comparison),
+        ]
+    for period in ("mtd", "ytd"):
+        for comparison in ("actual", "prior_year"):
+            metrics += [
+                Metric("count", "events", period, comparison),
+                Metric("avg_sales", "events", period, comparison),
+            ]
+    return metrics
+
+
+def get_events_monthly_revenue_metrics(
+        values: dict[Metric, Any],
+        month: int,
+        year: int,
+        prior_year: bool = False
+) -> dict:
+    """
+    Assembles monthly revenue metrics for events.
 
     Args:
-        month (int): The month for which to retrieve the monthly revenue metrics.
-        year (int): The year for which to retrieve the monthly revenue metrics.
+        values (dict[Metric, Any]): The computed banquet page metrics.
+        month (int): The month for which to assemble the monthly revenue metrics.
+        year (int): The page's year.
+        prior_year (bool): Whether to assemble the prior year's metrics. Defaults to False.
 
     Returns:
         dict: A dictionary containing the budgeted revenue, food revenue, beverage revenue,
         total revenue, and variance for the given period.
     """
-    start, end = dates.monthly_date_range(month, year)
+    actual, budgeted = get_comparisons(prior_year)
 
-    budgeted_revenue = budget.event_budget_service.get_monthly_budgeted_event_revenue(month, year)
-    food_revenue = event_service.get_total_event_food_sales(start, end)
-    beverage_revenue = event_service.get_total_event_bev_sales(start, end)
+    budgeted_revenue = values[Metric("sales", "events", "mtd", budgeted)]
+    food_revenue = values[Metric("food_sales", "events", "mtd", actual)]
+    beverage_revenue = values[Metric("bev_sales", "events", "mtd", actual)]
     total_revenue = compute_total(food_revenue, beverage_revenue)
     variance = total_revenue - budgeted_revenue
 
     return {
         'month': month,
-        'year': year,
+        'year': year - 1 if prior_year else year,
         'budgeted_revenue': budgeted_revenue,
         'food_revenue': food_revenue,
         'beverage_revenue': beverage_revenue,
@@ -63,29 +204,25 @@ def get_events_monthly_revenue_metrics(month: int, year: int) -> dict:
     }
 
 
-def get_events_ytd_summary_metrics(month: int, year: int) -> dict:
+def get_events_ytd_summary_metrics(values: dict[Metric, Any]) -> dict:
     """
-    Retrieves year-to-date (YTD) summary metrics for events.
+    Assembles year-to-date (YTD) summary metrics for events.
 
     Args:
-        month (int): The month for which to retrieve the YTD summary metrics.
-        year (int): The year for which to retrieve the YTD summary metrics.
+        values (dict[Metric, Any]): The computed banquet page metrics.
 
     Returns:
         dict: A dictionary containing the current year's actual revenue, budgeted revenue, previous year's revenue,
         current year's actual costs, budgeted costs, previous year's costs, current year's actual gross profit,
         budgeted gross profit, and previous year's gross profit.
     """
-    current_start, current_end = dates.ytd_date_range(month, year)
-    py_start, py_end = dates.ytd_date_range(month, year - 1)
-
-    actual_total_revenue = event_service.get_total_event_sales(current_start, current_end)
-    budgeted_total_revenue = budget.event_budget_service.get_ytd_budgeted_event_revenue(month, year)
-    py_total_revenue = event_service.get_total_event_sales(py_start, py_end)
+    actual_total_revenue = values[Metric("sales", "events", "ytd", "actual")]
+    budgeted_total_revenue = values[Metric("sales", "events", "ytd", "budget")]
+    py_total_revenue = values[Metric("sales", "events", "ytd", "prior_year")]
     
-    actual_total_costs = event_service.get_total_event_costs(current_start, current_end)
-    budgeted_total_costs = budget.event_budget_service.get_ytd_budgeted_event_cost(month, year)
-    py_total_costs = event_service.get_total_event_costs(py_start, py_end)
+    actual_total_costs = values[Metric("cost", "events", "ytd", "actual")]
+    budgeted_total_costs = values[Metric("cost", "events", "ytd", "budget")]
+    py_total_costs = values[Metric("cost", "events", "ytd", "prior_year")]
 
     actual_gross_profit = compute_gross_profit(actual_total_revenue, actual_total_costs)
     budgeted_gross_profit = compute_gross_profit(budgeted_total_revenue, budgeted_total_costs)
@@ -110,97 +247,91 @@ def get_events_ytd_summary_metrics(month: int, year: int) -> dict:
     }
 
 
-def compute_num_events(period: str, year: int, month: int) -> list[dict]:
+def compute_num_events(values: dict[Metric, Any], period: str) -> list[dict]:
     """
-    Computes the number of events for a given period (monthly or ytd), year, and month.
+    Assembles the number of events for a given period (mtd or ytd) and the same period of the prior year.
 
     Args:
-        period (str): The period for which to compute the number of events. Can be "monthly" or "ytd".
-        year (int): The year for which to compute the number of events.
-        month (int): The month for which to compute the number of events.
+        values (dict[Metric, Any]): The computed banquet page metrics.
+        period (str): The period for which to assemble the number of events. Can be "mtd" or "ytd".
 
     Returns:
         list[dict]: A list containing two dictionaries. 
         The first dictionary contains the name "Current" and the number of events for the current year.
         The second dictionary contains the name "Prior Year" and the number of events for the prior year.
     """
-    current_start, current_end = dates.get_period_range(period, month, year)
-    py_start, py_end = dates.get_period_range(period, month, year - 1)
-    current = event_service.get_num_events(current_start, current_end)
-    prior_year = event_service.get_num_events(py_start, py_end)
-
     return [
         {
             "name": "Current",
-            "num_events": current
+            "num_events": values[Metric("count", "events", period, "actual")]
         },
         {
             "name": "Prior Year",
-            "num_events": prior_year
+            "num_events": values[Metric("count", "events", period, "prior_year")]
         }
     ]
 
 
-def compute_num_events_above_threshold(period: str, year: int, month: int, threshold: float) -> list[dict]:
+def compute_num_events_above_threshold(year: int, month: int, threshold: float) -> dict:
     """
-    Computes the number of events with total sales above a given threshold 
-    for a given period (monthly or ytd), year, and month.
+    Computes the number of events with total sales above a given threshold for the monthly
+    and ytd periods of a given year and month, and the same periods of the prior year.
+
+    All four windows are counted with a single aggregation.
 
     Args:
-        period (str): The period for which to compute the number of events. Can be "monthly" or "ytd"
         year (int): The year for which to compute the number of events.
         month (int): The month for which to compute the number of events.
         threshold (float): The minimum total sales required for an event to be included in the count.
 
     Returns:
-        list[dict]: A list containing two dictionaries. 
-        The first dictionary contains the name "Current" and the number of events for the current year.
-        The second dictionary contains the name "Prior Year" and the number of events for the prior year.
+        dict: The "num_high_value_events_monthly" and "num_high_value_events_ytd" counts, each a list
+        of two dictionaries. The first dictionary contains the name "Current" and the number of events
+        for the current year. The second dictionary contains the name "Prior Year" and the number of
+        events for the prior year.
     """
-    current_start, current_end = dates.get_period_range(period, month, year)
-    py_start, py_end = dates.get_period_range(period, month, year - 1)
-    current = event_service.get_num_events_above_threshold(current_start, current_end, threshold)
-    prior_year = event_service.get_num_events_above_threshold(py_start, py_end, threshold)
+    windows = {}
+    for period in ("monthly", "ytd"):
+        for name, comparison in (("current", "current"), ("prior_year", "same_period_last_year")):
+            windows[f"{period}_{name}"] = dates.get_comparison_range(comparison, period, month, year)
+    counts = event_service.get_window_num_events_above_threshold(windows, threshold)
 
-    return [
-        {
-            "name": "Current",
-            "num_events": current
-        },
-        {
-            "name": "Prior Year",
-            "num_events": prior_year
-        }
-    ]
+    return {
+        f"num_high_value_events_{period}": [
+            {
+                "name": "Current",
+                "num_events": counts.get(f"{period}_current", 0)
+            },
+            {
+                "name": "Prior Year",
+                "num_events": counts.get(f"{period}_prior_year", 0)
+            }
+        ]
+        for period in ("monthly", "ytd")
+    }
 
 
-def compute_avg_event_sales(period: str, year: int, month: int) -> float:
+def compute_avg_event_sales(values: dict[Metric, Any], period: str) -> list[dict]:
     """
-    Computes the average total sales per event for a given period (monthly or ytd), year, and month.
+    Assembles the average total sales per event for a given period (mtd or ytd) and the same period of the prior year.
 
     Args:
-        period (str): The period for which to compute the average total sales per event. Can be "monthly" or "ytd"
-        year (int): The year for which to compute the average total sales per event.
-        month (int): The month for which to compute the average total sales per event.
+        values (dict[Metric, Any]): The computed banquet page metrics.
+        period (str): The period for which to assemble the average total sales per event. Can be "mtd" or "ytd".
 
     Returns:
         list[dict]: A list containing two dictionaries.
         The first dictionary contains the name "Current" and the average total sales per event for the current year.
         The second dictionary contains the name "Prior Year" and the average total sales per event for the prior year.
     """
-    current_start, current_end = dates.get_period_range(period, month, year)
-    py_start, py_end = dates.get_period_range(period, month, year - 1)
-    current = event_service.get_average_event_sales(current_start, current_end)
-    prior_year = event_service.get_average_event_sales(py_start, py_end)
-
     return [
         {
             "name": "Current",
-            "avg_sales": current
+            "avg_sales": values[Metric("avg_sales", "events", period, "actual")]
         },
         {
             "name": "Prior Year",
-            "avg_sales": prior_year
+            "avg_sales": values[Metric("avg_sales", "events", period, "prior_year")]
         }
     ]
 
@@ -229,7 +360,7 @@ def get_top_n_events(period: str, year: int, month: int, n: int) -> list[dict]:
     ]
 
 
-def get_events_by_type(period: str, year: int, month: int) -> pd.DataFrame:
+def get_events_by_type(period: str, year: int, month: int) -> "pd.DataFrame":
     """
     Retrieves a pandas DataFrame containing the event type breakdown for a given period (monthly or ytd), year, and month.
 
@@ -241,6 +372,8 @@ def get_events_by_type(period: str, year: int, month: int) -> pd.DataFrame:
     Returns:
         pd.DataFrame: A pandas DataFrame containing the event type breakdown, with columns for the event type and total sales.
     """
+    import pandas as pd
+
     start, end = dates.get_period_range(period, month, year)
     events_by_type_data = event_service.get_event_type_breakdown(start, end)
     df = pd.DataFrame(events_by_type_data)
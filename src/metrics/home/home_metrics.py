@@ -1,27 +1,81 @@
 # executes aggregates and structures results for home page callback
 
+from typing import Any
+
 from src.metrics import metrics_helpers
+from src.metrics.metric_registry import Metric, compute_metrics, compute_monthly_metrics, get_comparisons
 from src.metrics.metrics_helpers import compute_percentage, compute_total
 from src.utils import dates
-from src.services import budget, event_service, restaurant_service
+from src.services import event_service, restaurant_service
+from src.utils.cache import page_data
+
 
+# per-card data paths: each card's callback loads only what it shows, and cards
+# sharing a path are coalesced and cached by page_data
 
-def get_home_page_data(month: int, year: int) -> dict:
+@page_data("get_home_kpi_data", 8)
+def get_home_kpi_data(month: int, year: int) -> dict:
         """
-        Retrieves all Home dashboard visual components based on selected month/year.
+        Retrieves the Home dashboard revenue, cost, COGS and profit metrics (every card but the top items).
 
         Args:
-            month (int): The month for which to retrieve the Home dashboard visual components.
-            year (int): The year for which to retrieve the Home dashboard visual components.
+            month (int): The month for which to retrieve the metrics.
+            year (int): The year for which to retrieve the metrics.
 
         Returns:
-            dict: A dictionary containing the monthly and year-to-date Home page metrics.
+            dict: The revenue, cost, COGS percentage and gross profit entries of the Home page data.
+        """
+        return assemble_home_kpi_data(month, year)
+
+
+@page_data("get_home_top_menu_items", 2)
+def get_home_top_menu_items(month: int, year: int) -> dict:
         """
-        monthly_revenue_metrics = get_combined_monthly_revenue_metrics(month, year)
-        py_monthly_revenue_metrics = get_combined_monthly_revenue_metrics(month, year - 1)
-        ytd_revenue_metrics = get_combined_ytd_revenue_metrics(month, year)
-        py_ytd_revenue_metrics = get_combined_ytd_revenue_metrics(month, year - 1)
-        ytd_cost_metrics = get_combined_ytd_cost_metrics(month, year)
+        Retrieves the YTD top selling menu item of the year and the prior year.
+
+        Args:
+            month (int): The month for which to retrieve the top menu items.
+            year (int): The year for which to retrieve the top menu items.
+
+        Returns:
+            dict: The 'top_menu_item' and 'py_top_menu_item' entries of the Home page data.
+        """
+        return assemble_home_top_menu_items(month, year)
+
+
+@page_data("get_home_top_events", 2)
+def get_home_top_events(month: int, year: int) -> dict:
+        """
+        Retrieves the YTD top selling event of the year and the prior year.
+
+        Args:
+            month (int): The month for which to retrieve the top events.
+            year (int): The year for which to retrieve the top events.
+
+        Returns:
+            dict: The 'top_selling_event' and 'py_top_selling_event' entries of the Home page data.
+        """
+        return assemble_home_top_events(month, year)
+
+
+def assemble_home_kpi_data(month: int, year: int) -> dict:
+        """
+        Computes and assembles the Home dashboard's scalar metrics with the planner.
+
+        Args:
+            month (int): The calendar month (1-12).
+            year (int): The calendar year.
+
+        Returns:
+            dict: The monthly and YTD revenue metrics for the current and prior year, the YTD cost
+            metrics, the actual and budgeted YTD gross profit and the COGS percentages.
+        """
+        values = compute_metrics(get_home_metrics(), month, year)
+        monthly_revenue_metrics = get_combined_monthly_revenue_metrics(values, month, year)
+        py_monthly_revenue_metrics = get_combined_monthly_revenue_metrics(values, month, year, prior_year=True)
+        ytd_revenue_metrics = get_combined_ytd_revenue_metrics(values, month, year)
+        py_ytd_revenue_metrics = get_combined_ytd_revenue_metrics(values, month, year, prior_year=True)
+        ytd_cost_metrics = get_combined_ytd_cost_metrics(values, month, year)
         ytd_gross_profit = metrics_helpers.compute_gross_profit(
             ytd_revenue_metrics['total_revenue'],
             ytd_cost_metrics['actual_total_costs'],
@@ -31,10 +85,6 @@ def get_home_page_data(month: int, year: int) -> dict:
             ytd_cost_metrics['budgeted_total_costs']
         )
         cogs_pct_metrics = compute_cogs_pct_metrics(ytd_revenue_metrics, ytd_cost_metrics)
-        top_menu_item = get_top_menu_item(period="ytd", month=month, year=year)
-        py_top_menu_item = get_top_menu_item(period="ytd", month=month, year=year - 1)
-        top_selling_event = get_top_event(period="ytd", month=month, year=year)
-        py_top_selling_event = get_top_event(period="ytd", month=month, year=year - 1)
 
         return {
             'monthly_revenue_metrics': monthly_revenue_metrics,
@@ -45,36 +95,122 @@ def get_home_page_data(month: int, year: int) -> dict:
             'ytd_gross_profit': ytd_gross_profit,
             'budgeted_ytd_gross_profit': budgeted_ytd_gross_profit,
             'cogs_pct_metrics': cogs_pct_metrics,
-            'top_menu_item': top_menu_item,
-            'py_top_menu_item': py_top_menu_item,
-            'top_selling_event': top_selling_event,
-            'py_top_selling_event': py_top_selling_event
         }
 
 
-def get_combined_monthly_revenue_metrics(month: int, year: int) -> dict:
+def assemble_home_top_menu_items(month: int, year: int) -> dict:
+        """Retrieves the YTD top selling menu item of the year and the prior year."""
+        return {
+            'top_menu_item': get_top_menu_item(period="ytd", month=month, year=year),
+            'py_top_menu_item': get_top_menu_item(period="ytd", month=month, year=year - 1),
+        }
+
+
+def assemble_home_top_events(month: int, year: int) -> dict:
+        """Retrieves the YTD top selling event of the year and the prior year."""
+        return {
+            'top_selling_event': get_top_event(period="ytd", month=month, year=year),
+            'py_top_selling_event': get_top_event(period="ytd", month=month, year=year - 1),
+        }
+
+
+@page_data("get_home_trend_data", 4, cached=False)
+def get_home_trend_data(year: int) -> dict:
+        """
+        Retrieves the Home dashboard metrics for every month of a year at once, for trend charts.
+
+        Args:
+            year (int): The year for which to retrieve the Home dashboard metrics.
+
+        Returns:
+            dict: The same monthly and year-to-date metrics as get_home_kpi_data, each value
+            a numpy array of the 12 monthly values (January first). Top items are not included.
+        """
+        import numpy as np
+
+        values = compute_monthly_metrics(get_home_metrics(), year)
+        months = np.arange(1, 13)
+        ytd_revenue_metrics = get_combined_ytd_revenue_metrics(values, months, year)
+        ytd_cost_metrics = get_combined_ytd_cost_metrics(values, months, year)
+
+        return {
+            'monthly_revenue_metrics': get_combined_monthly_revenue_metrics(values, months, year),
+            'py_monthly_revenue_metrics': get_combined_monthly_revenue_metrics(values, months, year, prior_year=True),
+            'ytd_revenue_metrics': ytd_revenue_metrics,
+            'py_ytd_revenue_metrics': get_combined_ytd_revenue_metrics(values, months, year, prior_year=True),
+            'ytd_cost_metrics': ytd_cost_metrics,
+            'ytd_gross_profit': metrics_helpers.compute_gross_profit(
+                ytd_revenue_metrics['total_revenue'],
+                ytd_cost_metrics['actual_total_costs'],
+            ),
+            'budgeted_ytd_gross_profit': metrics_helpers.compute_gross_profit(
+                ytd_revenue_metrics['budgeted_revenue'],
+                ytd_cost_metrics['budgeted_total_costs']
+            ),
+            'cogs_pct_metrics': compute_cogs_pct_metrics(ytd_revenue_metrics, ytd_cost_metrics),
+        }
+
+
+def get_home_metrics() -> list[Metric]:
+    """
+    Declares the scalar metrics of the home page for the planner.
+
+    Returns:
+        list[Metric]: The revenue metrics for the current and prior year, and the
+        current year's cost metrics.
+    """
+    metrics = []
+    for prior_year in (False, True):
+        actual, budgeted = get_comparisons(prior_year)
+        metrics += [
+            Metric("sales", "combined", "mtd", budgeted),
+            Metric("sales", "restaurant", "mtd", actual),
+            Metric("sales", "events", "mtd", actual),
+            Metric("sales", "combined", "ytd", budgeted),
+            Metric("sales", "restaurant", "ytd", actual),
+            Metric("sales", "restaurant", "ytd", budgeted),
+            Metric("sales", "events", "ytd", actual),
+            Metric("sales", "events", "ytd", budgeted),
+        ]
+    metrics += [
+        Metric("cost", "restaurant", "ytd", "actual"),
+        Metric("cost", "events", "ytd", "actual"),
+        Metric("cost", "restaurant", "ytd", "budget"),
+        Metric("cost", "events", "ytd", "budget"),
+    ]
+    return metrics
+
+
+def get_combined_monthly_revenue_metrics(
+        values: dict[Metric, Any],
+        month: int,
+        year: int,
+        prior_year: bool = False
+) -> dict:
     """
-    Retrieves monthly revenue metrics for the given month and year.
+    Assembles monthly revenue metrics for the given month and year.
 
     Args:
+        values (dict[Metric, Any]): The computed home page metrics.
         month (int): The calendar month (1-12).
-        year (int): The calendar year.
+        year (int): The page's calendar year.
+        prior_year (bool): Whether to assemble the prior year's metrics. Defaults to False.
 
     Returns:
         dict: A dictionary containing the budgeted revenue, restaurant revenue, event revenue, total revenue,
         and variance for the given period.
     """
-    start, end = dates.monthly_date_range(month, year)
+    actual, budgeted = get_comparisons(prior_year)
 
-    budgeted_revenue = budget.combined_budget_service.get_combined_monthly_budgeted_revenue(month, year)
-    restaurant_revenue = restaurant_service.get_total_restaurant_sales(start, end)
-    events_revenue = event_service.get_total_event_sales(start, end)
+    budgeted_revenue = values[Metric("sales", "combined", "mtd", budgeted)]
+    restaurant_revenue = values[Metric("sales", "restaurant", "mtd", actual)]
+    events_revenue = values[Metric("sales", "events", "mtd", actual)]
     total_revenue = compute_total(restaurant_revenue, events_revenue)
     variance = total_revenue - budgeted_revenue
 
     return {
         'month': month,
-        'year': year,
+        'year': year - 1 if prior_year else year,
         'budgeted_revenue': budgeted_revenue,
         'restaurant_revenue': restaurant_revenue,
         'events_revenue': events_revenue,
@@ -83,31 +219,38 @@ def get_combined_monthly_revenue_metrics(month: int, year: int) -> dict:
     }
 
 
-def get_combined_ytd_revenue_metrics(month: int, year: int) -> dict:
+def get_combined_ytd_revenue_metrics(
+        values: dict[Metric, Any],
+        month: int,
+        year: int,
+        prior_year: bool = False
+) -> dict:
     """
-    Retrieves year-to-date (YTD) revenue metrics for the given month and year.
+    Assembles year-to-date (YTD) revenue metrics for the given month and year.
 
     Args:
+        values (dict[Metric, Any]): The computed home page metrics.
         month (int): The calendar month (1-12).
-        year (int): The calendar year.
+        year (int): The page's calendar year.
+        prior_year (bool): Whether to assemble the prior year's metrics. Defaults to False.
 
     Returns:
         dict: A dictionary containing the budgeted revenue, restaurant revenue, event revenue, total revenue,
         and variance for the given period.
     """
-    start, end = dates.ytd_date_range(month, year)
+    actual, budgeted = get_comparisons(prior_year)
 
-    budgeted_revenue = budget.combined_budget_service.get_combined_ytd_budgeted_revenue(month, year)
-    restaurant_revenue = restaurant_service.get_total_restaurant_sales(start, end)
-    budgeted_restaurant_revenue = budget.restaurant_budget_service.get_ytd_budgeted_restaurant_revenue(month, year)
-    event_revenue = event_service.get_total_event_sales(start, end)
-    budgeted_event_revenue = budget.event_budget_service.get_ytd_budgeted_event_revenue(month, year)
+    budgeted_revenue = values[Metric("sales", "combined", "ytd", budgeted)]
+    restaurant_revenue = values[Metric("sales", "restaurant", "ytd", actual)]
+    budgeted_restaurant_revenue = values[Metric("sales", "restaurant", "ytd", budgeted)]
+    event_revenue = values[Metric("sales", "events", "ytd", actual)]
+    budgeted_event_revenue = values[Metric("sales", "events", "ytd", budgeted)]
     total_revenue = compute_total(restaurant_revenue, event_revenue)
     variance = total_revenue - budgeted_revenue
 
     return {
         'month': month,
-        'year': year,
+        'year': year - 1 if prior_year else year,
         'budgeted_revenue': budgeted_revenue,
         'restaurant_revenue': restaurant_revenue,
         'budgeted_restaurant_revenue': budgeted_restaurant_revenue,
@@ -118,11 +261,12 @@ def get_combined_ytd_revenue_metrics(month: int, year: int) -> dict:
     }
 
 
-def get_combined_ytd_cost_metrics(month: int, year: int) -> dict:
+def get_combined_ytd_cost_metrics(values: dict[Metric, Any], month: int, year: int) -> dict:
     """
-    Retrieves year-to-date (YTD) cost metrics for the given month and year.
+    Assembles year-to-date (YTD) cost metrics for the given month and year.
 
     Args:
+        values (dict[Metric, Any]): The computed home page metrics.
         month (int): The calendar month (1-12).
         year (int): The calendar year.
 
@@ -130,13 +274,11 @@ def get_combined_ytd_cost_metrics(month: int, year: int) -> dict:
         dict: A dictionary containing the restaurant costs, event costs, actual total costs,
         budgeted restaurant costs, budgeted event costs, and budgeted total costs for the given period.
     """
-    start, end = dates.ytd_date_range(month, year)
-
-    restaurant_costs = restaurant_service.get_total_restaurant_costs(start, end)
-    event_costs = event_service.get_total_event_costs(start, end)
+    restaurant_costs = values[Metric("cost", "restaurant", "ytd", "actual")]
+    event_costs = values[Metric("cost", "events", "ytd", "actual")]
     actual_total_costs = compute_total(restaurant_costs, event_costs)
-    budgeted_restaurant_costs = budget.restaurant_budget_service.get_ytd_budgeted_restaurant_cost(month, year)
-    budgeted_event_costs = budget.event_budget_service.get_ytd_budgeted_event_cost(month, year)
+    budgeted_restaurant_costs = values[Metric("cost", "restaurant", "ytd", "budget")]
+    budgeted_event_costs = values[Metric("cost", "events", "ytd", "budget")]
     budgeted_total_costs = compute_total(budgeted_restaurant_costs, budgeted_event_costs)
 
     return {
@@ -0,0 +1,343 @@
+# declarative page metrics and the planner that batches their queries
+#
+# pages declare the scalar metrics they need as Metric(measure, department,
+# period, comparison) and call compute_metrics() once. The planner merges the
+# requested metrics into:
+#   - one materialized monthly actuals read per year (see refresh_monthly_actuals)
+#   - one $facet aggregation per source collection for whatever is not
+#     materialized, with one facet per date range
+#   - one budget read per year
+# and returns the value of every metric, which the page assembles into the
+# dict shapes its builders expect.
+#
+# compute_monthly_metrics() computes the same metrics for every month of a year
+# at once (one $group by month per source collection and one budget read per
+# year), returning numpy arrays of 12 monthly values for trend charts.
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Type
+
+from mongoengine import Document
+
+from src.models import Budget, Event, RestaurantSale
+from src.services import actuals_service
+from src.services.budget.budget_helpers import get_budget_lines
+from src.services.budget.combined_budget_service import get_annual_budget_docs
+from src.services.query_helpers import get_monthly_totals, get_period_totals
+from src.utils import dates
+
+# metric period -> dates period
+PERIODS = {"mtd": "monthly", "ytd": "ytd"}
+
+# comparison -> (years before the page year, whether the value is budgeted)
+COMPARISONS = {
+    "actual": (0, False),
+    "budget": (0, True),
+    "prior_year": (1, False),
+    "prior_year_budget": (1, True),
+}
+
+
+def get_comparisons(prior_year: bool = False) -> tuple[str, str]:
+    """Returns the (actual, budgeted) comparisons of the current or prior year."""
+    return ("prior_year", "prior_year_budget") if prior_year else ("actual", "budget")
+
+
+@dataclass(frozen=True, slots=True)
+class Metric:
+    """
+    One scalar page metric.
+
+    measure is what is computed (e.g. "sales", "food_cost", "count"),
+    department where (a source, or "combined"), period "mtd" or "ytd", and
+    comparison one of COMPARISONS, relative to the page's month and year.
+    """
+    measure: str
+    department: str
+    period: str = "mtd"
+    comparison: str = "actual"
+
+
+@dataclass(frozen=True, slots=True)
+class Source:
+    """A collection metrics are computed from, and the measures it supports."""
+    model: Type[Document]
+    date_field: str
+    # measure -> $group accumulator
+    accumulators: dict[str, Any]
+
+
+def category_sum(category: str, field: str) -> dict:
+    """Returns an accumulator summing a restaurant sale field for one menu category."""
+    return {"$sum": {"$cond": [{"$eq": ["$category", category]}, f"${field}", 0]}}
+
+
+SOURCES = {
+    "restaurant": Source(RestaurantSale, "sales_date", {
+        "sales": {"$sum": "$total_sales"},
+        "cost": {"$sum": "$total_cost"},
+        "food_sales": category_sum("Food", "total_sales"),
+        "bev_sales": category_sum("Beverage", "total_sales"),
+        "food_cost": category_sum("Food", "total_cost"),
+        "bev_cost": category_sum("Beverage", "total_cost"),
+    }),
+    "events": Source(Event, "event_date", {
+        "sales": {"$sum": "$total_sales"},
+        "cost": {"$sum": "$total_cost"},
+        "food_sales": {"$sum": "$food_sales"},
+        "bev_sales": {"$sum": "$bev_sales"},
+        "food_cost": {"$sum": "$food_cost"},
+        "bev_cost": {"$sum": "$bev_cost"},
+        "count": {"$sum": 1},
+        "avg_sales": {"$avg": "$total_sales"},
+    }),
+}
+
+# departments whose measures are the sum of several sources
+COMBINED_DEPARTMENTS = {"combined": ("restaurant", "events")}
+
+# value of a measure over a date range without documents
+EMPTY_VALUES = {"count": 0}
+
+# measures rounded as their services round them
+ROUNDED_MEASURES = {"avg_sales": 2}
+
+# averages computed monthly as (sum measure, count measure), so their YTD values
+# can be accumulated
+RATIO_MEASURES = {"avg_sales": ("sales", "count")}
+
+# budget lines summed for each (department, measure)
+BUDGET_LINES = {
+    ("restaurant", "sales"): ("food_sales", "bev_sales"),
+    ("restaurant", "food_sales"): ("food_sales",),
+    ("restaurant", "bev_sales"): ("bev_sales",),
+    ("restaurant", "cost"): ("food_cost", "bev_cost"),
+    ("restaurant", "food_cost"): ("food_cost",),
+    ("restaurant", "bev_cost"): ("bev_cost",),
+    ("events", "sales"): ("event_sales",),
+    ("events", "cost"): ("event_cost",),
+    ("combined", "sales"): ("total_sales",),
+    ("combined", "cost"): ("total_cost",),
+}
+
+# materialized monthly actuals fields summed for each (source, measure)
+ACTUALS_FIELDS = {
+    ("restaurant", "sales"): ("food_sales", "bev_sales"),
+    ("restaurant", "food_sales"): ("food_sales",),
+    ("restaurant", "bev_sales"): ("bev_sales",),
+    ("restaurant", "cost"): ("food_cost", "bev_cost"),
+    ("restaurant", "food_cost"): ("food_cost",),
+    ("restaurant", "bev_cost"): ("bev_cost",),
+    ("events", "sales"): ("event_sales",),
+    ("events", "cost"): ("event_cost",),
+}
+
+
+def get_sources(department: str) -> tuple[str, ...]:
+    """Returns the sources a department's actual values are computed from."""
+    return COMBINED_DEPARTMENTS.get(department, (department,))
+
+
+def validate_metric(metric: Metric) -> None:
+    """Raises ValueError if the registry cannot compute a metric."""
+    if metric.period not in PERIODS or metric.comparison not in COMPARISONS:
+        raise ValueError(f"Unsupported period or comparison: {metric}")
+    if COMPARISONS[metric.comparison][1]:
+        supported = (metric.department, metric.measure) in BUDGET_LINES
+    else:
+        supported = all(
+            source in SOURCES and metric.measure in SOURCES[source].accumulators
+            for source in get_sources(metric.department)
+        )
+        # only sums can be added across sources
+        supported = supported and (metric.department in SOURCES or metric.measure not in ROUNDED_MEASURES)
+    if not supported:
+        raise ValueError(f"Unsupported metric: {metric}")
+
+
+def compute_metrics(metrics: Iterable[Metric], month: int, year: int) -> dict[Metric, Any]:
+    """
+    Computes a set of page metrics with the fewest queries.
+
+    Args:
+        metrics (Iterable[Metric]): The metrics to compute.
+        month (int): The page's calendar month (1-12).
+        year (int): The page's calendar year.
+
+    Returns:
+        dict[Metric, Any]: The value of every requested metric.
+    """
+    metrics = list(dict.fromkeys(metrics))
+    for metric in metrics:
+        validate_metric(metric)
+
+    # actual values needed, as (source, measure, period, year)
+    needed = set()
+    budget_years = set()
+    for metric in metrics:
+        years_back, budgeted = COMPARISONS[metric.comparison]
+        if budgeted:
+            budget_years.add(year - years_back)
+        else:
+            needed.update(
+                (source, metric.measure, metric.period, year - years_back)
+                for source in get_sources(metric.department)
+            )
+
+    totals = get_materialized_totals(needed, month)
+    totals.update(get_live_totals(needed - set(totals), month))
+    budgets = {budget_year: get_budget_lines(Budget, month, budget_year) for budget_year in sorted(budget_years)}
+
+    values = {}
+    for metric in metrics:
+        years_back, budgeted = COMPARISONS[metric.comparison]
+        if budgeted:
+            lines = budgets[year - years_back][metric.period]
+            values[metric] = sum(lines.get(line, 0.0) for line in BUDGET_LINES[(metric.department, metric.measure)])
+        else:
+            values[metric] = sum(
+                totals[(source, metric.measure, metric.period, year - years_back)]
+                for source in get_sources(metric.department)
+            )
+    return values
+
+
+def get_materialized_totals(needed: set[tuple], month: int) -> dict[tuple, Any]:
+    """
+    Reads the needed sums from materialized monthly actuals, one read per year.
+
+    Years that are not fully materialized are left out, so they are computed live.
+    """
+    totals = {}
+    materialized = [key for key in needed if key[:2] in ACTUALS_FIELDS]
+    for year in sorted({key[3] for key in materialized}):
+        actuals = actuals_service.get_actuals(month, year)
+        if actuals is None:
+            continue
+        for source, measure, period, key_year in materialized:
+            if key_year == year:
+                fields = ACTUALS_FIELDS[(source, measure)]
+                totals[(source, measure, period, year)] = sum(actuals[period][field] for field in fields)
+    return totals
+
+
+def get_live_totals(needed: set[tuple], month: int) -> dict[tuple, Any]:
+    """
+    Computes the needed values from the source collections, one aggregation per source.
+
+    Every date range a source is needed for becomes a facet of the same aggregation,
+    and every facet computes all of the source's requested measures.
+    """
+    totals = {}
+    for name, source in SOURCES.items():
+        keys = [key for key in needed if key[0] == name]
+        if not keys:
+            continue
+
+        ranges = sorted({(period, year) for _, _, period, year in keys})
+        measures = sorted({measure for _, measure, _, _ in keys})
+        results = get_period_totals(
+            source.model,
+            source.date_field,
+            [dates.get_period_range(PERIODS[period], month, year) for period, year in ranges],
+            {measure: source.accumulators[measure] for measure in measures},
+        )
+
+        for key in keys:
+            _, measure, period, year = key
+            index = ranges.index((period, year))
+            result = results[index] if index < len(results) else {}
+            value = result.get(measure)
+            if value is None:
+                value = EMPTY_VALUES.get(measure, 0.0)
+            elif measure in ROUNDED_MEASURES:
+                value = round(value, ROUNDED_MEASURES[measure])
+            totals[key] = value
+    return totals
+
+
+def compute_monthly_metrics(metrics: Iterable[Metric], year: int) -> dict[Metric, Any]:
+    """
+    Computes a set of page metrics for every month of a year at once.
+
+    Each source collection is grouped by month once, covering every year the
+    metrics compare against, and each budget year is read once. YTD values are
+    the cumulative sums of the monthly values.
+
+    Args:
+        metrics (Iterable[Metric]): The metrics to compute.
+        year (int): The page's calendar year.
+
+    Returns:
+        dict[Metric, Any]: A numpy array of the 12 monthly values (January first) of
+        every requested metric.
+    """
+    import numpy as np
+
+    metrics = list(dict.fromkeys(metrics))
+    for metric in metrics:
+        validate_metric(metric)
+
+    # actual measures and years needed per source
+    needed: dict[str, tuple[set, set]] = {}
+    budget_years = set()
+    for metric in metrics:
+        years_back, budgeted = COMPARISONS[metric.comparison]
+        if budgeted:
+            budget_years.add(year - years_back)
+            continue
+        for source in get_sources(metric.department):
+            measures, years = needed.setdefault(source, (set(), set()))
+            measures.update(RATIO_MEASURES.get(metric.measure, (metric.measure,)))
+            years.add(year - years_back)
+
+    # (source, measure, year) -> monthly totals
+    monthly = {}
+    for name, (measures, years) in needed.items():
+        source = SOURCES[name]
+        for measure in measures:
+            for key_year in years:
+                monthly[(name, measure, key_year)] = np.zeros(12, dtype=type(EMPTY_VALUES.get(measure, 0.0)))
+        rows = get_monthly_totals(
+            source.model,
+            sorted(years),
+            {measure: source.accumulators[measure] for measure in sorted(measures)},
+        )
+        for row in rows:
+            for measure in measures:
+                monthly[(name, measure, row['year'])][row['month'] - 1] = row.get(measure) or 0
+
+    # budget year -> line -> monthly budget
+    budgets = {}
+    for budget_year in sorted(budget_years):
+        docs = get_annual_budget_docs(budget_year)
+        lines = {line for lines in BUDGET_LINES.values() for line in lines}
+        budgets[budget_year] = {line: np.zeros(12) for line in lines}
+        for doc in docs:
+            for line in lines:
+                budgets[budget_year][line][doc['month'] - 1] = doc.get(line) or 0
+
+    def accumulate(values, period):
+        return np.cumsum(values) if period == "ytd" else values
+
+    values = {}
+    for metric in metrics:
+        years_back, budgeted = COMPARISONS[metric.comparison]
+        metric_year = year - years_back
+        if budgeted:
+            lines = BUDGET_LINES[(metric.department, metric.measure)]
+            values[metric] = accumulate(sum(budgets[metric_year][line] for line in lines), metric.period)
+        elif metric.measure in RATIO_MEASURES:
+            total_measure, count_measure = RATIO_MEASURES[metric.measure]
+            (source,) = get_sources(metric.department)
+            totals = accumulate(monthly[(source, total_measure, metric_year)], metric.period)
+            counts = accumulate(monthly[(source, count_measure, metric_year)], metric.period)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratios = np.where(counts > 0, totals / counts, EMPTY_VALUES.get(metric.measure, 0.0))
+            values[metric] = np.round(ratios, ROUNDED_MEASURES.get(metric.measure, 2))
+        else:
+            values[metric] = accumulate(
+                sum(monthly[(source, metric.measure, metric_year)] for source in get_sources(metric.department)),
+                metric.period,
+            )
+    return values
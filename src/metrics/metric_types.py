@@ -0,0 +1,70 @@
+# compact result types for metric payloads (slotted dataclasses instead of nested string-keyed dicts)
+
+from dataclasses import dataclass, is_dataclass
+from typing import Any, Generic, TypeVar
+
+# block type held by a MtdYtd pair
+T = TypeVar("T")
+
+
+def slots_to_dict(value: Any) -> Any:
+    """
+    Converts a tree of slotted metric dataclasses to nested dictionaries.
+
+    Reads each instance's slots directly instead of using dataclasses.asdict,
+    which deep-copies every value.
+    """
+    if is_dataclass(value) and hasattr(type(value), "__slots__"):
+        return {name: slots_to_dict(getattr(value, name)) for name in type(value).__slots__}
+    return value
+
+
+@dataclass(slots=True)
+class RevenueBlock:
+    """Restaurant revenue by category for one period."""
+    food_revenue: float = 0.0
+    beverage_revenue: float = 0.0
+    total_revenue: float = 0.0
+
+
+@dataclass(slots=True)
+class CostBlock:
+    """Restaurant cost by category, and cost as a percentage of revenue, for one period."""
+    food_cost: float = 0.0
+    beverage_cost: float = 0.0
+    total_cost: float = 0.0
+    food_cost_pct: float | None = None
+    beverage_cost_pct: float | None = None
+
+
+@dataclass(slots=True)
+class ProfitBlock:
+    """Gross profit for one period."""
+    gross_profit: float = 0.0
+
+
+@dataclass(slots=True)
+class MtdYtd(Generic[T]):
+    """A pair of month-to-date and year-to-date blocks."""
+    mtd: T
+    ytd: T
+
+
+@dataclass(slots=True)
+class StatementScenario:
+    """Revenue, cost and profit for one scenario (actual, budgeted or prior year)."""
+    revenue: MtdYtd[RevenueBlock]
+    cost: MtdYtd[CostBlock]
+    profit: MtdYtd[ProfitBlock]
+
+
+@dataclass(slots=True)
+class StatementMetrics:
+    """All values shown on the restaurant statement for one month."""
+    actual: StatementScenario
+    budgeted: StatementScenario
+    prior_year: StatementScenario
+
+    def to_dict(self) -> dict:
+        """Returns the metrics as nested dictionaries (e.g. for JSON serialization)."""
+        return slots_to_dict(self)
@@ -1,4 +1,9 @@
 # contains helper functions for metrics operations
+#
+# compute_percentage, compute_total and compute_gross_profit also accept numpy
+# arrays (e.g. one value per month), computing element-wise.
+
+from typing import Any
 
 def format_metric(value: float | None, symbol: str="$", precision: int = 2) -> str:
     """
@@ -39,7 +44,11 @@ def compute_percentage(numerator: float | None,
 
     Returns:
         float | None: The computed percentage, or None if either the numerator or denominator is None or 0.
+        Arrays are computed element-wise by compute_percentages.
     """
+    if is_array(numerator) or is_array(denominator):
+        return compute_percentages(numerator, denominator, precision, as_fraction)
+
     if numerator is None or denominator in (None, 0):
         return None
 
@@ -50,6 +59,36 @@ def compute_percentage(numerator: float | None,
     return round(value, precision)
 
 
+def is_array(value: Any) -> bool:
+    """Returns True for numpy arrays (and other array-likes such as pandas Series)."""
+    return hasattr(value, "__array__")
+
+
+def compute_percentages(numerators: Any, denominators: Any, precision: int = 2, as_fraction: bool = False) -> Any:
+    """
+    Computes element-wise percentages of arrays of numerators and denominators.
+
+    Args:
+        numerators (array-like): The numerators for the percentage calculation.
+        denominators (array-like): The denominators for the percentage calculation.
+        precision (int): The number of decimal places to round to, defaults to 2.
+        as_fraction (bool): Whether to return the percentages as fractions of 1, defaults to False.
+
+    Returns:
+        np.ndarray: The computed percentages, NaN where a numerator or denominator is
+        missing (NaN) or the denominator is 0.
+    """
+    import numpy as np
+
+    numerators = np.asarray(numerators, dtype=float)
+    denominators = np.asarray(denominators, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percents = np.where(denominators != 0, numerators / denominators * 100, np.nan)
+
+    values = percents / 100 if as_fraction else percents
+    return np.round(values, precision)
+
+
 def compute_total(a: float | None, b: float | None) -> float:
     """
     Computes the total of two given values, treating None as 0.
@@ -1,13 +1,18 @@
 # executes aggregates and structures results for restaurant pages callbacks
 
-import pandas as pd
+from typing import TYPE_CHECKING
 
 from src.components.core.ui_helpers import get_variance_color
 from src.services import restaurant_service
 from src.utils import dates
 from src.utils.constants import DAYS_OF_WEEK
+from src.utils.cache import page_data
 
+if TYPE_CHECKING:
+    import pandas as pd
 
+
+@page_data("get_restaurant_snapshot_page_data", 5)
 def get_restaurant_snapshot_page_data( month: int, year: int) -> dict:
     """
     Retrieves aggregated data for the restaurant snapshot page.
@@ -53,7 +58,7 @@ def get_avg_sales_by_day(period: str, month: int, year: int) -> list[dict]:
     ]
 
 
-def get_sales_by_category(period: str, month: int, year: int) -> pd.DataFrame:
+def get_sales_by_category(period: str, month: int, year: int) -> "pd.DataFrame":
     """
     Retrieves the total restaurant sales grouped by category within a given date range.
 
@@ -65,6 +70,8 @@ def get_sales_by_category(period: str, month: int, year: int) -> pd.DataFrame:
     Returns:
         pd.DataFrame: A pandas DataFrame containing the category and total sales for each category.
     """
+    import pandas as pd
+
     start, end = dates.get_period_range(period, month, year)
     sales_by_category = restaurant_service.get_restaurant_sales_by_category(start, end)
     df = pd.DataFrame(sales_by_category)
@@ -110,24 +117,15 @@ def get_monthly_hot_or_cold_menu_items(month: int, year: int, limit: int, hot_it
     Returns:
         list[dict]: A list of dictionaries containing the name, percent change, and color of the top n selling menu items
     """
-    current_start, current_end = dates.get_period_range("monthly", month, year)
-
-    if month == 1:
-        prev_month = 12
-        prev_year = year - 1
-    else:
-        prev_month = month - 1
-        prev_year = year
-
-    prior_start, prior_end = dates.get_period_range("monthly", prev_month, prev_year)
+    windows = dates.get_comparison_ranges(
+        {"current": "current", "previous": "previous_period"}, "monthly", month, year
+    )
 
     sort_order = not hot_items
 
     hot_menu_items = restaurant_service.get_hot_or_cold_menu_items(
-        current_start,
-        current_end,
-        prior_start,
-        prior_end,
+        *windows["current"],
+        *windows["previous"],
         limit,
         sort_by_ascending=sort_order
     )
@@ -1,10 +1,26 @@
-import datetime
+from dataclasses import fields, is_dataclass
+from typing import Any
+
+from src.metrics.metric_registry import Metric, compute_metrics, compute_monthly_metrics
+from src.metrics.metric_types import (
+    CostBlock, MtdYtd, ProfitBlock, RevenueBlock, StatementMetrics, StatementScenario
+)
 from src.metrics.metrics_helpers import compute_percentage, compute_total, compute_gross_profit
-from src.services import budget, restaurant_service
-from src.utils import dates
+from src.utils.cache import get_fresh_entry, page_data
+
+# statement scenarios and the comparison each is computed with
+SCENARIO_COMPARISONS = {
+    "actual": "actual",
+    "budgeted": "budget",
+    "prior_year": "prior_year",
+}
 
+# restaurant lines shown on the statement
+STATEMENT_MEASURES = ["food_sales", "bev_sales", "food_cost", "bev_cost"]
 
-def get_statement_metrics(month: int, year: int) -> dict:
+
+@page_data("get_statement_metrics", 5, cached=False)
+def get_statement_metrics(month: int, year: int) -> StatementMetrics:
     """
     Retrieves monthly statement metrics for the given month and year.
 
@@ -13,277 +29,194 @@ def get_statement_metrics(month: int, year: int) -> dict:
         year (int): The calendar year.
 
     Returns:
-        dict: A dictionary containing the actual revenue, cost, profit, budgeted revenue, cost, profit,
+        StatementMetrics: The actual revenue, cost, profit, budgeted revenue, cost, profit,
         and prior year's revenue, cost, and profit for the given period.
     """
-    mtd_start, mtd_end = dates.get_period_range("monthly", month, year)
-    ytd_start, ytd_end = dates.get_period_range("ytd", month, year)
-
-    actual_revenue = get_revenue_metrics(mtd_start, mtd_end, ytd_start, ytd_end)
-    actual_cost = get_cost_metrics(mtd_start, mtd_end, ytd_start, ytd_end, actual_revenue)
-    actual_profit = get_profit_metrics(actual_revenue, actual_cost)
-
-    budgeted_revenue = get_budgeted_revenue_metrics(month, year)
-    budgeted_cost = get_budgeted_cost_metrics(month, year, budgeted_revenue)
-    budgeted_profit = get_budgeted_profit_metrics(budgeted_revenue, budgeted_cost)
-
-    py_mtd_start, py_mtd_end = dates.get_period_range("monthly", month, year - 1)
-    py_ytd_start, py_ytd_end = dates.get_period_range("ytd", month, year - 1)
-
-    prior_year_revenue = get_revenue_metrics(py_mtd_start, py_mtd_end, py_ytd_start, py_ytd_end)
-    prior_year_cost = get_cost_metrics(py_mtd_start, py_mtd_end, py_ytd_start, py_ytd_end, prior_year_revenue)
-    prior_year_profit = get_profit_metrics(prior_year_revenue, prior_year_cost)
-
-    return {
-        "actual": {
-            "revenue": actual_revenue,
-            "cost": actual_cost,
-            "profit": actual_profit
-        },
-        "budgeted": {
-            "revenue": budgeted_revenue,
-            "cost": budgeted_cost,
-            "profit": budgeted_profit
-        },
-        "prior_year": {
-            "revenue": prior_year_revenue,
-            "cost": prior_year_cost,
-            "profit": prior_year_profit
-        }
-    }
-        
-
-def get_revenue_metrics(mtd_start: datetime, mtd_end: datetime, ytd_start: datetime, ytd_end: datetime) -> dict:
+    values = compute_metrics(get_statement_metric_list(), month, year)
+    return StatementMetrics(**{
+        scenario: get_scenario(values, comparison)
+        for scenario, comparison in SCENARIO_COMPARISONS.items()
+    })
+
+
+@page_data("get_statement_trend_metrics", 2)
+def get_statement_trend_metrics(year: int) -> StatementMetrics:
     """
-    Retrieves monthly and year-to-date actual revenue metrics for the given period.
+    Retrieves statement metrics for every month of a year at once, for trend charts.
 
     Args:
-        mtd_start (datetime): The start date of the monthly period.
-        mtd_end (datetime): The end date of the monthly period.
-        ytd_start (datetime): The start date of the year-to-date period.
-        ytd_end (datetime): The end date of the year-to-date period.
+        year (int): The calendar year.
 
     Returns:
-        dict: A dictionary containing the monthly and year-to-date actual revenue metrics.
+        StatementMetrics: The same metrics as get_statement_metrics, each value a numpy
+        array of the 12 monthly values (January first).
     """
-    mtd_revenue = restaurant_service.get_restaurant_sales_by_category(mtd_start, mtd_end)
-    mtd_revenue_map = {category["_id"]: category["total_sales"] for category in mtd_revenue}
-    mtd_food_revenue = mtd_revenue_map.get("Food", 0)
-    mtd_bev_revenue = mtd_revenue_map.get("Beverage", 0)
-    mtd_total_revenue = compute_total(mtd_food_revenue, mtd_bev_revenue)
-
-    ytd_revenue = restaurant_service.get_restaurant_sales_by_category(ytd_start, ytd_end)
-    ytd_revenue_map = {category["_id"]: category["total_sales"] for category in ytd_revenue}
-    ytd_food_revenue = ytd_revenue_map.get("Food", 0)
-    ytd_bev_revenue = ytd_revenue_map.get("Beverage", 0)
-    ytd_total_revenue = compute_total(ytd_food_revenue, ytd_bev_revenue)
-
-    return {
-        "mtd": {
-            "food_revenue": mtd_food_revenue,
-            "beverage_revenue": mtd_bev_revenue,
-            "total_revenue": mtd_total_revenue
-        },
-        "ytd": {
-            "food_revenue": ytd_food_revenue,
-            "beverage_revenue": ytd_bev_revenue,
-            "total_revenue": ytd_total_revenue
-        }
-    }
-
-
-def get_cost_metrics(
-        mtd_start: datetime,
-        mtd_end: datetime,
-        ytd_start: datetime,
-        ytd_end: datetime,
-        revenue_metrics: dict
-) -> dict:
+    return compute_statement_trend_metrics(year)
+
+
+def compute_statement_trend_metrics(year: int) -> StatementMetrics:
     """
-    Retrieves the monthly and year-to-date actual cost metrics.
+    Computes the statement trend metrics of a year, without the page cache.
 
     Args:
-        mtd_start (datetime): The start date of the monthly date range.
-        mtd_end (datetime): The end date of the monthly date range.
-        ytd_start (datetime): The start date of the year-to-date date range.
-        ytd_end (datetime): The end date of the year-to-date date range.
-        revenue_metrics (dict): A dictionary containing the monthly and year-to-date revenue metrics.
+        year (int): The calendar year.
 
     Returns:
-        dict: A dictionary containing the monthly and year-to-date actual cost metrics.
+        StatementMetrics: The statement metrics, each value an array of the 12 monthly values.
     """
-    mtd_costs = restaurant_service.get_restaurant_cost_by_category(mtd_start, mtd_end)
-    mtd_cost_map = {category["_id"]: category["total_cost"] for category in mtd_costs}
-    mtd_food_cost = mtd_cost_map.get("Food", 0)
-    mtd_bev_cost = mtd_cost_map.get("Beverage", 0)
-    mtd_total_cost = compute_total(mtd_food_cost, mtd_bev_cost)
-
-    mtd_food_cost_pct = compute_percentage(mtd_food_cost, revenue_metrics["mtd"]["food_revenue"])
-    mtd_bev_cost_pct = compute_percentage(mtd_bev_cost, revenue_metrics["mtd"]["beverage_revenue"])
-
-    ytd_costs = restaurant_service.get_restaurant_cost_by_category(ytd_start, ytd_end)
-    ytd_cost_map = {category["_id"]: category["total_cost"] for category in ytd_costs}
-    ytd_food_cost = ytd_cost_map.get("Food", 0)
-    ytd_bev_cost = ytd_cost_map.get("Beverage", 0)
-    ytd_total_cost = compute_total(ytd_food_cost, ytd_bev_cost)
-
-    ytd_food_cost_pct = compute_percentage(ytd_food_cost, revenue_metrics["ytd"]["food_revenue"])
-    ytd_bev_cost_pct = compute_percentage(ytd_bev_cost, revenue_metrics["ytd"]["beverage_revenue"])
-
-    return {
-        "mtd": {
-            "food_cost": mtd_food_cost,
-            "beverage_cost": mtd_bev_cost,
-            "total_cost": mtd_total_cost,
-            "food_cost_pct": mtd_food_cost_pct,
-            "beverage_cost_pct": mtd_bev_cost_pct
-        },
-        "ytd": {
-            "food_cost": ytd_food_cost,
-            "beverage_cost": ytd_bev_cost,
-            "total_cost": ytd_total_cost,
-            "food_cost_pct": ytd_food_cost_pct,
-            "beverage_cost_pct": ytd_bev_cost_pct
-        }
-    }
-
-
-def get_profit_metrics(revenue_metrics: dict, cost_metrics: dict) -> dict:
+    values = compute_monthly_metrics(get_statement_metric_list(), year)
+    return StatementMetrics(**{
+        scenario: get_scenario(values, comparison)
+        for scenario, comparison in SCENARIO_COMPARISONS.items()
+    })
+
+
+def get_statement_metrics_by_month(year: int) -> dict[int, StatementMetrics]:
     """
-    Retrieves profit metrics for the given period.
+    Computes the statement metrics of every month of a year, from one trend computation.
+
+    The page cache is not used: this runs in background callback jobs, whose
+    processes exit when the job is done, so results are reused through the
+    background callback manager instead.
 
     Args:
-        revenue_metrics (dict): A dictionary containing the monthly and year-to-date revenue metrics.
-        cost_metrics (dict): A dictionary containing the monthly and year-to-date cost metrics.
+        year (int): The calendar year.
 
     Returns:
-        dict: A dictionary containing the computed profit metrics for the given period.
+        dict[int, StatementMetrics]: The statement metrics of each calendar month (1-12).
     """
-    return {
-        "mtd": {
-            "gross_profit": compute_gross_profit(
-                revenue_metrics["mtd"]["total_revenue"],
-                cost_metrics["mtd"]["total_cost"]
-            )
-        },
-        "ytd": {
-            "gross_profit": compute_gross_profit(
-                revenue_metrics["ytd"]["total_revenue"],
-                cost_metrics["ytd"]["total_cost"])
-        }
-    }
-
-
-def get_budgeted_revenue_metrics(month: int, year: int) -> dict:
+    trend = compute_statement_trend_metrics(year)
+    return {month: select_month(trend, month) for month in range(1, 13)}
+
+
+def get_month_statement_metrics(month: int, year: int) -> StatementMetrics:
     """
-    Retrieves the budgeted revenue metrics for the given month and year.
+    Retrieves the statement metrics of one month, reusing the year's cached trend metrics.
+
+    If the year's trend metrics are cached and fresh, the month is read from them,
+    so it matches the statement table; otherwise only the month is computed.
 
     Args:
-        month (int): The month for which to retrieve the budgeted revenue metrics.
-        year (int): The year for which to retrieve the budgeted revenue metrics.
+        month (int): The calendar month (1-12).
+        year (int): The calendar year.
 
     Returns:
-        dict: A dictionary containing the budgeted revenue metrics for the given month and year.
+        StatementMetrics: The statement metrics of the month.
     """
-    mtd_budgeted_food_revenue = budget.restaurant_budget_service.get_monthly_budgeted_food_revenue(month, year)
-    mtd_budgeted_bev_revenue = budget.restaurant_budget_service.get_monthly_budgeted_bev_revenue(month, year)
-    mtd_budgeted_total_revenue = compute_total(mtd_budgeted_food_revenue, mtd_budgeted_bev_revenue)
-
-    ytd_budgeted_food_revenue = budget.restaurant_budget_service.get_ytd_budgeted_food_revenue(month, year)
-    ytd_budgeted_bev_revenue = budget.restaurant_budget_service.get_ytd_budgeted_bev_revenue(month, year)
-    ytd_budgeted_total_revenue = compute_total(ytd_budgeted_food_revenue, ytd_budgeted_bev_revenue)
-
-    return {
-        "mtd": {
-            "food_revenue": mtd_budgeted_food_revenue,
-            "beverage_revenue": mtd_budgeted_bev_revenue,
-            "total_revenue": mtd_budgeted_total_revenue
-        },
-        "ytd": {
-            "food_revenue": ytd_budgeted_food_revenue,
-            "beverage_revenue": ytd_budgeted_bev_revenue,
-            "total_revenue": ytd_budgeted_total_revenue
-        }
-    }
-
-
-def get_budgeted_cost_metrics(month: int, year: int, revenue_metrics: dict) -> dict:
+    entry = get_fresh_entry(get_statement_trend_metrics, year)
+    if entry is not None:
+        return select_month(entry.value, month)
+    return get_statement_metrics(month, year)
+
+
+def select_month(value: Any, month: int) -> Any:
     """
-    Retrieves budgeted cost metrics for the given month and year.
+    Selects one month from trend metrics, converting numpy values to Python values.
 
     Args:
-        month (int): The month for which to retrieve the budgeted cost metrics.
-        year (int): The year for which to retrieve the budgeted cost metrics.
-        revenue_metrics (dict): A dictionary containing the revenue metrics for the given month and year.
+        value (Any): A metric dataclass holding arrays of 12 monthly values, or one such array.
+        month (int): The calendar month (1-12).
 
     Returns:
-        dict: A dictionary containing the budgeted cost metrics for the given month and year.
+        Any: The same dataclass holding the month's values (None where the array is NaN), or the value.
+    """
+    if is_dataclass(value):
+        return type(value)(**{field.name: select_month(getattr(value, field.name), month) for field in fields(value)})
+    item = value[month - 1].item()
+    # NaN marks a missing value (e.g. a percentage of 0)
+    return None if item != item else item
+
+
+def get_statement_metric_list() -> list[Metric]:
     """
-    mtd_budgeted_food_cost = budget.restaurant_budget_service.get_monthly_budgeted_food_cost(month, year)
-    mtd_budgeted_bev_cost = budget.restaurant_budget_service.get_monthly_budgeted_bev_cost(month, year)
-    mtd_budgeted_total_cost = compute_total(mtd_budgeted_food_cost, mtd_budgeted_bev_cost)
+    Declares the scalar metrics of the statement page for the planner.
 
-    mtd_budgeted_food_cost_pct = compute_percentage(
-        mtd_budgeted_food_cost,
-        revenue_metrics["mtd"]["food_revenue"]
+    Returns:
+        list[Metric]: Every statement line for both periods and every scenario.
+    """
+    return [
+        Metric(measure, "restaurant", period, comparison)
+        for comparison in SCENARIO_COMPARISONS.values()
+        for period in ("mtd", "ytd")
+        for measure in STATEMENT_MEASURES
+    ]
+
+
+def get_scenario(values: dict[Metric, Any], comparison: str) -> StatementScenario:
+    """
+    Assembles the revenue, cost and profit metrics of one statement scenario.
+
+    Args:
+        values (dict[Metric, Any]): The computed statement metrics.
+        comparison (str): The scenario's comparison ("actual", "budget" or "prior_year").
+
+    Returns:
+        StatementScenario: The monthly and year-to-date revenue, cost and profit metrics.
+    """
+    revenue = MtdYtd(
+        mtd=get_revenue_block(values, "mtd", comparison),
+        ytd=get_revenue_block(values, "ytd", comparison),
     )
-    mtd_budgeted_bev_cost_pct = compute_percentage(
-        mtd_budgeted_bev_cost,
-        revenue_metrics["mtd"]["beverage_revenue"]
+    cost = MtdYtd(
+        mtd=get_cost_block(values, "mtd", comparison, revenue.mtd),
+        ytd=get_cost_block(values, "ytd", comparison, revenue.ytd),
     )
+    return StatementScenario(revenue, cost, get_profit_metrics(revenue, cost))
 
-    ytd_budgeted_food_cost = budget.restaurant_budget_service.get_ytd_budgeted_food_cost(month, year)
-    ytd_budgeted_bev_cost = budget.restaurant_budget_service.get_ytd_budgeted_bev_cost(month, year)
-    ytd_budgeted_total_cost = compute_total(ytd_budgeted_food_cost, ytd_budgeted_bev_cost)
 
-    ytd_budgeted_food_cost_pct = compute_percentage(
-        ytd_budgeted_food_cost,
-        revenue_metrics["ytd"]["food_revenue"]
-    )
-    ytd_budgeted_bev_cost_pct = compute_percentage(
-        ytd_budgeted_bev_cost,
-        revenue_metrics["ytd"]["beverage_revenue"]
+def get_revenue_block(values: dict[Metric, Any], period: str, comparison: str) -> RevenueBlock:
+    """
+    Assembles the revenue metrics of one period and scenario.
+
+    Args:
+        values (dict[Metric, Any]): The computed statement metrics.
+        period (str): The period ("mtd" or "ytd").
+        comparison (str): The scenario's comparison.
+
+    Returns:
+        RevenueBlock: The food, beverage and total revenue.
+    """
+    food_revenue = values[Metric("food_sales", "restaurant", period, comparison)]
+    bev_revenue = values[Metric("bev_sales", "restaurant", period, comparison)]
+    return RevenueBlock(food_revenue, bev_revenue, compute_total(food_revenue, bev_revenue))
+
+
+def get_cost_block(values: dict[Metric, Any], period: str, comparison: str, revenue: RevenueBlock) -> CostBlock:
+    """
+    Assembles the cost metrics of one period and scenario.
+
+    Args:
+        values (dict[Metric, Any]): The computed statement metrics.
+        period (str): The period ("mtd" or "ytd").
+        comparison (str): The scenario's comparison.
+        revenue (RevenueBlock): The revenue of the same period and scenario.
+
+    Returns:
+        CostBlock: The food, beverage and total cost, and food and beverage cost as a percentage of revenue.
+    """
+    food_cost = values[Metric("food_cost", "restaurant", period, comparison)]
+    bev_cost = values[Metric("bev_cost", "restaurant", period, comparison)]
+    return CostBlock(
+        food_cost,
+        bev_cost,
+        compute_total(food_cost, bev_cost),
+        compute_percentage(food_cost, revenue.food_revenue),
+        compute_percentage(bev_cost, revenue.beverage_revenue),
     )
 
-    return {
-        "mtd": {
-            "food_cost": mtd_budgeted_food_cost,
-            "beverage_cost": mtd_budgeted_bev_cost,
-            "total_cost": mtd_budgeted_total_cost,
-            "food_cost_pct": mtd_budgeted_food_cost_pct,
-            "beverage_cost_pct": mtd_budgeted_bev_cost_pct
-        },
-        "ytd": {
-            "food_cost": ytd_budgeted_food_cost,
-            "beverage_cost": ytd_budgeted_bev_cost,
-            "total_cost": ytd_budgeted_total_cost,
-            "food_cost_pct": ytd_budgeted_food_cost_pct,
-            "beverage_cost_pct": ytd_budgeted_bev_cost_pct
-        }
-    }
-
-
-def get_budgeted_profit_metrics(revenue_metrics: dict, cost_metrics: dict) -> dict:
+
+def get_profit_metrics(revenue_metrics: MtdYtd[RevenueBlock], cost_metrics: MtdYtd[CostBlock]) -> MtdYtd[ProfitBlock]:
     """
-    Retrieves budgeted profit metrics for the given period.
+    Retrieves profit metrics for the given period.
 
     Args:
-        revenue_metrics (dict): A dictionary containing the revenue metrics for the given period.
-        cost_metrics (dict): A dictionary containing the cost metrics for the given period.
+        revenue_metrics (MtdYtd[RevenueBlock]): The monthly and year-to-date revenue metrics.
+        cost_metrics (MtdYtd[CostBlock]): The monthly and year-to-date cost metrics.
 
     Returns:
-        dict: A dictionary containing the budgeted profit metrics for the given period.
+        MtdYtd[ProfitBlock]: The computed profit metrics for the given period.
     """
-    return {
-        "mtd": {
-            "gross_profit": compute_gross_profit(
-                revenue_metrics["mtd"]["total_revenue"],
-                cost_metrics["mtd"]["total_cost"]
-            )
-        },
-        "ytd": {
-            "gross_profit": compute_gross_profit(
-                revenue_metrics["ytd"]["total_revenue"],
-                cost_metrics["ytd"]["total_cost"])
-        }
-    }
+    return MtdYtd(
+        mtd=ProfitBlock(compute_gross_profit(revenue_metrics.mtd.total_revenue, cost_metrics.mtd.total_cost)),
+        ytd=ProfitBlock(compute_gross_profit(revenue_metrics.ytd.total_revenue, cost_metrics.ytd.total_cost)),
+    )
@@ -0,0 +1,69 @@
+# precomputes the current month's page data so a new worker starts with warm caches
+
+import logging
+import time
+from datetime import date
+
+from src.metrics.events import event_metrics
+from src.metrics.home import home_metrics
+from src.metrics.restaurant import restaurant_snapshot_metrics, statement_metrics
+from src.services.db_service import wait_for_db
+from src.utils.query_budget import get_qualified_name
+
+# create logger
+logger = logging.getLogger(__name__)
+
+# cached page data functions, all called with (month, year)
+PAGE_DATA_FUNCTIONS = (
+    home_metrics.get_home_kpi_data,
+    home_metrics.get_home_top_menu_items,
+    home_metrics.get_home_top_events,
+    event_metrics.get_events_kpi_data,
+    event_metrics.get_events_high_value_counts,
+    event_metrics.get_events_top_five,
+    event_metrics.get_events_by_type_data,
+    restaurant_snapshot_metrics.get_restaurant_snapshot_page_data,
+)
+
+# cached year data functions, all called with (year)
+YEAR_DATA_FUNCTIONS = (
+    statement_metrics.get_statement_trend_metrics,
+)
+
+# names of the page caches warm_page_caches fills, which readiness waits for
+WARMED_CACHE_NAMES = frozenset(
+    get_qualified_name(function) for function in PAGE_DATA_FUNCTIONS + YEAR_DATA_FUNCTIONS
+)
+
+
+def warm_page_caches(month: int, year: int) -> None:
+    """
+    Computes every cached page for the given month (and year), filling the page caches.
+
+    Args:
+        month (int): The month to compute.
+        year (int): The year to compute.
+    """
+    start = time.perf_counter()
+    calls = [(function, (month, year)) for function in PAGE_DATA_FUNCTIONS]
+    calls += [(function, (year,)) for function in YEAR_DATA_FUNCTIONS]
+    for page_data_function, args in calls:
+        try:
+            page_data_function(*args)
+        except Exception:
+            logger.error(f"Error warming {page_data_function.__name__}", exc_info=True)
+    logger.info(f"Page caches warmed for {month}/{year} in {time.perf_counter() - start:.2f}s")
+
+
+def warm_page_caches_when_ready(timeout: float) -> None:
+    """
+    Waits for the database connection, then warms the page caches for the current month.
+
+    Args:
+        timeout (float): The maximum number of seconds to wait for the connection.
+    """
+    if not wait_for_db(timeout):
+        logger.warning("Skipping page cache warm-up: database connection is not ready")
+        return
+    today = date.today()
+    warm_page_caches(today.month, today.year)
@@ -10,4 +10,7 @@ from .menu_item import MenuItem
 from .restaurant_sale import RestaurantSale
 
 # budget model
-from .budget import Budget
\ No newline at end of file
+from .budget import Budget
+
+# materialized monthly actuals
+from .monthly_actuals import MonthlyActuals
@@ -1,7 +1,49 @@
 # budget model: MongoEngine document for budgeted financials
 
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
 from mongoengine import *
 
+# budget lines with a cumulative year-to-date counterpart (ytd_<line>)
+BUDGET_LINES = [
+    'food_sales', 'bev_sales', 'event_sales', 'total_sales',
+    'food_cost', 'bev_cost', 'event_cost', 'total_cost',
+    'gross_profit',
+]
+
+class BudgetQuerySet(QuerySet):
+    """A queryset recomputing the YTD lines of the years its writes touch."""
+
+    def get_written_years(self, update: Optional[dict] = None) -> set[int]:
+        """Returns the years of the matched documents, and the year an update sets, if any."""
+        years = set(self.clone().distinct('year'))
+        for key in ('year', 'set__year'):
+            if update and key in update:
+                years.add(update[key])
+        return years
+
+    def update(self, *args, **kwargs):
+        with Budget.recomputing_ytd(self.get_written_years(kwargs)):
+            return super().update(*args, **kwargs)
+
+    def modify(self, *args, **kwargs):
+        with Budget.recomputing_ytd(self.get_written_years(kwargs)):
+            return super().modify(*args, **kwargs)
+
+    # also used by Budget.delete(), so a deleted month no longer counts towards the later months
+    def delete(self, *args, **kwargs):
+        with Budget.recomputing_ytd(self.get_written_years()):
+            return super().delete(*args, **kwargs)
+
+    def insert(self, doc_or_docs, *args, **kwargs):
+        docs = doc_or_docs if isinstance(doc_or_docs, (list, tuple)) else [doc_or_docs]
+        for doc in docs:
+            doc.compute_totals()
+        with Budget.recomputing_ytd({doc.year for doc in docs}):
+            return super().insert(doc_or_docs, *args, **kwargs)
+
+
 class Budget(Document):
     # period
     month = IntField(required=True, min_value=1, max_value=12)
@@ -22,14 +64,98 @@ class Budget(Document):
     # profit
     gross_profit = FloatField(default=0)
 
-    # auto compute totals and gross profit before saving
+    # cumulative year-to-date lines through this month, maintained by recompute_ytd;
+    # no default, so documents written without them read as missing, not as 0
+    ytd_food_sales = FloatField()
+    ytd_bev_sales = FloatField()
+    ytd_event_sales = FloatField()
+    ytd_total_sales = FloatField()
+    ytd_food_cost = FloatField()
+    ytd_bev_cost = FloatField()
+    ytd_event_cost = FloatField()
+    ytd_total_cost = FloatField()
+    ytd_gross_profit = FloatField()
+
+    # auto compute totals and gross profit before saving, and the YTD lines of the
+    # affected years after (the previous year too, if the year changed)
     def save(self, *args, **kwargs):
+        self.compute_totals()
+
+        years = {self.year}
+        if self.pk is not None and 'year' in self._get_changed_fields():
+            previous = Budget._get_collection().find_one({'_id': self.pk}, {'year': 1})
+            if previous is not None:
+                years.add(previous['year'])
+
+        with Budget.recomputing_ytd(years):
+            return super().save(*args, **kwargs)
+
+    def compute_totals(self) -> None:
+        """Computes the total sales, total cost and gross profit from the category lines."""
         self.total_sales = round(self.food_sales + self.bev_sales + self.event_sales, 2)
         self.total_cost = round(self.food_cost + self.bev_cost + self.event_cost, 2)
         self.gross_profit = round(self.total_sales - self.total_cost, 2)
-        return super().save(*args, **kwargs)
+
+    @classmethod
+    @contextmanager
+    def recomputing_ytd(cls, years: set[int]) -> Iterator[None]:
+        """
+        Clears the YTD lines of the given years before a write, and recomputes them after it.
+
+        Args:
+            years (set[int]): The years the write changes.
+        """
+        cls.clear_ytd(years)
+        yield
+        for year in sorted(years):
+            cls.recompute_ytd(year)
+
+    @classmethod
+    def clear_ytd(cls, years: set[int]) -> None:
+        """
+        Removes the YTD lines of every month of the given years.
+
+        Called before a write changes a year's lines, so if recomputing them fails
+        the readers sum the monthly lines instead of using stale YTD values.
+
+        Args:
+            years (set[int]): The years to clear.
+        """
+        cls._get_collection().update_many(
+            {'year': {'$in': sorted(years)}},
+            {'$unset': {f'ytd_{line}': '' for line in BUDGET_LINES}}
+        )
+
+    @classmethod
+    def recompute_ytd(cls, year: Optional[int] = None) -> None:
+        """
+        Recomputes the cumulative YTD lines of every month of a year (or of every year).
+
+        A running sum per year is computed with $setWindowFields and merged back
+        into the same documents on the server.
+
+        Args:
+            year (Optional[int]): The year to recompute. Defaults to every year.
+        """
+        pipeline = [
+            {'$match': {} if year is None else {'year': year}},
+            {
+                '$setWindowFields': {
+                    'partitionBy': '$year',
+                    'sortBy': {'month': 1},
+                    'output': {
+                        f'ytd_{line}': {'$sum': f'${line}', 'window': {'documents': ['unbounded', 'current']}}
+                        for line in BUDGET_LINES
+                    }
+                }
+            },
+            {'$project': {'_id': 1, **{f'ytd_{line}': 1 for line in BUDGET_LINES}}},
+            {'$merge': {'into': cls._get_collection_name(), 'on': '_id', 'whenMatched': 'merge', 'whenNotMatched': 'discard'}},
+        ]
+        cls._get_collection().aggregate(pipeline)
 
     meta = {
+        'queryset_class': BudgetQuerySet,
         'ordering': ['-year', '-month'],
         'indexes': [
             'year',
@@ -2,6 +2,7 @@
 
 from mongoengine import *
 from src.utils.constants import EVENT_TYPES
+from src.utils.dates import get_date_parts
 
 class Event(Document):
     # event info and financials
@@ -15,11 +16,21 @@ class Event(Document):
     bev_cost = FloatField(default=0, min_value=0)
     total_cost = FloatField(default=0, min_value=0)
 
-    # auto compute totals before saving
+    # derived from event_date at write time (see get_date_parts), for index-backed grouping
+    year = IntField()
+    month = IntField()
+    iso_year = IntField()
+    iso_week = IntField()
+    day_of_week = IntField(min_value=1, max_value=7)
+    yyyymm = IntField()
+
+    # auto compute totals and derived date fields before saving
     # referenced: https://docs.mongoengine.org/apireference.html#documents
     def save(self, *args, **kwargs):
         self.total_sales = round(self.food_sales + self.bev_sales, 2)
         self.total_cost = round(self.food_cost + self.bev_cost, 2)
+        for field, value in get_date_parts(self.event_date).items():
+            setattr(self, field, value)
         return super().save(*args, **kwargs)
     
     # compute event name for display without storing in DB
@@ -32,6 +43,8 @@ class Event(Document):
         'indexes': [
             'event_type',
             ('event_date', 'event_type'),
+            ('yyyymm', 'event_type'),
+            ('iso_year', 'iso_week'),
             '-total_sales',
             '-total_cost'
         ],
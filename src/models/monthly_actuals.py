@@ -0,0 +1,38 @@
+# monthly actuals model: MongoEngine document for materialized monthly financials
+#
+# written by src/tools/refresh_monthly_actuals.py from restaurant sales and
+# events, in the same shape as Budget so budget-vs-actual reads line up
+
+from mongoengine import *
+
+class MonthlyActuals(Document):
+    # period
+    month = IntField(required=True, min_value=1, max_value=12)
+    year = IntField(required=True)
+
+    # revenues
+    food_sales = FloatField(default=0, min_value=0)
+    bev_sales = FloatField(default=0, min_value=0)
+    event_sales = FloatField(default=0, min_value=0)
+    total_sales = FloatField(default=0, min_value=0)
+    
+    # costs
+    food_cost = FloatField(default=0, min_value=0)
+    bev_cost = FloatField(default=0, min_value=0)
+    event_cost = FloatField(default=0, min_value=0)
+    total_cost = FloatField(default=0, min_value=0)
+    
+    # profit
+    gross_profit = FloatField(default=0)
+
+    # when the month was last materialized
+    refreshed_at = DateTimeField()
+
+    meta = {
+        'collection': 'monthly_actuals',
+        'ordering': ['-year', '-month'],
+        'indexes': [
+            {'fields': ['year', 'month'], 'unique': True},
+        ],
+        'auto_create_index': False
+    }
@@ -2,6 +2,7 @@
 
 from mongoengine import *
 from src.models.menu_item import MenuItem
+from src.utils.dates import get_date_parts
 from datetime import date
 
 class RestaurantSale(Document):
@@ -13,10 +14,20 @@ class RestaurantSale(Document):
     total_sales = FloatField(default=0, min_value=0)
     total_cost = FloatField(default=0, min_value=0)
 
-    # auto compute totals before saving
+    # derived from sales_date at write time (see get_date_parts), for index-backed grouping
+    year = IntField()
+    month = IntField()
+    iso_year = IntField()
+    iso_week = IntField()
+    day_of_week = IntField(min_value=1, max_value=7)
+    yyyymm = IntField()
+
+    # auto compute totals and derived date fields before saving
     def save(self, *args, **kwargs):
         self.total_sales = round(self.item.price * self.quantity, 2)
         self.total_cost = round(self.item.cost * self.quantity, 2)
+        for field, value in get_date_parts(self.sales_date).items():
+            setattr(self, field, value)
         return super().save(*args, **kwargs)
     
     meta = {
@@ -28,6 +39,9 @@ class RestaurantSale(Document):
         '-total_cost',
         ('sales_date', 'category'), 
         ('sales_date', 'item'),
+        ('sales_date', 'day_of_week', 'total_sales'),
+        ('yyyymm', 'category'),
+        ('iso_year', 'iso_week'),
     ],
     'auto_create_index': False
     }
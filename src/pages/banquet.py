@@ -38,36 +38,36 @@ layout = html.Div([
 
     dbc.Row([
         dbc.Col([
-            monthly_summary_card
+            cards.make_card_loader(monthly_summary_card)
         ], xs=12, lg=6, className="mb-4"),
         dbc.Col([
             cards.make_chart_card(
                 "YTD Summary",
-                ytd_bar_chart
+                cards.make_card_loader(ytd_bar_chart)
             )
         ], xs=12, lg=6, className="mb-4"),
     ]),
 
     dbc.Row([
         dbc.Col([
-            num_events_card
+            cards.make_card_loader(num_events_card)
         ], xs=12, lg=4, className="mb-4"),
         dbc.Col([
-            num_high_value_events_card
+            cards.make_card_loader(num_high_value_events_card)
         ], xs=12, lg=4, className="mb-4"),
         dbc.Col([
-            avg_event_sales_card
+            cards.make_card_loader(avg_event_sales_card)
         ], xs=12, lg=4, className="mb-4"),
     ]),
 
     dbc.Row([
         dbc.Col([
-            top_five_events_card
+            cards.make_card_loader(top_five_events_card)
         ], xs=12, lg=6, className="mb-4"),
         dbc.Col([
             cards.make_chart_card(
                 "Sales by Event Type",
-                event_type_pie_chart,
+                cards.make_card_loader(event_type_pie_chart),
                 "YTD"
             )
         ], xs=12, lg=6, className="mb-4"),
@@ -44,35 +44,35 @@ layout = html.Div([
         dbc.Col([
             cards.make_chart_card(
                 "% of Budgeted Monthly Revenue",
-                monthly_revenue_progress_chart
+                cards.make_card_loader(monthly_revenue_progress_chart)
             )
         ], xs=12, lg=6, className="mb-4"),
         dbc.Col([
-            monthly_summary_card
+            cards.make_card_loader(monthly_summary_card)
         ], xs=12, lg=6, className="mb-4"),
     ]),
     dbc.Row([
         dbc.Col([
-            ytd_revenue_card
+            cards.make_card_loader(ytd_revenue_card)
         ], xs=12, lg=4, className="mb-4"),
         dbc.Col([
-            cogs_kpi_card
+            cards.make_card_loader(cogs_kpi_card)
         ], xs=12, lg=4, className="mb-4"),
         dbc.Col([
-            profit_card
+            cards.make_card_loader(profit_card)
         ], xs=12, lg=4, className="mb-4"),
     ]),
     dbc.Row([
         dbc.Col([
-            top_menu_item_card
+            cards.make_card_loader(top_menu_item_card)
         ], xs=12, lg=4, className="mb-4"),
         dbc.Col([
-            top_event_card
+            cards.make_card_loader(top_event_card)
         ], xs=12, lg=4, className="mb-4"),
         dbc.Col([
             cards.make_chart_card(
                 "Revenue Breakdown",
-                revenue_breakdown_pie_chart,
+                cards.make_card_loader(revenue_breakdown_pie_chart),
                 "YTD"
             )
         ], xs=12, lg=4, className="mb-4"),
@@ -1,11 +1,12 @@
 # restaurant statement page: table view of restaurant financials (P&L-style)
 
 import dash
-from dash import html
+from dash import dcc, html
 import dash_bootstrap_components as dbc
 
 from src.components.core import statement_table
 from src.partials import make_month_year_filters, make_page_header
+from src.routes.export_routes import RESTAURANT_SALES_EXPORT_PATH, STATEMENT_EXPORT_PATH
 
 dash.register_page(__name__,
                    title="Restaurant Statement",
@@ -17,6 +18,46 @@ restaurant_statement_table = statement_table.make_statement_table(
     table_id="restaurant-statement-table"
 )
 
+# every month's table rows for the selected year (month switches happen in the browser)
+restaurant_statement_store = dcc.Store(id="restaurant-statement-store")
+
+# progress of the background callback computing the store (shown while it runs)
+restaurant_statement_progress = dbc.Progress(
+    id="restaurant-statement-progress",
+    value=0,
+    striped=True,
+    animated=True,
+    style={"visibility": "hidden"},
+    className="mb-2"
+)
+
+# export paths, in download button order, for the clientside link callback
+export_paths_store = dcc.Store(
+    id="restaurant-statement-export-paths",
+    data=[STATEMENT_EXPORT_PATH, RESTAURANT_SALES_EXPORT_PATH]
+)
+
+# download links (href set by callback for the selected period)
+export_buttons = html.Div([
+    dbc.Button(
+        [html.I(className="bi bi-download me-2"), "Statement (CSV)"],
+        id="restaurant-statement-export-link",
+        color="secondary",
+        outline=True,
+        size="sm",
+        external_link=True,
+        className="me-2",
+    ),
+    dbc.Button(
+        [html.I(className="bi bi-download me-2"), "Line-Level Sales (CSV)"],
+        id="restaurant-sales-export-link",
+        color="secondary",
+        outline=True,
+        size="sm",
+        external_link=True,
+    ),
+], className="text-end")
+
 
 # define layout with dbc rows and cols, add divs with visualizations to the columns
 layout = html.Div([
@@ -24,7 +65,13 @@ layout = html.Div([
         page_name=__name__,
         filter_component=make_month_year_filters()
     ),
-    
-    dbc.Row(dbc.Col(restaurant_statement_table),
-            className="mb-3")
-])
\ No newline at end of file
+
+    dbc.Row(dbc.Col(export_buttons),
+            className="mb-3"),
+
+    dbc.Row(dbc.Col([restaurant_statement_progress, restaurant_statement_table]),
+            className="mb-3"),
+
+    restaurant_statement_store,
+    export_paths_store
+])
@@ -0,0 +1,6 @@
+# routes/__init__.py
+
+# plain Flask routes served next to the Dash app (exports, health, stats)
+from . import export_routes
+from . import health_routes
+from . import stats_routes
@@ -0,0 +1,136 @@
+# contains Flask routes that stream statement and raw data exports as csv
+
+import logging
+from typing import Iterator
+
+from flask import Response, abort, jsonify, request, stream_with_context
+
+from src.components.core import statement_builder
+from src.components.core.statement_table import columns as statement_columns
+from src.metrics.restaurant import statement_metrics
+from src.services import export_service
+from src.utils import dates
+
+# create logger
+logger = logging.getLogger(__name__)
+
+# export urls (query string: month and year, month is optional for raw data)
+EXPORT_PATH_PREFIX = "/export/"
+STATEMENT_EXPORT_PATH = f"{EXPORT_PATH_PREFIX}restaurant-statement.csv"
+STATEMENT_JSON_EXPORT_PATH = f"{EXPORT_PATH_PREFIX}restaurant-statement.json"
+RESTAURANT_SALES_EXPORT_PATH = f"{EXPORT_PATH_PREFIX}restaurant-sales.csv"
+EVENTS_EXPORT_PATH = f"{EXPORT_PATH_PREFIX}events.csv"
+
+
+def get_period_args(month_required: bool = True) -> tuple[int | None, int]:
+    """
+    Reads and validates the month and year query string arguments.
+
+    Args:
+        month_required (bool): Whether the month argument is required. Defaults to True.
+
+    Returns:
+        tuple[int | None, int]: The month (None if omitted and not required) and year.
+    """
+    month = request.args.get("month", type=int)
+    year = request.args.get("year", type=int)
+
+    if year is None or (month_required and month is None):
+        abort(400, description="month and year query parameters are required")
+    if month is not None and not 1 <= month <= 12:
+        abort(400, description="month must be between 1 and 12")
+
+    return month, year
+
+
+def csv_response(chunks: Iterator[str], filename: str) -> Response:
+    """
+    Wraps csv chunks in a streaming download response.
+
+    Args:
+        chunks (Iterator[str]): The csv text chunks.
+        filename (str): The download file name.
+
+    Returns:
+        Response: A streaming text/csv response.
+    """
+    def logged_chunks() -> Iterator[str]:
+        # headers are already sent once streaming starts, so errors can only be logged
+        try:
+            yield from chunks
+        except Exception:
+            logger.error(f"Error streaming export: '{filename}'", exc_info=True)
+            raise
+
+    return Response(
+        stream_with_context(logged_chunks()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def register_export_routes(server):
+    @server.route(STATEMENT_EXPORT_PATH)
+    def export_restaurant_statement():
+        """Download the restaurant statement for a month as csv."""
+        month, year = get_period_args()
+
+        # the month of the cached year the statement table shows, or just the month if not cached
+        metrics = statement_metrics.get_month_statement_metrics(month, year)
+        rows = statement_builder.build_statement_rows(metrics)
+        columns = [column["id"] for column in statement_columns]
+
+        return csv_response(
+            export_service.iter_csv(rows, columns),
+            f"restaurant-statement-{year}-{month:02d}.csv"
+        )
+
+    @server.route(STATEMENT_JSON_EXPORT_PATH)
+    def export_restaurant_statement_json():
+        """Download the restaurant statement metrics for a month as nested json."""
+        month, year = get_period_args()
+
+        metrics = statement_metrics.get_month_statement_metrics(month, year)
+        response = jsonify(month=month, year=year, metrics=metrics.to_dict())
+        response.headers["Content-Disposition"] = f'attachment; filename="restaurant-statement-{year}-{month:02d}.json"'
+        return response
+
+    @server.route(RESTAURANT_SALES_EXPORT_PATH)
+    def export_restaurant_sales():
+        """Download line-level restaurant sales for a month, or a full year if month is omitted."""
+        month, year = get_period_args(month_required=False)
+
+        if month:
+            start, end = dates.monthly_date_range(month, year)
+            filename = f"restaurant-sales-{year}-{month:02d}.csv"
+        else:
+            start, end = dates.ytd_date_range(12, year)
+            filename = f"restaurant-sales-{year}.csv"
+
+        return csv_response(
+            export_service.iter_csv(
+                export_service.iter_restaurant_sales(start, end),
+                export_service.RESTAURANT_SALES_COLUMNS
+            ),
+            filename
+        )
+
+    @server.route(EVENTS_EXPORT_PATH)
+    def export_events():
+        """Download events for a month, or a full year if month is omitted."""
+        month, year = get_period_args(month_required=False)
+
+        if month:
+            start, end = dates.monthly_date_range(month, year)
+            filename = f"events-{year}-{month:02d}.csv"
+        else:
+            start, end = dates.ytd_date_range(12, year)
+            filename = f"events-{year}.csv"
+
+        return csv_response(
+            export_service.iter_csv(
+                export_service.iter_events(start, end),
+                export_service.EVENT_COLUMNS
+            ),
+            filename
+        )
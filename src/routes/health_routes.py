@@ -0,0 +1,63 @@
+# contains Flask routes for load balancer health and readiness checks
+
+import os
+import time
+
+from flask import jsonify
+
+from src.metrics.warmup import WARMED_CACHE_NAMES
+from src.services import health_service
+from src.services.db_service import db_ready, pool_state
+from src.utils.cache import get_cache_status
+from src.utils.resilience import db_breaker
+
+# health urls
+HEALTH_PATH = "/healthz"
+READY_PATH = "/readyz"
+
+# maximum wait for each readiness query
+READY_QUERY_TIMEOUT_SECONDS = float(os.getenv("READY_QUERY_TIMEOUT_MS", "1000")) / 1000
+
+# if set, workers only report ready once every page cache filled by warm-up holds a result
+READY_REQUIRE_WARM_CACHE = os.getenv("READY_REQUIRE_WARM_CACHE", "false").lower() in ("1", "true", "yes")
+
+# process start, for uptime
+STARTED_AT = time.monotonic()
+
+
+def register_health_routes(server):
+    @server.route(HEALTH_PATH)
+    def healthz():
+        """Process liveness; never touches the database."""
+        return jsonify(status="ok", uptime_s=round(time.monotonic() - STARTED_AT, 1))
+
+    @server.route(READY_PATH)
+    def readyz():
+        """Readiness: database ping, pool state, cache warmth and ingest watermark (503 if not ready)."""
+        start = time.perf_counter()
+
+        database = {
+            "connected": db_ready.is_set(),
+            "circuit_breaker": db_breaker.state,
+            "pool": pool_state.snapshot(),
+        }
+        ingest = None
+        if database["connected"]:
+            database["ping"] = health_service.ping_db(READY_QUERY_TIMEOUT_SECONDS)
+            if database["ping"]["ok"]:
+                ingest = health_service.get_ingest_watermarks(READY_QUERY_TIMEOUT_SECONDS)
+
+        pages = get_cache_status()
+        cache_warm = all(pages.get(name, {}).get("entries") for name in WARMED_CACHE_NAMES)
+
+        ping_ok = database.get("ping", {}).get("ok", False)
+        ready = ping_ok and (cache_warm or not READY_REQUIRE_WARM_CACHE)
+
+        body = {
+            "status": "ready" if ready else "not_ready",
+            "database": database,
+            "cache": {"warm": cache_warm, "pages": pages},
+            "ingest": ingest,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        return jsonify(body), 200 if ready else 503
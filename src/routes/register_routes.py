@@ -0,0 +1,12 @@
+# src/routes/register_routes.py
+
+from src.routes.export_routes import register_export_routes
+from src.routes.health_routes import register_health_routes
+from src.routes.stats_routes import register_stats_routes
+
+
+def register_all_routes(server):
+    """Registers all Flask routes on the app's server."""
+    register_export_routes(server)
+    register_health_routes(server)
+    register_stats_routes(server)
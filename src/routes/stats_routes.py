@@ -0,0 +1,40 @@
+# contains Flask routes that report in-process runtime statistics
+
+from flask import jsonify, request
+
+from src.utils.cache import get_cache_stats
+from src.utils.decorators import get_memo_stats
+from src.utils.payloads import get_payload_stats, record_payload
+
+# stats urls
+CACHE_STATS_PATH = "/stats/cache"
+QUERY_STATS_PATH = "/stats/queries"
+PAYLOAD_STATS_PATH = "/stats/payloads"
+
+# the Dash endpoint every callback response is sent from
+CALLBACK_PATH_SUFFIX = "/_dash-update-component"
+
+
+def register_stats_routes(server):
+    @server.route(CACHE_STATS_PATH)
+    def cache_stats():
+        """Page data cache, figure cache and request coalescing counters of this worker."""
+        return jsonify(get_cache_stats())
+
+    @server.route(QUERY_STATS_PATH)
+    def query_stats():
+        """Duplicate query elimination counters per page of this worker."""
+        return jsonify(get_memo_stats())
+
+    @server.route(PAYLOAD_STATS_PATH)
+    def payload_stats():
+        """Callback response sizes per callback output of this worker."""
+        return jsonify(get_payload_stats())
+
+    @server.after_request
+    def record_callback_payload(response):
+        """Records the size of each callback response that updates its outputs."""
+        if request.path.endswith(CALLBACK_PATH_SUFFIX) and response.status_code == 200:
+            body = request.get_json(silent=True) or {}
+            record_payload(body.get("output", "unknown"), response.calculate_content_length() or 0)
+        return response
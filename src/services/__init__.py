@@ -12,5 +12,14 @@ from . import event_service
 # restaurant service methods
 from . import restaurant_service
 
+# materialized monthly actuals
+from . import actuals_service
+
+# export (streaming) service methods
+from . import export_service
+
+# readiness checks
+from . import health_service
+
 # query helpers
 from . import query_helpers
\ No newline at end of file
@@ -0,0 +1,116 @@
+# materialized monthly actuals (see src/tools/refresh_monthly_actuals.py)
+#
+# configured with environment variables (defaults in brackets):
+#   MONTHLY_ACTUALS_MAX_AGE_SECONDS   materialized months older than this are computed live [3600]
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from mongoengine.connection import get_db
+
+from src.models import Event, RestaurantSale
+from src.models.monthly_actuals import MonthlyActuals
+from src.services.query_helpers import get_collection
+from src.utils.decorators import safe_query
+from src.utils.resilience import get_env_number
+
+MONTHLY_ACTUALS_MAX_AGE_SECONDS = get_env_number("MONTHLY_ACTUALS_MAX_AGE_SECONDS", 3600)
+
+# collection holding the refresh state (the last _id seen per source collection)
+STATE_COLLECTION = "job_state"
+JOB_NAME = "monthly_actuals"
+
+# source models the actuals are materialized from
+SOURCES = [RestaurantSale, Event]
+
+# summed fields of a monthly actuals document
+ACTUALS_FIELDS = [
+    'food_sales', 'bev_sales', 'event_sales', 'total_sales',
+    'food_cost', 'bev_cost', 'event_cost', 'total_cost',
+    'gross_profit',
+]
+
+
+def is_open_month(month: int, year: int) -> bool:
+    """Returns True for the current month and later months, which can still receive sales and events."""
+    today = date.today()
+    return (year, month) >= (today.year, today.month)
+
+
+@safe_query(fallback=True)
+def has_unmaterialized_writes() -> bool:
+    """
+    Checks whether sales or events were inserted since the last refresh.
+
+    The newest _id of each source collection is compared with the refresh job's
+    watermark, in one aggregation. Edits and deletions are not detected; they
+    are bounded by MONTHLY_ACTUALS_MAX_AGE_SECONDS instead.
+
+    Returns:
+        bool: True if a source has documents past its watermark (or on error).
+    """
+    state = get_db()[STATE_COLLECTION].find_one({"_id": JOB_NAME}, {"watermarks": 1}) or {}
+    watermarks = state.get("watermarks", {})
+
+    newest = [{"$sort": {"_id": -1}}, {"$limit": 1}, {"$project": {"_id": 1}}]
+    pipeline = [
+        *newest,
+        {"$addFields": {"source": get_collection(SOURCES[0]).name}},
+        *[
+            {"$unionWith": {
+                "coll": get_collection(model).name,
+                "pipeline": [*newest, {"$addFields": {"source": get_collection(model).name}}],
+            }}
+            for model in SOURCES[1:]
+        ],
+    ]
+    for doc in get_collection(SOURCES[0]).aggregate(pipeline):
+        watermark = watermarks.get(doc["source"])
+        if watermark is None or doc["_id"] > watermark:
+            return True
+    return False
+
+
+@safe_query(fallback=None)
+def get_actuals(month: int, year: int) -> Optional[dict]:
+    """
+    Retrieves the materialized monthly and year-to-date actuals for a given month and year.
+
+    All months of the year up to the given month are read in one query. None is
+    returned, so callers aggregate the raw sales and events instead, if:
+    - the month is still open (the current month or later),
+    - any of the months has not been materialized,
+    - any of them was materialized more than MONTHLY_ACTUALS_MAX_AGE_SECONDS ago, or
+    - sales or events were inserted since the last refresh.
+
+    Args:
+        month (int): The month to retrieve (1-12).
+        year (int): The year to retrieve.
+
+    Returns:
+        Optional[dict]: A dictionary with 'mtd' and 'ytd' dictionaries of the actuals
+        fields, or None if the materialized actuals cannot be used.
+    """
+    if is_open_month(month, year):
+        return None
+
+    projection = {'_id': 0, 'month': 1, 'refreshed_at': 1, **{field: 1 for field in ACTUALS_FIELDS}}
+    docs = list(get_collection(MonthlyActuals).find(
+        {'year': year, 'month': {'$lte': month}},
+        projection,
+        sort=[('month', 1)]
+    ))
+    if len(docs) < month:
+        return None
+
+    # refreshed_at is stored as naive UTC
+    oldest = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=MONTHLY_ACTUALS_MAX_AGE_SECONDS)
+    if any(doc.get('refreshed_at') is None or doc['refreshed_at'] < oldest for doc in docs):
+        return None
+    if has_unmaterialized_writes():
+        return None
+
+    return {
+        'mtd': {field: docs[-1].get(field, 0.0) for field in ACTUALS_FIELDS},
+        'ytd': {field: sum(doc.get(field, 0.0) for doc in docs) for field in ACTUALS_FIELDS},
+    }
@@ -3,6 +3,8 @@
 from typing import Type
 from mongoengine.document import Document
 
+from src.models.budget import BUDGET_LINES
+from src.services.query_helpers import get_collection
 from src.utils.decorators import safe_query
 
 
@@ -21,12 +23,15 @@ def get_monthly_budget_total(model: Type[Document], month: int, year: int, field
         float: The total value of the given field in the budget document
         for the specified month and year, or 0.0 if no matching document is found.
     """
-    # attempt to retrieve a budget document for the given month and year
-    budget_doc = model.objects(month=month, year=year).first()
+    # attempt to retrieve only the requested field of the budget document for the given month and year
+    budget_doc = get_collection(model).find_one(
+        {'month': month, 'year': year},
+        {field: 1, '_id': 0}
+    )
 
     # if a budget document is found, retrieve the total value of the given field
     if budget_doc:
-        total_value = getattr(budget_doc, field, 0.0)
+        total_value = budget_doc.get(field, 0.0)
         return float(total_value)
     # if no matching budget document is found, return 0.0
     return 0.0
@@ -38,6 +43,10 @@ def get_ytd_budget_total(model: Type[Document],month: int, year: int, field: str
     Retrieves the year-to-date (YTD) total value of a given field in a budget document
     for a given month and year.
 
+    The cumulative ytd_<field> of the month's document is read with a single point
+    read on (year, month). Documents without it (or with it null), or a missing
+    month, fall back to summing the year's documents.
+
     Args:
         model (Type[Document]): The MongoEngine model to query.
         month (int): The month to query (1-12).
@@ -48,6 +57,14 @@ def get_ytd_budget_total(model: Type[Document],month: int, year: int, field: str
         float: The YTD total value of the given field in the budget document
         for the specified month and year, or 0.0 if no matching document is found.
     """
+    ytd_field = f'ytd_{field}'
+    budget_doc = get_collection(model).find_one(
+        {'month': month, 'year': year},
+        {ytd_field: 1, '_id': 0}
+    )
+    if budget_doc and budget_doc.get(ytd_field) is not None:
+        return float(budget_doc[ytd_field])
+
     pipeline = [
         {
             # match all budget documents with a year equal to the given year
@@ -67,6 +84,45 @@ def get_ytd_budget_total(model: Type[Document],month: int, year: int, field: str
     ]
 
     # execute the aggregation and return the result
-    result = model.objects.aggregate(*pipeline)
+    result = get_collection(model).aggregate(pipeline)
     ytd_total = next(result, {}).get('ytd_total', 0.0)
     return ytd_total
+
+
+@safe_query(fallback={'mtd': {}, 'ytd': {}})
+def get_budget_lines(model: Type[Document], month: int, year: int) -> dict:
+    """
+    Retrieves every monthly and year-to-date (YTD) budget line for a given month and year.
+
+    The month's document is read once, including its cumulative ytd_<line> fields.
+    Documents without them (or with any of them null), or a missing month, fall
+    back to reading the year's documents up to the month and summing them.
+
+    Args:
+        model (Type[Document]): The MongoEngine model to query.
+        month (int): The month to query (1-12).
+        year (int): The year to query.
+
+    Returns:
+        dict: A dictionary with 'mtd' and 'ytd' dictionaries of budget line values.
+    """
+    ytd_lines = [f'ytd_{line}' for line in BUDGET_LINES]
+    budget_doc = get_collection(model).find_one(
+        {'month': month, 'year': year},
+        {'_id': 0, **{field: 1 for field in BUDGET_LINES + ytd_lines}}
+    )
+    if budget_doc and all(budget_doc.get(field) is not None for field in ytd_lines):
+        return {
+            'mtd': {line: float(budget_doc.get(line, 0.0)) for line in BUDGET_LINES},
+            'ytd': {line: float(budget_doc[f'ytd_{line}']) for line in BUDGET_LINES},
+        }
+
+    docs = list(get_collection(model).find(
+        {'year': year, 'month': {'$lte': month}},
+        {'_id': 0, 'month': 1, **{line: 1 for line in BUDGET_LINES}}
+    ))
+    month_doc = next((doc for doc in docs if doc['month'] == month), {})
+    return {
+        'mtd': {line: float(month_doc.get(line, 0.0)) for line in BUDGET_LINES},
+        'ytd': {line: sum(doc.get(line, 0.0) for doc in docs) for line in BUDGET_LINES},
+    }
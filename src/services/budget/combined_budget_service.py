@@ -2,21 +2,31 @@
 
 from src.models.budget import Budget
 from src.services.budget.budget_helpers import get_monthly_budget_total, get_ytd_budget_total
+from src.services.query_helpers import get_collection
 from src.utils.decorators import safe_query
 
+# budget fields returned by get_annual_budget_docs
+ANNUAL_BUDGET_FIELDS = [
+    'month',
+    'food_sales', 'bev_sales', 'event_sales', 'total_sales',
+    'food_cost', 'bev_cost', 'event_cost', 'total_cost',
+    'gross_profit',
+]
+
 #-------- full annual budget -------
 @safe_query(fallback=[])
-def get_annual_budget_docs(year: int) -> list:
+def get_annual_budget_docs(year: int) -> list[dict]:
     """
-    Retrieves a list of budget documents for a given year.
+    Retrieves the budget documents for a given year as plain dictionaries.
 
     Args:
         year (int): The year for which to retrieve the budget documents.
 
     Returns:
-        list: A list of budget documents for the specified year.
+        list[dict]: A list of budget documents for the specified year, ordered by month.
     """
-    return list(Budget.objects(year=year).order_by('month'))
+    projection = {'_id': 0, **{field: 1 for field in ANNUAL_BUDGET_FIELDS}}
+    return list(get_collection(Budget).find({'year': year}, projection, sort=[('month', 1)]))
 
 
 # ------- revenue -------
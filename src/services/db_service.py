@@ -1,12 +1,110 @@
 # service to connect to the database
 
-from mongoengine import connect
+from mongoengine import connect, disconnect_all
+from pymongo import monitoring
 import os
 import logging
+import threading
+
+from src.utils import query_budget, tracing
 
 # create logger
 logger = logging.getLogger(__name__)
 
+# set once init_db has registered the connection
+db_ready = threading.Event()
+
+# the process init_db connected in, so forked processes can tell they inherited the connection
+connected_pid: int | None = None
+
+# the background init thread started by init_db_in_background, if any
+db_init_thread: threading.Thread | None = None
+db_init_lock = threading.Lock()
+
+
+class PoolStateListener(monitoring.ConnectionPoolListener):
+    """Keeps connection pool counters for the readiness endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.check_out_failures = 0
+        self.pool_clears = 0
+        self.ready_pools: set = set()
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        with self.lock:
+            self.ready_pools.add(event.address)
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self.lock:
+            self.pool_clears += 1
+            self.ready_pools.discard(event.address)
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        with self.lock:
+            self.ready_pools.discard(event.address)
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self.lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self.lock:
+            self.open_connections -= 1
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self.lock:
+            self.check_out_failures += 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self.lock:
+            self.checked_out += 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self.lock:
+            self.checked_out -= 1
+
+    def snapshot(self) -> dict:
+        """Returns the current pool counters."""
+        with self.lock:
+            return {
+                "ready_servers": len(self.ready_pools),
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "check_out_failures": self.check_out_failures,
+                "pool_clears": self.pool_clears,
+            }
+
+
+# connection pool counters of this worker
+pool_state = PoolStateListener()
+
+
+def get_connection_timeouts() -> dict:
+    """
+    Returns the driver timeouts (ms), so a stalled cluster fails fast instead of waiting on the driver defaults.
+
+    Returns:
+        dict: The MongoClient timeout options.
+    """
+    return {
+        "serverSelectionTimeoutMS": int(os.getenv("DB_SERVER_SELECTION_TIMEOUT_MS", "3000")),
+        "connectTimeoutMS": int(os.getenv("DB_CONNECT_TIMEOUT_MS", "3000")),
+        "waitQueueTimeoutMS": int(os.getenv("DB_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+    }
+
+
 def validate_env_vars(*variables: str) -> bool:
     """
     Validate that all specified environment variables exist.
@@ -30,6 +128,8 @@ def init_db() -> None:
     :raises EnvironmentError: If any of the required environment variables are missing.
     :raises Exception: If the database connection fails.
     """
+    global connected_pid
+
     if not validate_env_vars("MONGO_USER", "MONGO_PASSWORD", "MONGO_HOST", "MONGO_DB"):
         logger.critical("Environment variable missing")
         raise EnvironmentError("Cannot connect to DB: Environment variable missing")
@@ -43,8 +143,83 @@ def init_db() -> None:
     logger.info(f"Trying to connect to DB at {host}/{db}")
 
     try:
-        connect(host=uri)
+        connect(
+            host=uri,
+            event_listeners=[pool_state] + tracing.get_event_listeners() + query_budget.get_event_listeners(),
+            **get_connection_timeouts()
+        )
+        connected_pid = os.getpid()
+        db_ready.set()
         logger.info("DB connection successful...")
     except Exception as e:
         logger.error(f"DB connection failed")
-        raise Exception(f"DB connection failed : {e}") from e
\ No newline at end of file
+        raise Exception(f"DB connection failed : {e}") from e
+
+
+def reconnect_after_fork() -> None:
+    """
+    Replaces the database connection a forked process inherited with its own.
+
+    PyMongo resets an inherited MongoClient after fork but warns that it may not
+    be fork-safe, so forked processes (e.g. background callback jobs) close it
+    and connect again before querying. Does nothing in the process that connected.
+    """
+    if connected_pid is None or connected_pid == os.getpid():
+        return
+    logger.debug(f"Reconnecting to DB in forked process {os.getpid()}")
+    disconnect_all()
+    db_ready.clear()
+    init_db()
+
+
+def init_db_in_background() -> threading.Thread:
+    """
+    Initializes the database connection on a background thread.
+
+    Resolving a mongodb+srv URI does blocking DNS lookups, so connecting at
+    import time delays the server from accepting requests. Missing environment
+    variables are still reported immediately.
+
+    :raises EnvironmentError: If any of the required environment variables are missing.
+
+    Returns:
+        threading.Thread: The init thread (an already running one is reused).
+    """
+    global db_init_thread
+
+    if not validate_env_vars("MONGO_USER", "MONGO_PASSWORD", "MONGO_HOST", "MONGO_DB"):
+        logger.critical("Environment variable missing")
+        raise EnvironmentError("Cannot connect to DB: Environment variable missing")
+
+    def run_init_db() -> None:
+        try:
+            init_db()
+        except Exception:
+            logger.critical("Database initialization failed", exc_info=True)
+
+    with db_init_lock:
+        if db_init_thread is None or not db_init_thread.is_alive():
+            db_init_thread = threading.Thread(target=run_init_db, name="db-init", daemon=True)
+            db_init_thread.start()
+        return db_init_thread
+
+
+def wait_for_db(timeout: float) -> bool:
+    """
+    Waits until the database connection is registered.
+
+    If the background initialization failed, a new attempt is started, so the
+    connection is retried on demand instead of requiring a restart.
+
+    Args:
+        timeout (float): The maximum number of seconds to wait.
+
+    Returns:
+        bool: True if the connection is registered, False if it is not ready in time
+        or the attempt failed.
+    """
+    if db_ready.is_set():
+        return True
+    init_thread = init_db_in_background()
+    init_thread.join(timeout)
+    return db_ready.is_set()
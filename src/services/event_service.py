@@ -2,7 +2,7 @@
 
 from src.models.event import Event
 from datetime import datetime
-from src.services.query_helpers import get_total_field
+from src.services.query_helpers import get_collection, get_total_field, get_window_totals
 from src.utils.decorators import safe_query
 
 @safe_query(fallback=0.0)
@@ -125,7 +125,7 @@ def get_events_with_highest_sales(start_date: datetime, end_date: datetime, limi
             }
         }
     ]
-    result = Event.objects.aggregate(*pipeline)
+    result = get_collection(Event).aggregate(pipeline)
     return list(result)
 
 
@@ -141,10 +141,9 @@ def get_num_events(start_date: datetime, end_date: datetime) -> int:
     Returns:
         int: The number of events within the given date range.
     """
-    number_of_events = Event.objects(
-        event_date__gte=start_date, 
-        event_date__lt=end_date
-        ).count()
+    number_of_events = get_collection(Event).count_documents({
+        'event_date': {'$gte': start_date, '$lt': end_date}
+    })
     return number_of_events
 
 
@@ -162,14 +161,37 @@ def get_num_events_above_threshold(start_date: datetime, end_date: datetime, thr
     Returns:
         int: The number of events with total sales above the given threshold within the given date range.
     """
-    number_of_events_above_threshold = Event.objects(
-        event_date__gte=start_date, 
-        event_date__lt=end_date,
-        total_sales__gt=threshold
-        ).count()
+    number_of_events_above_threshold = get_collection(Event).count_documents({
+        'event_date': {'$gte': start_date, '$lt': end_date},
+        'total_sales': {'$gt': threshold}
+    })
     return number_of_events_above_threshold
 
 
+@safe_query(fallback={})
+def get_window_num_events_above_threshold(
+    windows: dict[str, tuple[datetime, datetime]],
+    threshold: float
+) -> dict[str, int]:
+    """
+    Retrieves the number of events with total sales above a given threshold in several
+    (possibly overlapping) date windows with a single aggregation.
+
+    Args:
+        windows (dict[str, tuple[datetime, datetime]]): The (start, end) date windows, by name.
+        threshold (float): The minimum total sales required for an event to be included in the count.
+
+    Returns:
+        dict[str, int]: The number of events with total sales above the threshold in each window, by name.
+    """
+    totals = get_window_totals(
+        Event, 'event_date', windows, {'count': {'$sum': 1}},
+        query={'total_sales': {'$gt': threshold}}
+    )
+    window_totals = totals.get(None, {})
+    return {name: window_totals.get(name, {}).get('count', 0) for name in windows}
+
+
 @safe_query(fallback=[])
 def get_events_above_threshold(start_date: datetime, end_date: datetime, threshold: float) -> list[dict]:
     """
@@ -211,7 +233,7 @@ def get_events_above_threshold(start_date: datetime, end_date: datetime, thresho
             }
         }
     ]
-    result = Event.objects.aggregate(*pipeline)
+    result = get_collection(Event).aggregate(pipeline)
     return list(result)
 
 
@@ -243,7 +265,7 @@ def get_average_event_sales(start_date: datetime, end_date: datetime) -> float:
             }
         }
     ]
-    result = Event.objects.aggregate(*pipeline)
+    result = get_collection(Event).aggregate(pipeline)
     average_sales = next(result, {}).get('average_sales', 0.0)
     return round(average_sales, 2)
 
@@ -290,5 +312,5 @@ def get_event_type_breakdown(start_date: datetime, end_date: datetime) -> list[d
             }
         }
     ]
-    result = Event.objects.aggregate(*pipeline)
+    result = get_collection(Event).aggregate(pipeline)
     return list(result)
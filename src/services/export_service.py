@@ -0,0 +1,109 @@
+# streams export rows straight from MongoDB cursors
+
+import csv
+import io
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from src.models.event import Event
+from src.models.menu_item import MenuItem
+from src.models.restaurant_sale import RestaurantSale
+
+# number of documents fetched per cursor round trip
+EXPORT_BATCH_SIZE = 1000
+
+# number of characters buffered before a chunk is sent to the client
+CSV_CHUNK_SIZE = 64 * 1024
+
+# columns of the raw restaurant sales export
+RESTAURANT_SALES_COLUMNS = ["sales_date", "item", "category", "quantity", "total_sales", "total_cost"]
+
+# columns of the raw events export
+EVENT_COLUMNS = [
+    "event_date", "client_name", "event_type",
+    "food_sales", "bev_sales", "total_sales",
+    "food_cost", "bev_cost", "total_cost",
+]
+
+
+def iter_csv(rows: Iterable[dict], columns: list[str]) -> Iterator[str]:
+    """
+    Converts rows into csv text chunks without building the whole file in memory.
+
+    Args:
+        rows (Iterable[dict]): The rows to write, keyed by column name.
+        columns (list[str]): The columns to write, in order.
+
+    Yields:
+        str: Chunks of csv text, starting with the header row.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def iter_restaurant_sales(start_date: datetime, end_date: datetime) -> Iterator[dict]:
+    """
+    Streams line-level restaurant sales within a given date range, oldest first.
+
+    Menu item names are resolved from a dictionary loaded once instead of a $lookup per sale.
+
+    Args:
+        start_date (datetime): The start date of the date range.
+        end_date (datetime): The end date of the date range.
+
+    Yields:
+        dict: One row per restaurant sale.
+    """
+    item_names = {
+        item["_id"]: item["name"]
+        for item in MenuItem._get_collection().find({}, {"name": 1})
+    }
+
+    cursor = RestaurantSale._get_collection().find(
+        {"sales_date": {"$gte": start_date, "$lt": end_date}},
+        {"_id": 0, "sales_date": 1, "item": 1, "category": 1, "quantity": 1, "total_sales": 1, "total_cost": 1},
+        sort=[("sales_date", 1)],
+        batch_size=EXPORT_BATCH_SIZE,
+    )
+
+    with cursor:
+        for sale in cursor:
+            sale["sales_date"] = sale["sales_date"].date().isoformat()
+            sale["item"] = item_names.get(sale.get("item"), "")
+            yield sale
+
+
+def iter_events(start_date: datetime, end_date: datetime) -> Iterator[dict]:
+    """
+    Streams events within a given date range, oldest first.
+
+    Args:
+        start_date (datetime): The start date of the date range.
+        end_date (datetime): The end date of the date range.
+
+    Yields:
+        dict: One row per event.
+    """
+    projection = {"_id": 0, **{column: 1 for column in EVENT_COLUMNS}}
+
+    cursor = Event._get_collection().find(
+        {"event_date": {"$gte": start_date, "$lt": end_date}},
+        projection,
+        sort=[("event_date", 1)],
+        batch_size=EXPORT_BATCH_SIZE,
+    )
+
+    with cursor:
+        for event in cursor:
+            event["event_date"] = event["event_date"].date().isoformat()
+            yield event
@@ -0,0 +1,68 @@
+# service to check database health for the readiness endpoint
+
+import time
+
+import pymongo
+from mongoengine.connection import get_db
+
+from src.models import Event, RestaurantSale
+from src.services.query_helpers import get_collection
+
+# collections and date fields that show the most recent ingested data
+INGEST_DATE_FIELDS = {
+    "restaurant_sales": (RestaurantSale, "sales_date"),
+    "events": (Event, "event_date"),
+}
+
+
+def ping_db(timeout: float) -> dict:
+    """
+    Pings the database.
+
+    Args:
+        timeout (float): The maximum number of seconds to wait for the reply.
+
+    Returns:
+        dict: Whether the ping succeeded, its latency in milliseconds and the error, if any.
+    """
+    start = time.perf_counter()
+    try:
+        with pymongo.timeout(timeout):
+            get_db().client.admin.command("ping")
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+    except Exception as e:
+        return {"ok": False, "latency_ms": round((time.perf_counter() - start) * 1000, 1), "error": str(e)}
+
+
+def get_ingest_watermarks(timeout: float) -> dict:
+    """
+    Retrieves the latest date of ingested data in each collection.
+
+    Each lookup is a single sorted find_one on an indexed date field.
+
+    Args:
+        timeout (float): The maximum number of seconds to wait for each lookup.
+
+    Returns:
+        dict: For each collection, the latest date (ISO format, None if empty),
+        the lookup latency in milliseconds and the error, if any.
+    """
+    watermarks = {}
+    for name, (model, date_field) in INGEST_DATE_FIELDS.items():
+        start = time.perf_counter()
+        try:
+            with pymongo.timeout(timeout):
+                latest = get_collection(model).find_one(
+                    {}, {date_field: 1, "_id": 0}, sort=[(date_field, pymongo.DESCENDING)]
+                )
+            watermarks[name] = {
+                "latest": latest[date_field].date().isoformat() if latest else None,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            }
+        except Exception as e:
+            watermarks[name] = {
+                "latest": None,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                "error": str(e),
+            }
+    return watermarks
@@ -1,11 +1,41 @@
 # helper functions for services
 
 from datetime import datetime
-from typing import Any, Dict, Optional, Type
-from xml.dom.minidom import Document
+from typing import Any, Dict, List, Optional, Tuple, Type
 
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from mongoengine.document import Document
+from pymongo.collection import Collection
+
+from src.utils.dates import get_period_boundaries, yyyymm
 from src.utils.decorators import safe_query
 
+# codec options that defer decoding until a field is accessed
+RAW_BSON_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
+def get_collection(model: Type[Document], raw_bson: bool = False) -> Collection:
+    """
+    Returns the pymongo collection behind a model for read-only queries.
+
+    Querying the collection directly skips MongoEngine document construction
+    and validation, which read-only services never need.
+
+    Args:
+        model (Type[Document]): The model whose collection to return.
+        raw_bson (bool): If True, results are returned as RawBSONDocument objects that
+            only decode the fields that are accessed. Defaults to False.
+
+    Returns:
+        Collection: The pymongo collection for the model.
+    """
+    collection = model._get_collection()
+    if raw_bson:
+        return collection.with_options(codec_options=RAW_BSON_CODEC_OPTIONS)
+    return collection
+
+
 @safe_query(fallback=0.0)
 def get_total_field(
     model: Type[Document],
@@ -52,5 +82,255 @@ def get_total_field(
     ]
 
     # execute the aggregation and return the result
-    result = model.objects.aggregate(*pipeline)
-    return next(result, {}).get('total', 0.0)
\ No newline at end of file
+    result = get_collection(model).aggregate(pipeline)
+    return next(result, {}).get('total', 0.0)
+
+@safe_query(fallback=[])
+def get_period_totals(
+    model: Type[Document],
+    date_field_title: str,
+    date_ranges: List[Tuple[datetime, datetime]],
+    accumulators: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Computes several totals over several date ranges of a model with a single aggregation.
+
+    Documents in any of the ranges are matched once and split into one $facet
+    per range, each grouping with all of the given accumulators.
+
+    Args:
+        model (Type[Document]): The model to query.
+        date_field_title (str): The title of the field that contains the dates.
+        date_ranges (List[Tuple[datetime, datetime]]): The (start, end) date ranges, end exclusive.
+        accumulators (Dict[str, Any]): The $group accumulators to compute, by output name.
+
+    Returns:
+        List[Dict[str, Any]]: One dictionary of totals per date range, in order. A range
+        without documents has an empty dictionary.
+    """
+    def in_range(start: datetime, end: datetime) -> dict:
+        return {date_field_title: {'$gte': start, '$lt': end}}
+
+    pipeline = [
+        {'$match': {'$or': [in_range(start, end) for start, end in date_ranges]}},
+        {'$facet': {
+            f'range_{i}': [
+                {'$match': in_range(start, end)},
+                {'$group': {'_id': None, **accumulators}}
+            ]
+            for i, (start, end) in enumerate(date_ranges)
+        }}
+    ]
+
+    result = next(get_collection(model).aggregate(pipeline), {})
+    return [next(iter(result.get(f'range_{i}', [])), {}) for i in range(len(date_ranges))]
+
+
+@safe_query(fallback=[])
+def get_monthly_totals(
+    model: Type[Document],
+    years: List[int],
+    accumulators: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Computes totals for every month of one or more years with a single $group.
+
+    Documents are grouped on their stored yyyymm (see backfill_date_parts), so
+    the (yyyymm, ...) indexes serve the match.
+
+    Args:
+        model (Type[Document]): The dated model to query.
+        years (List[int]): The calendar years to compute.
+        accumulators (Dict[str, Any]): The $group accumulators to compute, by output name.
+
+    Returns:
+        List[Dict[str, Any]]: One dictionary per month with documents, containing the year,
+        the month and the totals. Months without documents are omitted.
+    """
+    pipeline = [
+        {'$match': {'$or': [
+            {'yyyymm': {'$gte': yyyymm(1, year), '$lte': yyyymm(12, year)}}
+            for year in years
+        ]}},
+        {'$group': {'_id': '$yyyymm', **accumulators}}
+    ]
+    rows = []
+    for row in get_collection(model).aggregate(pipeline):
+        key = row.pop('_id')
+        rows.append({'year': key // 100, 'month': key % 100, **row})
+    return rows
+
+
+def get_elementary_intervals(windows: Dict[str, Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """
+    Splits possibly overlapping date windows into disjoint elementary intervals.
+
+    Every window is exactly the union of the intervals inside it, so a document
+    is counted in one interval and added to every window containing it.
+
+    Args:
+        windows (Dict[str, Tuple[datetime, datetime]]): The (start, end) date windows, end exclusive, by name.
+
+    Returns:
+        List[Tuple[datetime, datetime]]: The (start, end) intervals inside at least one window, in order.
+    """
+    boundaries = sorted({boundary for window in windows.values() for boundary in window})
+    return [
+        (start, end) for start, end in zip(boundaries, boundaries[1:])
+        if any(window_start <= start and end <= window_end for window_start, window_end in windows.values())
+    ]
+
+
+def get_window_intervals(
+    windows: Dict[str, Tuple[datetime, datetime]],
+    intervals: List[Tuple[datetime, datetime]]
+) -> Dict[str, List[int]]:
+    """Returns the indexes of the elementary intervals inside each window, by window name."""
+    return {
+        name: [i for i, (start, end) in enumerate(intervals) if window_start <= start and end <= window_end]
+        for name, (window_start, window_end) in windows.items()
+    }
+
+
+def interval_switch(date_field_title: str, intervals: List[Tuple[datetime, datetime]]) -> Dict[str, Any]:
+    """
+    Builds a $switch expression assigning a document the index of the interval its date falls in.
+
+    Args:
+        date_field_title (str): The title of the field that contains the dates.
+        intervals (List[Tuple[datetime, datetime]]): The disjoint (start, end) intervals, end exclusive.
+
+    Returns:
+        Dict[str, Any]: The $switch expression, None for dates outside every interval.
+    """
+    date_field = f'${date_field_title}'
+    return {'$switch': {
+        'branches': [
+            {'case': {'$and': [{'$gte': [date_field, start]}, {'$lt': [date_field, end]}]}, 'then': i}
+            for i, (start, end) in enumerate(intervals)
+        ],
+        'default': None
+    }}
+
+
+@safe_query(fallback={})
+def get_window_totals(
+    model: Type[Document],
+    date_field_title: str,
+    windows: Dict[str, Tuple[datetime, datetime]],
+    accumulators: Dict[str, Any],
+    group_by: Any = None,
+    query: Optional[Dict[str, Any]] = None
+) -> Dict[Any, Dict[str, Dict[str, Any]]]:
+    """
+    Computes totals over several comparison windows of a model with a single aggregation.
+
+    Windows may overlap (e.g. the previous month and the trailing three months).
+    Documents are bucketed into disjoint elementary intervals with $switch and
+    grouped once, and each window's totals are summed from its intervals, so
+    the accumulators must be additive ($sum).
+
+    Args:
+        model (Type[Document]): The model to query.
+        date_field_title (str): The title of the field that contains the dates.
+        windows (Dict[str, Tuple[datetime, datetime]]): The (start, end) date windows, end exclusive, by name.
+        accumulators (Dict[str, Any]): The $sum accumulators to compute, by output name.
+        group_by (Any): An optional group key expression (e.g. '$item'). Defaults to None.
+        query (Optional[Dict[str, Any]]): An optional filter applied to the documents. Defaults to None.
+
+    Returns:
+        Dict[Any, Dict[str, Dict[str, Any]]]: The totals of every window by window name, for
+        each group key found (None if not grouped). Windows without documents have totals of 0.
+    """
+    intervals = get_elementary_intervals(windows)
+    if not intervals:
+        return {}
+    window_intervals = get_window_intervals(windows, intervals)
+
+    pipeline = [
+        {'$match': {
+            **(query or {}),
+            '$or': [{date_field_title: {'$gte': start, '$lt': end}} for start, end in intervals]
+        }},
+        {'$group': {
+            '_id': {'key': group_by, 'interval': interval_switch(date_field_title, intervals)},
+            **accumulators
+        }}
+    ]
+
+    totals = {}
+    if group_by is None:
+        totals[None] = {name: dict.fromkeys(accumulators, 0) for name in windows}
+    for row in get_collection(model).aggregate(pipeline):
+        key, interval = row['_id'].get('key'), row['_id']['interval']
+        key_totals = totals.setdefault(key, {name: dict.fromkeys(accumulators, 0) for name in windows})
+        for name, indexes in window_intervals.items():
+            if interval in indexes:
+                for measure in accumulators:
+                    key_totals[name][measure] += row.get(measure) or 0
+    return totals
+
+
+def stored_period_query(kind: str, start_year: int, end_year: int) -> Optional[Tuple[Dict[str, Any], Any]]:
+    """
+    Returns the match and group key selecting a range of years by stored date fields
+    (see backfill_date_parts), or None if the period kind has no stored key.
+
+    Months use yyyymm and ISO weeks use (iso_year, iso_week), so their indexes serve the match.
+    """
+    if kind == "month":
+        return {'yyyymm': {'$gte': yyyymm(1, start_year), '$lte': yyyymm(12, end_year)}}, '$yyyymm'
+    if kind == "week":
+        return {'iso_year': {'$gte': start_year, '$lte': end_year}}, {'$add': [{'$multiply': ['$iso_year', 100]}, '$iso_week']}
+    return None
+
+
+@safe_query(fallback={})
+def get_period_series(
+    model: Type[Document],
+    date_field_title: str,
+    kind: str,
+    start_year: int,
+    end_year: int,
+    accumulators: Dict[str, Any]
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Computes totals for every period of a kind (week, quarter, fiscal period...) over a
+    range of years with a single aggregation.
+
+    Months and ISO weeks are grouped on the stored date fields (see stored_period_query);
+    other kinds use a $bucket on the period table boundaries.
+
+    Args:
+        model (Type[Document]): The model to query.
+        date_field_title (str): The title of the field that contains the dates.
+        kind (str): The period kind (see dates.PERIOD_KINDS).
+        start_year (int): The first year.
+        end_year (int): The last year (inclusive).
+        accumulators (Dict[str, Any]): The accumulators to compute, by output name.
+
+    Returns:
+        Dict[int, Dict[str, Any]]: The totals of every period with documents, by period key.
+    """
+    stored = stored_period_query(kind, start_year, end_year)
+    if stored is not None:
+        match, key = stored
+        pipeline = [
+            {'$match': match},
+            {'$group': {'_id': key, **accumulators}}
+        ]
+        return {row.pop('_id'): row for row in get_collection(model).aggregate(pipeline)}
+
+    boundaries, keys = get_period_boundaries(kind, start_year, end_year)
+    pipeline = [
+        {'$match': {date_field_title: {'$gte': boundaries[0], '$lt': boundaries[-1]}}},
+        {'$bucket': {
+            'groupBy': f'${date_field_title}',
+            'boundaries': boundaries,
+            'output': accumulators
+        }}
+    ]
+    return {
+        keys[row.pop('_id')]: row
+        for row in get_collection(model).aggregate(pipeline)
+    }
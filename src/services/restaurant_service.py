@@ -1,7 +1,9 @@
 # data service for restaurant-related operations
 
 from src.models.restaurant_sale import RestaurantSale
-from src.services.query_helpers import get_total_field
+from src.services.query_helpers import (
+    get_collection, get_elementary_intervals, get_total_field, get_window_intervals, interval_switch
+)
 from datetime import datetime
 
 from src.utils.decorators import safe_query
@@ -87,7 +89,7 @@ def get_top_selling_menu_items(start_date: datetime, end_date: datetime, limit:
             "total_sales": 1
         }}
     ]
-    result = RestaurantSale.objects.aggregate(*pipeline)
+    result = get_collection(RestaurantSale).aggregate(pipeline)
     return list(result)
 
 
@@ -119,7 +121,7 @@ def get_restaurant_sales_by_category(start_date: datetime, end_date: datetime) -
             }
         }
     ]
-    result = RestaurantSale.objects.aggregate(*pipeline)
+    result = get_collection(RestaurantSale).aggregate(pipeline)
     return list(result)
 
 
@@ -151,7 +153,7 @@ def get_restaurant_cost_by_category(start_date: datetime, end_date: datetime) ->
             }
         }
     ]
-    result = RestaurantSale.objects.aggregate(*pipeline)
+    result = get_collection(RestaurantSale).aggregate(pipeline)
     return list(result)
 
 
@@ -201,76 +203,49 @@ def get_hot_or_cold_menu_items(
         list[dict]: A list of dictionaries containing the name, current total sales, previous total sales, and difference in total sales for each menu item.
     """
     sort_order = 1 if sort_by_ascending else -1
-    
+
+    # both periods are read in one pass; each sale is bucketed into a disjoint
+    # interval, so overlapping periods are handled too
+    windows = {'current': (current_start, current_end), 'previous': (previous_start, previous_end)}
+    intervals = get_elementary_intervals(windows)
+    window_intervals = get_window_intervals(windows, intervals)
+
+    def in_window(name: str) -> dict:
+        return {'$in': ['$_id.interval', window_intervals[name]]}
+
     pipeline = [
         {
-            # match all restaurant sales that fall within the current time period
+            # match all restaurant sales that fall within either time period
             '$match': {
-                'sales_date': {
-                    '$gte': current_start,
-                    '$lt': current_end
-                }
+                '$or': [{'sales_date': {'$gte': start, '$lt': end}} for start, end in intervals]
             }
         },
         {
-            # group all restaurant sales by menu item
+            # group all restaurant sales by menu item and interval
             '$group': {
-                '_id': '$item',
-                'current_total': {'$sum': '$total_sales'}
+                '_id': {'item': '$item', 'interval': interval_switch('sales_date', intervals)},
+                'total': {'$sum': '$total_sales'}
             }
         },
         {
-            # perform a lookup to get the total sales for each menu item in the previous time period
-            '$lookup': {
-                'from': 'restaurant_sale',
-                'let': {'item_id': '$_id'},
-                'pipeline': [
-                    {
-                        # match all restaurant sales that fall within the previous time period
-                        '$match': {
-                            'sales_date': {
-                                '$gte': previous_start,
-                                '$lt': previous_end
-                            },
-                            # make sure we only look at the same menu item
-                            '$expr': {'$eq': ['$item', '$$item_id']}
-                        }
-                    },
-                    {
-                        # group all restaurant sales by menu item and calculate the total sales for each menu item
-                        '$group': {
-                            '_id': None,
-                            'previous_total': {'$sum': '$total_sales'}
-                        }
-                    }
-                ],
-                'as': 'previous_sales'
-
+            # add up the intervals of each time period per menu item
+            '$group': {
+                '_id': '$_id.item',
+                'current_total': {'$sum': {'$cond': [in_window('current'), '$total', 0]}},
+                'previous_total': {'$sum': {'$cond': [in_window('previous'), '$total', 0]}},
+                'current_intervals': {'$sum': {'$cond': [in_window('current'), 1, 0]}}
             }
         },
         {
-            # project the fields we need
+            # only keep menu items sold in the current time period
+            '$match': {'current_intervals': {'$gt': 0}}
+        },
+        {
+            # calculate the difference in total sales between the current and previous time periods
             '$project': {
                 'current_total': 1,
-                'previous_total': {
-                    # if the lookup returned no results, set previous_total to 0
-                    '$ifNull': [
-                        {'$arrayElemAt': ['$previous_sales.previous_total', 0]},
-                        0
-                    ]
-                },
-                # calculate the difference in total sales between the current and previous time periods
-                'difference': {
-                    '$subtract': [
-                        '$current_total',
-                        {
-                            '$ifNull': [
-                                {'$arrayElemAt': ['$previous_sales.previous_total', 0]},
-                                0
-                            ]
-                        }
-                    ]
-                }
+                'previous_total': 1,
+                'difference': {'$subtract': ['$current_total', '$previous_total']}
             }
         },
         {
@@ -326,7 +301,7 @@ def get_hot_or_cold_menu_items(
             }
         }
     ]
-    result = RestaurantSale.objects.aggregate(*pipeline)
+    result = get_collection(RestaurantSale).aggregate(pipeline)
     return list(result)
 
 
@@ -351,33 +326,25 @@ def get_average_sales_by_day(start_date: datetime, end_date: datetime) -> list[d
                 }
             }
         },
-        {
-            "$group": {
-                "_id": "$sales_date",
-                "daily_total": {"$sum": "$total_sales"}
-            }
-        },
-        {
-            "$project": {
-                "daily_total": 1,
-                "day_of_week": {"$dayOfWeek": "$_id"}
-            }
-        },
+        # day_of_week is stored at write time (see backfill_date_parts), so
+        # (sales_date, day_of_week, total_sales) covers this; the distinct dates
+        # of each weekday are the number of days its total is averaged over
         {
             "$group": {
                 "_id": "$day_of_week",
-                "average_sales": {"$avg": "$daily_total"}
+                "total_sales": {"$sum": "$total_sales"},
+                "days": {"$addToSet": "$sales_date"}
             }
         },
         {
             "$project": {
                 "_id": 0,
                 "day_of_week": "$_id",
-                "average_sales": 1
+                "average_sales": {"$divide": ["$total_sales", {"$size": "$days"}]}
             }
         },
 
         { "$sort": {"day_of_week": 1} }
     ]
-    result = RestaurantSale.objects.aggregate(*pipeline)
+    result = get_collection(RestaurantSale).aggregate(pipeline)
     return list(result)
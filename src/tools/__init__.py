@@ -0,0 +1,3 @@
+# src/tools/__init__.py
+
+# command line tools for operating on the database (run with python -m src.tools.<tool>)
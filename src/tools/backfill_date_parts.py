@@ -0,0 +1,72 @@
+# backfills the derived date fields (year, month, ISO week, day of week, yyyymm)
+# on restaurant sales and events written before they were stored, then creates
+# the indexes that use them
+#
+# usage:
+#   python -m src.tools.backfill_date_parts
+#   python -m src.tools.backfill_date_parts --dry-run     # only count documents to update
+#
+# the fields are computed on the server with a pipeline update, so no documents
+# are transferred. Safe to rerun: only documents without yyyymm are updated.
+
+import argparse
+from typing import Optional, Type
+
+from dotenv import load_dotenv
+from mongoengine import Document
+
+from src.models import Event, RestaurantSale
+from src.services.db_service import init_db
+from src.services.query_helpers import get_collection
+from src.utils.dates import date_parts_expression
+
+# dated models and the date field their derived fields come from
+DATED_MODELS: list[tuple[Type[Document], str]] = [
+    (RestaurantSale, "sales_date"),
+    (Event, "event_date"),
+]
+
+# documents written before the derived fields existed
+MISSING_DATE_PARTS = {"yyyymm": {"$exists": False}}
+
+
+def backfill_model(model: Type[Document], date_field: str, dry_run: bool = False) -> int:
+    """
+    Sets the derived date fields on every document of a model that is missing them.
+
+    Args:
+        model (Type[Document]): The dated model.
+        date_field (str): The model's date field.
+        dry_run (bool): Only count the documents to update.
+
+    Returns:
+        int: The number of documents updated (or to update, in a dry run).
+    """
+    collection = get_collection(model)
+    if dry_run:
+        return collection.count_documents(MISSING_DATE_PARTS)
+
+    result = collection.update_many(
+        MISSING_DATE_PARTS,
+        [{"$set": date_parts_expression(date_field)}]
+    )
+    model.ensure_indexes()
+    return result.modified_count
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backfill derived date fields on sales and events.")
+    parser.add_argument("--dry-run", action="store_true", help="only count documents missing the fields")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    init_db()
+
+    for model, date_field in DATED_MODELS:
+        count = backfill_model(model, date_field, args.dry_run)
+        action = "to update" if args.dry_run else "updated"
+        print(f"{model.__name__:<16} {count:>8} documents {action}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# compares MongoEngine document reads with the raw pymongo read path used by the services
+#
+# usage:
+#   python -m src.tools.bench_read_path            # client-side decode cost, no database needed
+#   python -m src.tools.bench_read_path --live     # end-to-end against the configured database
+
+import argparse
+import timeit
+from datetime import datetime
+from typing import Callable
+
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from src.models import Budget, Event
+
+# default number of timed calls per case
+DEFAULT_NUMBER = 2000
+
+
+def time_per_call(func: Callable, number: int) -> float:
+    """
+    Times a function and returns the best mean time per call in microseconds.
+
+    Args:
+        func (Callable): The function to time.
+        number (int): The number of calls per timing run.
+
+    Returns:
+        float: The mean time per call of the fastest of three runs, in microseconds.
+    """
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1_000_000
+
+
+def print_comparison(title: str, before: float, after: float) -> None:
+    """Prints one before/after row of the benchmark table."""
+    speedup = before / after if after else float("inf")
+    print(f"{title:<44} {before:>10.1f} us {after:>10.1f} us {speedup:>7.1f}x")
+
+
+def make_budget_son(month: int, year: int) -> dict:
+    """Builds a budget document as stored in MongoDB."""
+    return Budget(
+        month=month,
+        year=year,
+        food_sales=41250.0,
+        bev_sales=18760.5,
+        event_sales=65400.0,
+        total_sales=125410.5,
+        food_cost=14437.5,
+        bev_cost=3752.1,
+        event_cost=21582.0,
+        total_cost=39771.6,
+        gross_profit=85638.9,
+    ).to_mongo().to_dict() | {"_id": bson.ObjectId()}
+
+
+def run_offline(number: int) -> None:
+    """
+    Measures the client-side cost of turning a server reply into a value.
+
+    Network time is identical for both paths, so this isolates the overhead
+    that the raw read path removes.
+    """
+    full_raw = bson.encode(make_budget_son(6, 2025))
+    projected_raw = bson.encode({"food_sales": 41250.0})
+    annual_raw = [bson.encode(make_budget_son(month, 2025)) for month in range(1, 13)]
+
+    print(f"{'case (client side only)':<44} {'before':>13} {'after':>13} {'speedup':>8}")
+
+    # get_monthly_budget_total: .first() + getattr vs find_one with a projection
+    print_comparison(
+        "monthly budget field (document vs projection)",
+        time_per_call(lambda: getattr(Budget._from_son(bson.decode(full_raw)), "food_sales"), number),
+        time_per_call(lambda: bson.decode(projected_raw).get("food_sales", 0.0), number),
+    )
+
+    # reading one field of a full document without decoding the rest
+    print_comparison(
+        "one field of a full document (dict vs raw bson)",
+        time_per_call(lambda: bson.decode(full_raw)["food_sales"], number),
+        time_per_call(lambda: RawBSONDocument(full_raw)["food_sales"], number),
+    )
+
+    # get_annual_budget_docs: 12 Budget documents vs 12 plain dicts
+    print_comparison(
+        "annual budget docs (12 documents vs dicts)",
+        time_per_call(lambda: [Budget._from_son(bson.decode(raw)) for raw in annual_raw], number // 10),
+        time_per_call(lambda: [bson.decode(raw) for raw in annual_raw], number // 10),
+    )
+
+
+def run_live(number: int, year: int) -> None:
+    """Measures both read paths end to end against the configured database."""
+    from dotenv import load_dotenv
+
+    from src.services.budget.budget_helpers import get_monthly_budget_total
+    from src.services.budget.combined_budget_service import get_annual_budget_docs
+    from src.services.db_service import init_db
+    from src.services.query_helpers import get_collection
+
+    load_dotenv()
+    init_db()
+
+    start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    pipeline = [
+        {"$match": {"event_date": {"$gte": start, "$lt": end}}},
+        {"$group": {"_id": None, "total": {"$sum": "$total_sales"}}},
+    ]
+
+    print(f"{'case (round trip included)':<44} {'before':>13} {'after':>13} {'speedup':>8}")
+
+    print_comparison(
+        "monthly budget field",
+        time_per_call(lambda: float(getattr(Budget.objects(month=6, year=year).first(), "food_sales", 0.0)), number),
+        time_per_call(lambda: get_monthly_budget_total(Budget, 6, year, "food_sales"), number),
+    )
+    print_comparison(
+        "annual budget docs",
+        time_per_call(lambda: list(Budget.objects(year=year).order_by("month")), number),
+        time_per_call(lambda: get_annual_budget_docs(year), number),
+    )
+    print_comparison(
+        "event count",
+        time_per_call(lambda: Event.objects(event_date__gte=start, event_date__lt=end).count(), number),
+        time_per_call(
+            lambda: get_collection(Event).count_documents({"event_date": {"$gte": start, "$lt": end}}),
+            number
+        ),
+    )
+    print_comparison(
+        "event sales aggregate",
+        time_per_call(lambda: list(Event.objects.aggregate(pipeline)), number),
+        time_per_call(lambda: list(get_collection(Event).aggregate(pipeline)), number),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the raw pymongo read path.")
+    parser.add_argument("--live", action="store_true", help="time real queries against the configured database")
+    parser.add_argument("--number", type=int, default=None, help="timed calls per case")
+    parser.add_argument("--year", type=int, default=2025, help="year to query in --live mode (default: 2025)")
+    args = parser.parse_args()
+
+    if args.live:
+        run_live(args.number or 50, args.year)
+    else:
+        run_offline(args.number or DEFAULT_NUMBER)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# measures app cold start: module import time and time to first request
+#
+# usage:
+#   python -m src.tools.bench_startup              # 5 cold starts, top 15 imports
+#   python -m src.tools.bench_startup --runs 10 --top 30
+#
+# every run starts a fresh interpreter. The database connects in the background,
+# so placeholder MONGO_* variables are used if none are configured.
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# runs in a fresh interpreter and prints the startup timings as json to stderr
+FIRST_REQUEST_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import src.app
+imported = time.perf_counter()
+response = src.app.server.test_client().get("/")
+served = time.perf_counter()
+print("BENCH " + json.dumps({
+    "import_s": imported - start,
+    "first_request_s": served - imported,
+    "time_to_first_request_s": served - start,
+    "status": response.status_code,
+    "deferred": {name: name not in sys.modules for name in ("pandas", "plotly.express")},
+}), file=sys.stderr)
+"""
+
+# placeholders for a database that is never reached
+PLACEHOLDER_ENV = {
+    "MONGO_USER": "bench",
+    "MONGO_PASSWORD": "bench",
+    "MONGO_HOST": "bench.invalid",
+    "MONGO_DB": "bench",
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def get_env() -> dict:
+    """Returns the environment for the child interpreters."""
+    from dotenv import dotenv_values
+
+    env = dict(os.environ)
+    env.update({key: value for key, value in dotenv_values().items() if value and key not in env})
+    for key, value in PLACEHOLDER_ENV.items():
+        env.setdefault(key, value)
+    return env
+
+
+def measure_first_request(env: dict) -> dict:
+    """Starts the app in a fresh interpreter and returns its startup timings."""
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_SCRIPT],
+        env=env, capture_output=True, text=True, check=True
+    )
+    # app logs go to stdout, the timings to stderr
+    line = next(line for line in result.stderr.splitlines() if line.startswith("BENCH "))
+    return json.loads(line.removeprefix("BENCH "))
+
+
+def measure_imports(env: dict) -> list[tuple[str, int, int]]:
+    """
+    Imports the app under `python -X importtime` and parses the report.
+
+    Returns:
+        list[tuple[str, int, int]]: (module, self us, cumulative us) for each imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark app cold start.")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to time (default: 5)")
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to list (default: 15)")
+    args = parser.parse_args()
+
+    env = get_env()
+
+    runs = [measure_first_request(env) for _ in range(args.runs)]
+    print(f"cold starts: {args.runs} (median)")
+    for key in ("import_s", "first_request_s", "time_to_first_request_s"):
+        print(f"  {key:<26} {statistics.median(run[key] for run in runs) * 1000:>9.1f} ms")
+    print(f"  first request status       {runs[-1]['status']:>9}")
+    for name, deferred in runs[-1]["deferred"].items():
+        print(f"  {name + ' deferred':<26} {'yes' if deferred else 'no':>9}")
+
+    modules = measure_imports(env)
+    total = next((cumulative for name, _, cumulative in modules if name == "src.app"), 0)
+    print(f"\nimport src.app: {total / 1000:.1f} ms (-X importtime, cumulative)")
+    print(f"{'module':<48} {'self ms':>9} {'cumulative ms':>14}")
+    slowest = sorted((module for module in modules if module[0] != "src.app"), key=lambda module: module[2], reverse=True)
+    for name, self_us, cumulative_us in slowest[:args.top]:
+        print(f"{name:<48} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# checks every page data function against its declared MongoDB round-trip budget
+#
+# usage:
+#   python -m src.tools.check_query_budgets                    # current month and year
+#   python -m src.tools.check_query_budgets --month 6 --year 2025
+#
+# runs against the configured database (a seeded one gives realistic counts) and
+# exits with status 1 if any page sends more commands than its budget
+
+import argparse
+import inspect
+import sys
+from datetime import date
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from src.metrics.budget import budget_metrics
+from src.metrics.events import event_metrics
+from src.metrics.home import home_metrics
+from src.metrics.restaurant import restaurant_snapshot_metrics, statement_metrics
+from src.services.db_service import init_db
+from src.utils.query_budget import count_round_trips, declared_budgets, get_qualified_name
+
+# page data functions and how to call them for a month and year
+PAGE_CALLS: list[tuple[Callable, Callable[[Callable, int, int], object]]] = [
+    (restaurant_snapshot_metrics.get_restaurant_snapshot_page_data, lambda func, month, year: func(month, year)),
+    (statement_metrics.get_statement_metrics, lambda func, month, year: func(month, year)),
+    (budget_metrics.get_annual_budget_data, lambda func, month, year: func(year)),
+    (home_metrics.get_home_kpi_data, lambda func, month, year: func(month, year)),
+    (home_metrics.get_home_top_menu_items, lambda func, month, year: func(month, year)),
+    (home_metrics.get_home_top_events, lambda func, month, year: func(month, year)),
+    (event_metrics.get_events_kpi_data, lambda func, month, year: func(month, year)),
+    (event_metrics.get_events_high_value_counts, lambda func, month, year: func(month, year)),
+    (event_metrics.get_events_top_five, lambda func, month, year: func(month, year)),
+    (event_metrics.get_events_by_type_data, lambda func, month, year: func(month, year)),
+    (home_metrics.get_home_trend_data, lambda func, month, year: func(year)),
+    (event_metrics.get_events_trend_data, lambda func, month, year: func(year)),
+    (statement_metrics.get_statement_trend_metrics, lambda func, month, year: func(year)),
+]
+
+
+def check_budgets(month: int, year: int) -> bool:
+    """
+    Runs every page data function once and compares its command count to its budget.
+
+    Functions are unwrapped first, so page caches and request coalescing do not
+    hide any commands.
+
+    Args:
+        month (int): The month to compute.
+        year (int): The year to compute.
+
+    Returns:
+        bool: True if every page is within its budget.
+    """
+    within_budget = True
+    print(f"{'page data function':<36} {'commands':>8} {'budget':>6}  breakdown")
+
+    for page_func, call in PAGE_CALLS:
+        func = inspect.unwrap(page_func)
+        budget = declared_budgets.get(get_qualified_name(func))
+
+        with count_round_trips() as counter:
+            call(func, month, year)
+        sent = sum(counter.values())
+
+        if budget is None:
+            status = "NO BUDGET"
+            within_budget = False
+        elif sent > budget:
+            status = "OVER BUDGET"
+            within_budget = False
+        else:
+            status = "ok"
+
+        breakdown = ", ".join(f"{name}={count}" for name, count in counter.most_common())
+        print(f"{func.__name__:<36} {sent:>8} {budget if budget is not None else '-':>6}  {breakdown}  [{status}]")
+
+    return within_budget
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Check page data functions against their round-trip budgets.")
+    parser.add_argument("--month", type=int, default=today.month, help="month to compute (default: current)")
+    parser.add_argument("--year", type=int, default=today.year, help="year to compute (default: current)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    init_db()
+
+    if not check_budgets(args.month, args.year):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
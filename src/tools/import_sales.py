@@ -0,0 +1,398 @@
+# streams historical POS csv exports into the restaurant sale or event collections
+#
+# usage:
+#   python -m src.tools.import_sales sales.csv
+#   python -m src.tools.import_sales events.csv --kind events --map event_date="Event Date"
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from datetime import date, datetime
+from itertools import islice
+from typing import Callable, Iterator, Optional
+
+from dotenv import load_dotenv
+from mongoengine import ValidationError
+from pymongo.errors import BulkWriteError
+
+from src.models import Event, MenuItem, RestaurantSale
+from src.services.db_service import init_db
+from src.utils.dates import get_date_parts
+
+# create logger
+logger = logging.getLogger(__name__)
+
+# default number of documents written per insert_many call
+DEFAULT_BATCH_SIZE = 1000
+
+# default date format of the csv date columns
+DEFAULT_DATE_FORMAT = "%Y-%m-%d"
+
+# default csv column for each model field (override with --map field=column)
+DEFAULT_COLUMNS = {
+    "sales": {
+        "sales_date": "sales_date",
+        "item": "item",
+        "quantity": "quantity",
+    },
+    "events": {
+        "client_name": "client_name",
+        "event_date": "event_date",
+        "event_type": "event_type",
+        "food_sales": "food_sales",
+        "bev_sales": "bev_sales",
+        "food_cost": "food_cost",
+        "bev_cost": "bev_cost",
+    },
+}
+
+
+class RowError(ValueError):
+    """Raised when a csv row cannot be mapped to a document."""
+
+
+def parse_date(value: str, date_format: str) -> date:
+    """
+    Parses a csv date value with the given format.
+
+    Args:
+        value (str): The raw csv value.
+        date_format (str): The strptime format of the value.
+
+    Returns:
+        date: The parsed date.
+    """
+    try:
+        return datetime.strptime(value.strip(), date_format).date()
+    except (AttributeError, ValueError) as e:
+        raise RowError(f"invalid date {value!r}") from e
+
+
+def parse_number(value: str, cast: Callable = float) -> float:
+    """
+    Parses a csv numeric value, ignoring thousands separators and currency symbols.
+
+    Args:
+        value (str): The raw csv value.
+        cast (Callable): The numeric type to cast to. Defaults to float.
+
+    Returns:
+        float: The parsed number, or 0 if the value is blank.
+    """
+    if value is None or not value.strip():
+        return cast(0)
+    try:
+        return cast(value.strip().replace(",", "").replace("$", ""))
+    except ValueError as e:
+        raise RowError(f"invalid number {value!r}") from e
+
+
+def load_menu_item_cache() -> dict[str, MenuItem]:
+    """
+    Loads all menu items once so item names can be resolved without a query per row.
+
+    Returns:
+        dict[str, MenuItem]: A dictionary mapping each menu item name to its document.
+    """
+    return {
+        item.name: item
+        for item in MenuItem.objects.only("name", "category", "price", "cost")
+    }
+
+
+def make_sale_doc(row: dict, columns: dict, date_format: str, menu_items: dict) -> dict:
+    """
+    Maps a csv row to a raw restaurant sale document.
+
+    Totals and derived date fields are computed the same way RestaurantSale.save() computes them.
+
+    Args:
+        row (dict): The csv row.
+        columns (dict): The model field to csv column mapping.
+        date_format (str): The strptime format of the date column.
+        menu_items (dict): The menu item name cache.
+
+    Returns:
+        dict: The validated document, ready for insert_many.
+    """
+    item_name = (row.get(columns["item"]) or "").strip()
+    menu_item = menu_items.get(item_name)
+    if menu_item is None:
+        raise RowError(f"unknown menu item {item_name!r}")
+
+    quantity = parse_number(row.get(columns["quantity"]), int)
+    sales_date = parse_date(row.get(columns["sales_date"]), date_format)
+
+    sale = RestaurantSale(
+        sales_date=sales_date,
+        item=menu_item,
+        category=menu_item.category,
+        quantity=quantity,
+        total_sales=round(menu_item.price * quantity, 2),
+        total_cost=round(menu_item.cost * quantity, 2),
+        **get_date_parts(sales_date),
+    )
+    sale.validate()
+    return sale.to_mongo().to_dict()
+
+
+def make_event_doc(row: dict, columns: dict, date_format: str, menu_items: dict) -> dict:
+    """
+    Maps a csv row to a raw event document.
+
+    Totals and derived date fields are computed the same way Event.save() computes them.
+
+    Args:
+        row (dict): The csv row.
+        columns (dict): The model field to csv column mapping.
+        date_format (str): The strptime format of the date column.
+        menu_items (dict): Unused, accepted so both mappers share a signature.
+
+    Returns:
+        dict: The validated document, ready for insert_many.
+    """
+    food_sales = parse_number(row.get(columns["food_sales"]))
+    bev_sales = parse_number(row.get(columns["bev_sales"]))
+    food_cost = parse_number(row.get(columns["food_cost"]))
+    bev_cost = parse_number(row.get(columns["bev_cost"]))
+    event_date = parse_date(row.get(columns["event_date"]), date_format)
+
+    event = Event(
+        client_name=(row.get(columns["client_name"]) or "").strip(),
+        event_date=event_date,
+        event_type=(row.get(columns["event_type"]) or "").strip(),
+        food_sales=food_sales,
+        bev_sales=bev_sales,
+        total_sales=round(food_sales + bev_sales, 2),
+        food_cost=food_cost,
+        bev_cost=bev_cost,
+        total_cost=round(food_cost + bev_cost, 2),
+        **get_date_parts(event_date),
+    )
+    event.validate()
+    return event.to_mongo().to_dict()
+
+
+# model and row mapper for each import kind
+IMPORT_KINDS = {
+    "sales": (RestaurantSale, make_sale_doc),
+    "events": (Event, make_event_doc),
+}
+
+
+def checkpoint_path(csv_path: str) -> str:
+    """Returns the path of the checkpoint file kept next to the csv file."""
+    return f"{csv_path}.checkpoint.json"
+
+
+def read_checkpoint(csv_path: str, kind: str) -> int:
+    """
+    Reads the number of rows already committed by a previous run.
+
+    Args:
+        csv_path (str): The csv file being imported.
+        kind (str): The import kind ("sales" or "events").
+
+    Returns:
+        int: The number of data rows to skip, or 0 if there is no usable checkpoint.
+    """
+    try:
+        with open(checkpoint_path(csv_path), encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0
+
+    if checkpoint.get("kind") != kind:
+        raise SystemExit(
+            f"Checkpoint {checkpoint_path(csv_path)} was written by a '{checkpoint.get('kind')}' import. "
+            "Use --restart to discard it."
+        )
+    return int(checkpoint.get("rows_processed", 0))
+
+
+def write_checkpoint(csv_path: str, kind: str, rows_processed: int, rows_inserted: int) -> None:
+    """
+    Atomically records how far the import got so an interrupted run can resume.
+
+    Args:
+        csv_path (str): The csv file being imported.
+        kind (str): The import kind ("sales" or "events").
+        rows_processed (int): The number of data rows read and committed (inserted or rejected).
+        rows_inserted (int): The number of documents inserted so far.
+    """
+    path = checkpoint_path(csv_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "kind": kind,
+            "rows_processed": rows_processed,
+            "rows_inserted": rows_inserted,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def read_batches(rows: Iterator[dict], batch_size: int) -> Iterator[list[dict]]:
+    """
+    Splits a row iterator into lists of at most batch_size rows.
+
+    Only one batch is held in memory at a time.
+    """
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_csv(
+    csv_path: str,
+    kind: str = "sales",
+    columns: Optional[dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    date_format: str = DEFAULT_DATE_FORMAT,
+    restart: bool = False,
+) -> dict:
+    """
+    Streams a csv file into the database in insert_many batches.
+
+    A checkpoint is written after every batch; rerunning the same command
+    resumes after the last committed batch.
+
+    Args:
+        csv_path (str): The csv file to import.
+        kind (str): The import kind, "sales" or "events". Defaults to "sales".
+        columns (Optional[dict]): Overrides for the model field to csv column mapping.
+        batch_size (int): The number of documents per insert_many call.
+        date_format (str): The strptime format of the date column.
+        restart (bool): If True, ignores any existing checkpoint.
+
+    Returns:
+        dict: A summary with the number of rows processed, inserted and rejected.
+    """
+    model, make_doc = IMPORT_KINDS[kind]
+    column_map = {**DEFAULT_COLUMNS[kind], **(columns or {})}
+    menu_items = load_menu_item_cache() if kind == "sales" else {}
+
+    if restart and os.path.exists(checkpoint_path(csv_path)):
+        os.remove(checkpoint_path(csv_path))
+    skip = read_checkpoint(csv_path, kind)
+
+    collection = model._get_collection()
+    rows_processed = skip
+    rows_inserted = 0
+    rows_rejected = 0
+    started = time.perf_counter()
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+
+        missing = [column for column in column_map.values() if column not in (reader.fieldnames or [])]
+        if missing:
+            raise SystemExit(f"CSV is missing columns: {', '.join(missing)}")
+
+        if skip:
+            print(f"Resuming after {skip:,} rows from checkpoint...")
+
+        for batch in read_batches(islice(reader, skip, None), batch_size):
+            docs = []
+            # number of rows processed once each document is committed
+            doc_row_counts = []
+            for offset, row in enumerate(batch, start=1):
+                try:
+                    docs.append(make_doc(row, column_map, date_format, menu_items))
+                    doc_row_counts.append(rows_processed + offset)
+                except (RowError, ValidationError) as e:
+                    rows_rejected += 1
+                    # +1 for the header line
+                    logger.warning(f"Skipping line {rows_processed + offset + 1}: {e}")
+
+            if docs:
+                try:
+                    collection.insert_many(docs, ordered=True)
+                except BulkWriteError as e:
+                    # ordered inserts stop at the first failure, so everything before it is committed
+                    inserted = e.details.get("nInserted", 0)
+                    if inserted:
+                        write_checkpoint(csv_path, kind, doc_row_counts[inserted - 1], rows_inserted + inserted)
+                    raise
+
+            rows_processed += len(batch)
+            rows_inserted += len(docs)
+            write_checkpoint(csv_path, kind, rows_processed, rows_inserted)
+
+            elapsed = time.perf_counter() - started
+            rate = (rows_processed - skip) / elapsed if elapsed else 0.0
+            print(f"{rows_processed:,} rows processed, {rows_inserted:,} inserted ({rate:,.0f} rows/sec)")
+
+    # the import finished, so the checkpoint is no longer needed
+    if os.path.exists(checkpoint_path(csv_path)):
+        os.remove(checkpoint_path(csv_path))
+
+    return {
+        "rows_processed": rows_processed,
+        "rows_inserted": rows_inserted,
+        "rows_rejected": rows_rejected,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def parse_column_overrides(overrides: list[str]) -> dict:
+    """Parses --map field=column arguments into a dictionary."""
+    columns = {}
+    for override in overrides:
+        field, sep, column = override.partition("=")
+        if not sep:
+            raise SystemExit(f"Invalid --map value {override!r}, expected field=column")
+        columns[field.strip()] = column.strip()
+    return columns
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import historical POS csv exports.")
+    parser.add_argument("csv_path", help="path to the csv export")
+    parser.add_argument("--kind", choices=sorted(IMPORT_KINDS), default="sales",
+                        help="import restaurant sales or events (default: sales)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"documents per insert_many batch (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--date-format", default=DEFAULT_DATE_FORMAT,
+                        help=f"strptime format of the date column (default: {DEFAULT_DATE_FORMAT})")
+    parser.add_argument("--map", action="append", default=[], metavar="FIELD=COLUMN",
+                        help="map a model field to a differently named csv column")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore any existing checkpoint and import from the first row")
+    args = parser.parse_args(argv)
+
+    columns = parse_column_overrides(args.map)
+    unknown = set(columns) - set(DEFAULT_COLUMNS[args.kind])
+    if unknown:
+        raise SystemExit(f"Unknown field(s) for {args.kind}: {', '.join(sorted(unknown))}")
+
+    # load environment variables for init_db() (write access is required)
+    load_dotenv(".env.seed")
+    load_dotenv()
+    init_db()
+
+    summary = import_csv(
+        args.csv_path,
+        kind=args.kind,
+        columns=columns,
+        batch_size=args.batch_size,
+        date_format=args.date_format,
+        restart=args.restart,
+    )
+
+    print("-" * 40)
+    print(
+        f"Import complete: {summary['rows_inserted']:,} inserted, "
+        f"{summary['rows_rejected']:,} rejected in {summary['seconds']:,}s"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr, level=logging.WARNING)
+    main()
@@ -0,0 +1,330 @@
+# recommends indexes from the queries the pages actually run
+#
+# usage:
+#   python -m src.tools.index_advisor                      # current month and year
+#   python -m src.tools.index_advisor --month 6 --year 2025
+#   python -m src.tools.index_advisor --create             # also create the recommended indexes
+#
+# every page data function is run once against the configured database while
+# the find, aggregate, count and distinct commands it sends are recorded. Each
+# distinct query shape is explained, collection scans and in-memory sorts are
+# flagged, and a compound index is recommended for each flagged shape following
+# the equality, sort, range rule. Fields an aggregation reads before its first
+# $group or $project are appended so the index also covers the query.
+
+import argparse
+import copy
+import inspect
+import json
+import threading
+from collections import Counter
+from datetime import date
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+from pymongo import monitoring
+from pymongo.database import Database
+
+from src.services.db_service import init_db
+from src.tools.check_query_budgets import PAGE_CALLS
+
+# commands that read documents and can be explained
+RECORDED_COMMANDS = {"find", "aggregate", "count", "distinct"}
+
+# command fields kept when explaining a recorded command (the rest are session,
+# read preference and timeout fields added by the driver)
+EXPLAINED_FIELDS = {
+    "find": ("find", "filter", "sort", "projection", "limit", "skip", "hint"),
+    "aggregate": ("aggregate", "pipeline", "hint", "allowDiskUse"),
+    "count": ("count", "query", "limit", "skip", "hint"),
+    "distinct": ("distinct", "key", "query", "hint"),
+}
+
+# query operators that select a single value (index equality bounds)
+EQUALITY_OPERATORS = {"$eq", "$in"}
+
+# pipeline stages an index can cover when they follow the leading $match
+COVERABLE_STAGES = {"$match", "$sort", "$limit", "$skip", "$group", "$project", "$count"}
+
+# a recommendation is only made covering if it adds at most this many fields
+MAX_COVERING_FIELDS = 3
+
+
+class QueryRecorder(monitoring.CommandListener):
+    """Records the read commands sent to the database."""
+
+    def __init__(self):
+        self.commands: list[tuple[str, str, dict]] = []
+        self.lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name not in RECORDED_COMMANDS:
+            return
+        fields = EXPLAINED_FIELDS[event.command_name]
+        command = {key: copy.deepcopy(event.command[key]) for key in fields if key in event.command}
+        with self.lock:
+            self.commands.append((event.database_name, event.command_name, command))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+
+def get_shape(value: Any) -> Any:
+    """
+    Replaces the literal values of a query with their type names.
+
+    Field paths ("$field") and operators are kept, so queries that only differ
+    in their dates or limits have the same shape.
+    """
+    if isinstance(value, dict):
+        return {key: get_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [get_shape(item) for item in value]
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return type(value).__name__
+
+
+def get_plan_stages(explain: Any, in_plan: bool = False) -> list[str]:
+    """
+    Returns the stage names of every winning plan in an explain result.
+
+    Handles find and aggregate explains and both the classic and slot based
+    plan formats.
+    """
+    stages = []
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "rejectedPlans":
+                continue
+            if key == "winningPlan":
+                stages.extend(get_plan_stages(value, True))
+            elif key == "stage" and in_plan:
+                stages.append(value)
+            else:
+                stages.extend(get_plan_stages(value, in_plan))
+    elif isinstance(explain, list):
+        for item in explain:
+            stages.extend(get_plan_stages(item, in_plan))
+    return stages
+
+
+def get_pipeline_stages(explain: dict) -> list[str]:
+    """Returns the aggregation stages the query planner did not absorb, in order."""
+    return [next(iter(stage)) for stage in explain.get("stages", []) if "$cursor" not in stage]
+
+
+def get_flags(explain: dict) -> list[str]:
+    """Returns the problems found in an explain result."""
+    stages = get_plan_stages(explain)
+    pipeline_stages = get_pipeline_stages(explain)
+    flags = []
+    if "COLLSCAN" in stages:
+        flags.append("COLLSCAN")
+    # a $sort left at the start of the pipeline sorts the matched documents in memory
+    if "SORT" in stages or pipeline_stages[:1] == ["$sort"]:
+        flags.append("in-memory SORT")
+    return flags
+
+
+def get_referenced_fields(value: Any) -> set[str]:
+    """Returns the document fields an expression reads ("$field" paths)."""
+    if isinstance(value, dict):
+        return set().union(*(get_referenced_fields(item) for item in value.values()))
+    if isinstance(value, (list, tuple)):
+        return set().union(*(get_referenced_fields(item) for item in value))
+    if isinstance(value, str) and value.startswith("$") and not value.startswith("$$"):
+        return {value[1:]}
+    return set()
+
+
+def split_filter(query: dict) -> tuple[list[str], list[str]]:
+    """
+    Splits a query filter into equality and range fields.
+
+    Top-level logical operators ($or, $expr, ...) are ignored; they cannot be
+    expressed as index bounds on a single compound index.
+    """
+    equality, ranges = [], []
+    for field, condition in query.items():
+        if field.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            if set(condition) <= EQUALITY_OPERATORS:
+                equality.append(field)
+            else:
+                ranges.append(field)
+        else:
+            equality.append(field)
+    return equality, ranges
+
+
+def get_covering_fields(pipeline: list[dict]) -> Optional[set[str]]:
+    """
+    Returns the fields an aggregation reads up to its first $group or $project.
+
+    Returns None if a stage before then needs whole documents, so no index can
+    cover the query.
+    """
+    fields = set()
+    for stage in pipeline:
+        name, body = next(iter(stage.items()))
+        if name not in COVERABLE_STAGES:
+            return None
+        if name in ("$match", "$sort"):
+            fields.update(key for key in body if not key.startswith("$"))
+            fields.update(get_referenced_fields(body))
+        elif name == "$group":
+            fields.update(get_referenced_fields(body))
+            return fields
+        elif name == "$project":
+            fields.update(key for key, value in body.items() if value in (1, True) and key != "_id")
+            fields.update(get_referenced_fields(body))
+            if body.get("_id") not in (0, False):
+                fields.add("_id")
+            return fields
+    return None
+
+
+def recommend_index(command_name: str, command: dict) -> Optional[list[tuple[str, int]]]:
+    """
+    Recommends a compound index for a read command.
+
+    Keys are ordered equality fields, then sort fields, then range fields, and
+    are followed by covering fields where the query can be covered.
+
+    Returns:
+        Optional[list[tuple[str, int]]]: The index keys, or None if the command has
+        nothing an index could serve.
+    """
+    query, sort, covering = {}, {}, None
+    if command_name == "find":
+        query, sort = command.get("filter", {}), command.get("sort", {})
+    elif command_name in ("count", "distinct"):
+        query = command.get("query", {})
+    elif command_name == "aggregate":
+        pipeline = command.get("pipeline", [])
+        position = 0
+        if pipeline and "$match" in pipeline[0]:
+            query = pipeline[0]["$match"]
+            position = 1
+        if len(pipeline) > position and "$sort" in pipeline[position]:
+            sort = pipeline[position]["$sort"]
+        covering = get_covering_fields(pipeline)
+
+    equality, ranges = split_filter(query)
+    keys = [(field, 1) for field in equality]
+    keys += [(field, int(direction)) for field, direction in sort.items() if field not in equality]
+    keys += [(field, 1) for field in ranges if field not in sort]
+    if not keys:
+        return None
+
+    if covering is not None:
+        extra = sorted(covering - {field for field, _ in keys})
+        if len(extra) <= MAX_COVERING_FIELDS:
+            keys += [(field, 1) for field in extra]
+    return keys
+
+
+def find_matching_index(database: Database, collection: str, keys: list[tuple[str, int]]) -> Optional[str]:
+    """Returns the name of an existing index whose leading keys are the given keys."""
+    for name, info in database[collection].index_information().items():
+        existing = [(field, int(direction)) for field, direction in info["key"]]
+        if existing[:len(keys)] == keys:
+            return name
+    return None
+
+
+def format_index(keys: list[tuple[str, int]]) -> str:
+    """Formats index keys as a MongoEngine meta index spec, e.g. ('-total_sales', 'event_date')."""
+    fields = [f"'{'-' if direction < 0 else ''}{field}'" for field, direction in keys]
+    return f"({', '.join(fields)}{',' if len(fields) == 1 else ''})"
+
+
+def record_page_queries(month: int, year: int) -> list[tuple[str, str, dict]]:
+    """
+    Runs every page data function once and returns the read commands it sent.
+
+    Functions are unwrapped first, so page caches do not hide any queries. The
+    recorder is registered globally, so it must run before the client is created.
+    """
+    recorder = QueryRecorder()
+    monitoring.register(recorder)
+    init_db()
+    for page_func, call in PAGE_CALLS:
+        call(inspect.unwrap(page_func), month, year)
+    return recorder.commands
+
+
+def advise(month: int, year: int, create: bool = False) -> None:
+    """
+    Records, explains and prints a recommendation for every distinct query shape.
+
+    Args:
+        month (int): The month to run the pages for.
+        year (int): The year to run the pages for.
+        create (bool): Create the recommended indexes. Defaults to False.
+    """
+    from mongoengine.connection import get_db
+
+    # connects to the database, so it must run before the database is fetched
+    commands = record_page_queries(month, year)
+    database = get_db()
+
+    # first command of each shape, and how often the shape was sent
+    shapes: dict[str, tuple[str, dict]] = {}
+    calls = Counter()
+    for _, command_name, command in commands:
+        shape = json.dumps([command_name, get_shape(command)])
+        shapes.setdefault(shape, (command_name, command))
+        calls[shape] += 1
+
+    flagged = 0
+    for shape, (command_name, command) in shapes.items():
+        collection = command[command_name]
+        explain = database.command({"explain": command, "verbosity": "queryPlanner"})
+        flags = get_flags(explain)
+
+        print(f"\n{collection}.{command_name}  x{calls[shape]}")
+        print(f"  shape: {json.dumps({key: value for key, value in get_shape(command).items() if key != command_name})}")
+        print(f"  plan:  {' > '.join(get_plan_stages(explain) + get_pipeline_stages(explain)) or '-'}")
+        if not flags:
+            print("  ok")
+            continue
+
+        flagged += 1
+        print(f"  flags: {', '.join(flags)}")
+        keys = recommend_index(command_name, command)
+        if keys is None:
+            print("  no index can serve this query")
+            continue
+
+        existing = find_matching_index(database, collection, keys)
+        if existing:
+            print(f"  existing index {existing} matches {format_index(keys)}; the planner did not choose it")
+        elif create:
+            name = database[collection].create_index(keys)
+            print(f"  created index {name}")
+        else:
+            print(f"  recommend: {format_index(keys)}")
+
+    print(f"\n{len(commands)} commands, {len(shapes)} shapes, {flagged} flagged")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Recommend indexes from the queries the pages run.")
+    parser.add_argument("--month", type=int, default=today.month, help="month to run the pages for (default: current)")
+    parser.add_argument("--year", type=int, default=today.year, help="year to run the pages for (default: current)")
+    parser.add_argument("--create", action="store_true", help="create the recommended indexes")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    advise(args.month, args.year, args.create)
+
+
+if __name__ == "__main__":
+    main()
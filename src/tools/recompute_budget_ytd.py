@@ -0,0 +1,36 @@
+# recomputes the cumulative year-to-date lines (ytd_*) on budget documents
+#
+# usage:
+#   python -m src.tools.recompute_budget_ytd                # every year
+#   python -m src.tools.recompute_budget_ytd --year 2025
+#
+# Budget.save(), delete() and the Budget.objects(...) update, modify, delete
+# and insert writes keep a year's YTD lines current; run this after budgets are
+# written around them (raw collection writes, manual edits) or to fill them in
+# on budgets created before the lines existed.
+# Until then, budgets without the lines are summed from the monthly lines.
+
+import argparse
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from src.models import Budget
+from src.services.db_service import init_db
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute cumulative YTD budget lines.")
+    parser.add_argument("--year", type=int, default=None, help="year to recompute (default: every year)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    init_db()
+
+    Budget.recompute_ytd(args.year)
+    query = {} if args.year is None else {"year": args.year}
+    print(f"recomputed YTD lines on {Budget.objects(**query).count()} budget documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# materializes monthly actuals (food, beverage and event sales and cost) into the
+# monthly_actuals collection with an aggregation ending in $merge
+#
+# usage:
+#   python -m src.tools.refresh_monthly_actuals                  # months touched since the last run
+#   python -m src.tools.refresh_monthly_actuals --full           # rebuild every month
+#   python -m src.tools.refresh_monthly_actuals --interval 900   # keep refreshing every 15 minutes
+#
+# run it on a schedule (cron, or a worker with --interval); pages read the
+# materialized months and fall back to aggregating raw data for open months,
+# missing months, months older than MONTHLY_ACTUALS_MAX_AGE_SECONDS, and while
+# documents inserted since the last run are not materialized. Months are found
+# from the _id of documents inserted since the last run, so documents edited in
+# place or deleted are only picked up by a full rebuild, which a worker runs
+# every MONTHLY_ACTUALS_MAX_AGE_SECONDS / 2.
+# Months are read from the stored date fields (year, month, yyyymm), so sales
+# and events written before they existed must be backfilled first
+# (python -m src.tools.backfill_date_parts).
+
+import argparse
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from mongoengine.connection import get_db
+from pymongo.errors import PyMongoError
+
+from src.models import Event, MonthlyActuals, RestaurantSale
+from src.services.actuals_service import JOB_NAME, MONTHLY_ACTUALS_MAX_AGE_SECONDS, SOURCES, STATE_COLLECTION
+from src.services.db_service import init_db
+from src.services.query_helpers import get_collection
+from src.utils import dates
+
+# create logger
+logger = logging.getLogger(__name__)
+
+# months older than the max age are ignored by the pages, so a worker rebuilds
+# every month well within it to pick up edited and deleted documents
+FULL_REFRESH_SECONDS = MONTHLY_ACTUALS_MAX_AGE_SECONDS / 2
+
+# fields summed per month
+SUM_FIELDS = ["food_sales", "bev_sales", "event_sales", "food_cost", "bev_cost", "event_cost"]
+
+
+def month_key() -> dict:
+    """Returns the group key of a document's calendar month, from its stored date fields."""
+    return {"year": "$year", "month": "$month"}
+
+
+def month_filter(months: Optional[set[tuple[int, int]]]) -> dict:
+    """Returns a filter for documents dated in the given (year, month) pairs, or all documents if None."""
+    if months is None:
+        return {}
+    return {"yyyymm": {"$in": [dates.yyyymm(month, year) for year, month in sorted(months)]}}
+
+
+def category_sum(category: str, field: str) -> dict:
+    """Returns an accumulator summing a restaurant sale field for one menu category."""
+    return {"$sum": {"$cond": [{"$eq": ["$category", category]}, f"${field}", 0]}}
+
+
+def build_pipeline(months: Optional[set[tuple[int, int]]], refreshed_at: datetime) -> list[dict]:
+    """
+    Builds the aggregation that materializes the given months into monthly_actuals.
+
+    Restaurant sales and events are grouped by month separately, combined with
+    $unionWith and merged on (year, month), replacing the previous values.
+
+    Args:
+        months (Optional[set[tuple[int, int]]]): The (year, month) pairs to refresh, or None for all.
+        refreshed_at (datetime): The refresh time stored on every written document.
+
+    Returns:
+        list[dict]: The aggregation pipeline, run on the restaurant sale collection.
+    """
+    event_pipeline = [
+        {"$match": month_filter(months)},
+        {
+            "$group": {
+                "_id": month_key(),
+                "event_sales": {"$sum": "$total_sales"},
+                "event_cost": {"$sum": "$total_cost"},
+            }
+        },
+    ]
+    sales = ["$food_sales", "$bev_sales", "$event_sales"]
+    costs = ["$food_cost", "$bev_cost", "$event_cost"]
+
+    return [
+        {"$match": month_filter(months)},
+        {
+            "$group": {
+                "_id": month_key(),
+                "food_sales": category_sum("Food", "total_sales"),
+                "bev_sales": category_sum("Beverage", "total_sales"),
+                "food_cost": category_sum("Food", "total_cost"),
+                "bev_cost": category_sum("Beverage", "total_cost"),
+            }
+        },
+        {"$unionWith": {"coll": get_collection(Event).name, "pipeline": event_pipeline}},
+        # months with both sales and events appear twice; missing fields sum to 0
+        {"$group": {"_id": "$_id", **{field: {"$sum": f"${field}"} for field in SUM_FIELDS}}},
+        {
+            "$project": {
+                "_id": 0,
+                "year": "$_id.year",
+                "month": "$_id.month",
+                **{field: 1 for field in SUM_FIELDS},
+                "total_sales": {"$add": sales},
+                "total_cost": {"$add": costs},
+                "gross_profit": {"$subtract": [{"$add": sales}, {"$add": costs}]},
+                "refreshed_at": {"$literal": refreshed_at},
+            }
+        },
+        {
+            "$merge": {
+                "into": get_collection(MonthlyActuals).name,
+                "on": ["year", "month"],
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }
+        },
+    ]
+
+
+def get_touched_months(watermarks: dict) -> tuple[set[tuple[int, int]], dict]:
+    """
+    Finds the months of the documents inserted since the last refresh.
+
+    Args:
+        watermarks (dict): The last _id seen per source collection.
+
+    Returns:
+        tuple[set[tuple[int, int]], dict]: The (year, month) pairs touched, and the
+        watermarks to store once they are refreshed.
+    """
+    months = set()
+    new_watermarks = dict(watermarks)
+
+    for model in SOURCES:
+        collection = get_collection(model)
+        seen = watermarks.get(collection.name)
+        newer = {"_id": {"$gt": seen}} if seen is not None else {}
+
+        # bound the scan so documents inserted meanwhile are left for the next run
+        latest = collection.find_one(newer, {"_id": 1}, sort=[("_id", -1)])
+        if latest is None:
+            continue
+
+        pipeline = [
+            {"$match": {"_id": {**newer.get("_id", {}), "$lte": latest["_id"]}}},
+            {"$group": {"_id": month_key()}},
+        ]
+        months.update((doc["_id"]["year"], doc["_id"]["month"]) for doc in collection.aggregate(pipeline))
+        new_watermarks[collection.name] = latest["_id"]
+
+    return months, new_watermarks
+
+
+def refresh_monthly_actuals(full: bool = False) -> list[tuple[int, int]]:
+    """
+    Materializes the months touched since the last run (or every month).
+
+    Args:
+        full (bool): Rebuild every month instead of only the touched ones. Defaults to False.
+
+    Returns:
+        list[tuple[int, int]]: The (year, month) pairs refreshed.
+    """
+    state_collection = get_db()[STATE_COLLECTION]
+    state = state_collection.find_one({"_id": JOB_NAME}) or {}
+
+    months, watermarks = get_touched_months({} if full else state.get("watermarks", {}))
+    if not months and not full:
+        return []
+
+    # mongodb stores milliseconds, so the stored time must compare equal to this one
+    now = datetime.now(timezone.utc)
+    refreshed_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+    # $merge on (year, month) requires the unique index
+    MonthlyActuals.ensure_indexes()
+    get_collection(RestaurantSale).aggregate(build_pipeline(None if full else months, refreshed_at))
+
+    # refreshed months (or, for a full refresh, any month) left without sales or events
+    stale = {"refreshed_at": {"$ne": refreshed_at}}
+    if not full:
+        stale["$or"] = [{"year": year, "month": month} for year, month in months]
+    get_collection(MonthlyActuals).delete_many(stale)
+
+    state_collection.update_one(
+        {"_id": JOB_NAME},
+        {"$set": {"watermarks": watermarks, "refreshed_at": refreshed_at}},
+        upsert=True
+    )
+    return sorted(months)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Materialize monthly actuals into monthly_actuals.")
+    parser.add_argument("--full", action="store_true", help="rebuild every month")
+    parser.add_argument("--interval", type=float, default=0, help="refresh every N seconds instead of once")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    init_db()
+
+    full = args.full
+    last_full = None
+    while True:
+        started = time.perf_counter()
+        # a worker starts with a full rebuild, and repeats it before the months get too old
+        if args.interval > 0 and (last_full is None or started - last_full >= FULL_REFRESH_SECONDS):
+            full = True
+        try:
+            months = refresh_monthly_actuals(full)
+        except PyMongoError:
+            if args.interval <= 0:
+                raise
+            # keep the worker running, the next pass retries the same months
+            logger.exception("Monthly actuals refresh failed")
+        else:
+            elapsed = time.perf_counter() - started
+            print(f"refreshed {len(months)} months in {elapsed:.2f}s: {', '.join(f'{y}-{m:02d}' for y, m in months) or '-'}")
+            if full:
+                last_full = started
+            full = False
+
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,5 +9,17 @@ from . import dates
 # logging 
 from . import log_config
 
+# request tracing
+from . import tracing
+
+# database round-trip budgets
+from . import query_budget
+
+# query deadlines, retries and circuit breaker
+from . import resilience
+
 # shared decorators
-from . import decorators
\ No newline at end of file
+from . import decorators
+
+# page data caching
+from . import cache
\ No newline at end of file
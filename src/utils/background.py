@@ -0,0 +1,47 @@
+# disk-backed manager for Dash background callbacks
+#
+# heavy callbacks (background=True) run in a subprocess and are polled by the
+# browser, so they don't hold a gunicorn worker for their whole duration. Jobs
+# and results live in a local diskcache directory shared by every worker, so
+# no external broker is needed.
+#
+# configured with environment variables (defaults in brackets):
+#   BACKGROUND_CACHE_DIR          the shared job and result cache directory [<temp dir>/venueiq-background]
+#   BACKGROUND_RESULT_SECONDS     results are reused for the same inputs for this long [PAGE_CACHE_MAX_AGE_SECONDS]
+
+import os
+import tempfile
+import time
+
+from src.utils.cache import PAGE_CACHE_MAX_AGE_SECONDS
+from src.utils.resilience import get_env_number
+
+BACKGROUND_CACHE_DIR = os.getenv("BACKGROUND_CACHE_DIR", os.path.join(tempfile.gettempdir(), "venueiq-background"))
+BACKGROUND_RESULT_SECONDS = get_env_number("BACKGROUND_RESULT_SECONDS", PAGE_CACHE_MAX_AGE_SECONDS)
+
+
+def get_result_window() -> int:
+    """Returns the current result reuse window; results are keyed by it, so they expire with it."""
+    return int(time.time() // max(BACKGROUND_RESULT_SECONDS, 1))
+
+
+def make_background_callback_manager():
+    """
+    Creates the background callback manager for the app.
+
+    Results are cached by the callback inputs and the current result window, so
+    every worker reuses a result for up to BACKGROUND_RESULT_SECONDS.
+
+    Returns:
+        DiskcacheManager: The manager, backed by BACKGROUND_CACHE_DIR.
+    """
+    import diskcache
+    from dash import DiskcacheManager
+
+    cache = diskcache.Cache(BACKGROUND_CACHE_DIR)
+    return DiskcacheManager(
+        cache,
+        cache_by=[get_result_window],
+        # unused entries are removed once they can no longer be served
+        expire=max(BACKGROUND_RESULT_SECONDS, 1) * 2,
+    )
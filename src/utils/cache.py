@@ -0,0 +1,328 @@
+# stale-while-revalidate caching and single-flight request coalescing for dashboard page data
+#
+# configured with environment variables (defaults in brackets):
+#   PAGE_CACHE_MAX_AGE_SECONDS     results younger than this are served as is [60]
+#   PAGE_CACHE_MAX_STALE_SECONDS   older results up to this age are served while refreshing in the background [900]
+#   PAGE_CACHE_SIZE                number of results kept per page data function [64]
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional
+
+from src.utils.decorators import memoize_queries, track_query_failures
+from src.utils.query_budget import get_qualified_name, round_trip_budget
+from src.utils.resilience import get_env_number, make_query_key
+from src.utils.tracing import traced
+
+# create logger
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_MAX_AGE_SECONDS = get_env_number("PAGE_CACHE_MAX_AGE_SECONDS", 60)
+PAGE_CACHE_MAX_STALE_SECONDS = get_env_number("PAGE_CACHE_MAX_STALE_SECONDS", 900)
+PAGE_CACHE_SIZE = int(get_env_number("PAGE_CACHE_SIZE", 64))
+
+# per-function event counters (e.g. fresh_hits, coalesced), keyed by qualified function name
+cache_stats: dict[str, Counter] = defaultdict(Counter)
+cache_stats_lock = threading.Lock()
+
+
+def count_event(func: Callable, event: str) -> None:
+    """Increments an event counter for a cached function."""
+    with cache_stats_lock:
+        cache_stats[get_qualified_name(func)][event] += 1
+
+
+def get_cache_stats() -> dict[str, dict[str, int]]:
+    """
+    Returns a snapshot of the cache and coalescing counters of this worker.
+
+    Returns:
+        dict[str, dict[str, int]]: The event counts per function.
+    """
+    with cache_stats_lock:
+        return {name: dict(counts) for name, counts in cache_stats.items()}
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """A computed result and when it was computed (time.monotonic)."""
+    value: Any
+    computed_at: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.computed_at
+
+
+class PageCache:
+    """A bounded, thread-safe LRU of complete page data results."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.refreshing: set = set()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Returns the cached entry for a key, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores a freshly computed result, evicting the least recently used one."""
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = CacheEntry(value, time.monotonic())
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def start_refresh(self, key: Hashable) -> bool:
+        """Marks a key as refreshing. Returns False if a refresh is already running."""
+        with self.lock:
+            if key in self.refreshing:
+                return False
+            self.refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: Hashable) -> None:
+        """Clears the refreshing mark of a key."""
+        with self.lock:
+            self.refreshing.discard(key)
+
+    def clear(self) -> None:
+        """Removes all cached results."""
+        with self.lock:
+            self.entries.clear()
+
+
+# page caches by qualified function name, for readiness reporting
+page_caches: dict[str, PageCache] = {}
+
+
+def get_cache_status() -> dict[str, dict]:
+    """
+    Returns how warm each page cache of this worker is.
+
+    Returns:
+        dict[str, dict]: For each cached function, the number of entries and the
+        age in seconds of the most recently computed one (None if empty).
+    """
+    status = {}
+    for name, cache in page_caches.items():
+        with cache.lock:
+            ages = [entry.age for entry in cache.entries.values()]
+        status[name] = {
+            "entries": len(ages),
+            "newest_age_s": round(min(ages), 1) if ages else None,
+        }
+    return status
+
+
+def get_fresh_entry(func: Callable, *args: Any, **kwargs: Any) -> Optional[CacheEntry]:
+    """
+    Returns the cached result of a stale_while_revalidate function without computing it.
+
+    Args:
+        func (Callable): The cached function.
+        *args (Any): The positional arguments of the result.
+        **kwargs (Any): The keyword arguments of the result.
+
+    Returns:
+        Optional[CacheEntry]: The entry, or None if there is none younger than
+        PAGE_CACHE_MAX_AGE_SECONDS.
+    """
+    entry = func.cache.get(make_query_key(func, args, kwargs))
+    if entry is None or entry.age > PAGE_CACHE_MAX_AGE_SECONDS:
+        return None
+    return entry
+
+
+def compute_complete(func: Callable, args: tuple, kwargs: dict) -> tuple[Any, bool]:
+    """
+    Runs a page data function and reports whether all of its queries succeeded.
+
+    Args:
+        func (Callable): The page data function.
+        args (tuple): The positional arguments.
+        kwargs (dict): The keyword arguments.
+
+    Returns:
+        tuple[Any, bool]: The result, and True if no query fell back.
+    """
+    with track_query_failures() as failures:
+        value = func(*args, **kwargs)
+    if failures:
+        logger.warning(f"{func.__name__} is incomplete, failed queries: {', '.join(failures)}")
+    return value, not failures
+
+
+def stale_while_revalidate(
+    max_age: Optional[float] = None,
+    max_stale: Optional[float] = None,
+    max_size: Optional[int] = None
+) -> Callable:
+    """
+    A decorator to serve cached page data while refreshing it in the background.
+
+    - Results younger than max_age are returned as is.
+    - Results younger than max_stale are returned immediately, and a background
+      thread recomputes them for the next request.
+    - Otherwise the result is computed on the request thread.
+    - If the database fails during a computation (any query falls back, or the
+      function raises), the last complete result is returned instead, whatever
+      its age. Incomplete results are never cached.
+
+    Args:
+        max_age (float, optional): Seconds a result is served without refreshing.
+            Defaults to PAGE_CACHE_MAX_AGE_SECONDS.
+        max_stale (float, optional): Seconds a result may be served while it is refreshed.
+            Defaults to PAGE_CACHE_MAX_STALE_SECONDS.
+        max_size (int, optional): Number of results kept. Defaults to PAGE_CACHE_SIZE.
+
+    Returns:
+        Callable: A decorator that caches the results of a page data function.
+    """
+    max_age = PAGE_CACHE_MAX_AGE_SECONDS if max_age is None else max_age
+    max_stale = PAGE_CACHE_MAX_STALE_SECONDS if max_stale is None else max_stale
+
+    def decorator(func: Callable) -> Callable:
+        cache = PageCache(PAGE_CACHE_SIZE if max_size is None else max_size)
+        page_caches[get_qualified_name(func)] = cache
+
+        def refresh(key: Hashable, args: tuple, kwargs: dict) -> None:
+            # runs on a background thread, so errors can only be logged
+            try:
+                value, complete = compute_complete(func, args, kwargs)
+                if complete:
+                    cache.set(key, value)
+                count_event(func, "refreshes" if complete else "incomplete")
+            except Exception:
+                logger.error(f"Error refreshing {func.__name__} in the background", exc_info=True)
+            finally:
+                cache.end_refresh(key)
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = make_query_key(func, args, kwargs)
+            entry = cache.get(key)
+
+            if entry is not None and entry.age <= max_age:
+                count_event(func, "fresh_hits")
+                return entry.value
+
+            if entry is not None and entry.age <= max_stale:
+                count_event(func, "stale_hits")
+                if cache.start_refresh(key):
+                    threading.Thread(
+                        target=refresh,
+                        args=(key, args, kwargs),
+                        name=f"refresh-{func.__name__}",
+                        daemon=True
+                    ).start()
+                return entry.value
+
+            count_event(func, "misses")
+            try:
+                value, complete = compute_complete(func, args, kwargs)
+            except Exception:
+                if entry is None:
+                    raise
+                logger.error(f"Error in {func.__name__}, serving stale result", exc_info=True)
+                count_event(func, "stale_fallbacks")
+                return entry.value
+
+            if complete:
+                cache.set(key, value)
+                return value
+            count_event(func, "incomplete")
+            if entry is not None:
+                logger.warning(f"Serving stale {func.__name__} result ({entry.age:.0f}s old)")
+                count_event(func, "stale_fallbacks")
+                return entry.value
+            return value
+
+        # expose the cache, e.g. to clear it after importing data
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def single_flight(func: Callable) -> Callable:
+    """
+    A decorator to share one in-flight computation between identical concurrent calls.
+
+    The first call for a set of arguments runs the function; calls with the same
+    arguments that arrive while it runs wait for it and receive the same result
+    (or exception). Coalescing is per worker process.
+
+    Args:
+        func (Callable): The function to coalesce.
+
+    Returns:
+        Callable: The wrapped function.
+    """
+    in_flight: dict[Hashable, Future] = {}
+    lock = threading.Lock()
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = make_query_key(func, args, kwargs)
+
+        with lock:
+            future = in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = in_flight[key] = Future()
+
+        if not leader:
+            count_event(func, "coalesced")
+            return future.result()
+
+        count_event(func, "flights")
+        try:
+            value = func(*args, **kwargs)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with lock:
+                del in_flight[key]
+
+    return wrapper
+
+
+def page_data(name: str, budget: int, cached: bool = True) -> Callable:
+    """
+    A decorator for page data functions, applying the page decorators in their order.
+
+    From the outside in: a tracing span (metrics.<name>), single-flight coalescing
+    and the stale-while-revalidate cache (unless cached is False), the round-trip
+    budget, and query memoization, so the budget counts the memoized queries and
+    cache hits send none.
+
+    Args:
+        name (str): The function name used for the tracing span.
+        budget (int): The maximum number of MongoDB commands per computation.
+        cached (bool): Coalesce and cache the results. Defaults to True.
+
+    Returns:
+        Callable: A decorator that wraps a page data function.
+    """
+    def decorator(func: Callable) -> Callable:
+        wrapped = round_trip_budget(budget)(memoize_queries(func))
+        if cached:
+            wrapped = single_flight(stale_while_revalidate()(wrapped))
+        return traced(f"metrics.{name}")(wrapped)
+    return decorator
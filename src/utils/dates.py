@@ -1,11 +1,38 @@
 # date-related utility functions
+#
+# periods are calendar ranges (month, ytd, week, quarter, qtd, trailing twelve
+# months, custom) or 4-4-5 fiscal ranges. Every period kind has a period table
+# per year (its periods, keys and start/end dates), computed once, and a period
+# key that documents can be grouped on (e.g. yyyymm for months), so several
+# periods are computed from one scan instead of one scan per period.
 
-from datetime import datetime
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import logging
 
 # create logger
 logger = logging.getLogger(__name__)
 
+# fiscal years end on the last Saturday of December and are split into
+# quarters of 4, 4 and 5 week periods (the 53rd week of a long year is added
+# to the last period)
+FISCAL_YEAR_END_MONTH = 12
+FISCAL_YEAR_END_WEEKDAY = 5
+FISCAL_QUARTER_WEEKS = (4, 4, 5)
+
+# period kinds with a period table, and the kind of their tables' periods
+PERIOD_KINDS = ("month", "quarter", "week", "fiscal_period", "fiscal_quarter")
+
+
+@dataclass(frozen=True, slots=True)
+class Period:
+    """One period of a period table: its key and its start and end dates, end exclusive."""
+    key: int
+    start: datetime
+    end: datetime
+
 def monthly_date_range(month: int, year: int) -> tuple[datetime, datetime]:
     """
     Generates the start and end dates for a given year and month.
@@ -46,18 +73,38 @@ def ytd_date_range(month: int, year: int) -> tuple[datetime, datetime]:
     return start, end
 
 
-def get_period_range(period: str, month: int, year: int) -> tuple[datetime, datetime]:
+def get_period_range(
+    period: str,
+    month: int,
+    year: int,
+    week: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None
+) -> tuple[datetime, datetime]:
     """
-    Retrieves the start and end dates for a given period (monthly or ytd).
+    Retrieves the start and end dates for a given period.
+
+    Periods are:
+        - "monthly", "ytd": the month, or January through the month
+        - "quarterly", "qtd": the quarter containing the month, or the quarter through the month
+        - "t12m": the twelve months ending with the month
+        - "weekly": ISO week `week` of ISO year `year` (month is ignored)
+        - "custom": the given start and end dates
+        - "fiscal_monthly", "fiscal_quarterly", "fiscal_ytd": fiscal period `month` (1-12)
+          of fiscal year `year`, its fiscal quarter, or the fiscal year through it
 
     Args:
-        period (str): The period for which to retrieve the start and end dates. Can be "monthly" or "ytd".
-        month (int): The calendar month (1-12) for which to retrieve the start and end dates.
-        year (int): The calendar year for which to retrieve the start and end dates.
+        period (str): The period for which to retrieve the start and end dates.
+        month (int): The calendar month (1-12), or the fiscal period for fiscal periods.
+        year (int): The calendar year, or the ISO year or fiscal year for weekly and fiscal periods.
+        week (int | None): The ISO week (1-53) for weekly periods. Defaults to None.
+        start (datetime | None): The start date for custom periods. Defaults to None.
+        end (datetime | None): The end date (exclusive) for custom periods. Defaults to None.
 
     Returns:
         tuple[datetime, datetime]: A tuple containing the start and end dates for the given period, month and year.
-        Defaults to monthly if period is not "monthly" or "ytd".
+        Defaults to monthly if the period is not recognized, or its week is missing or invalid
+        for the year, or its dates are missing.
     """
     period = period.lower()
 
@@ -65,7 +112,368 @@ def get_period_range(period: str, month: int, year: int) -> tuple[datetime, date
         return monthly_date_range(month, year)
     elif period == "ytd":
         return ytd_date_range(month, year)
-    
-    logger.warning(f"Invalid period: {period}. Defaulting to monthly.")
+    elif period in ("quarterly", "qtd"):
+        quarter_start, _ = monthly_date_range(get_quarter(month) * 3 - 2, year)
+        _, quarter_end = monthly_date_range(get_quarter(month) * 3 if period == "quarterly" else month, year)
+        return quarter_start, quarter_end
+    elif period == "t12m":
+        _, period_end = monthly_date_range(month, year)
+        start_month, start_year = shift_month(month, year, -11)
+        return datetime(start_year, start_month, 1), period_end
+    # an ISO year has 52 or 53 weeks
+    elif period == "weekly" and week is not None and 1 <= week <= len(get_period_table("week", year)):
+        week_start = datetime.combine(date.fromisocalendar(year, week, 1), datetime.min.time())
+        return week_start, week_start + timedelta(weeks=1)
+    elif period == "custom" and start is not None and end is not None:
+        return start, end
+    elif period in ("fiscal_monthly", "fiscal_quarterly", "fiscal_ytd"):
+        return fiscal_date_range(period, month, year)
+
+    if period == "weekly":
+        logger.warning(f"Invalid week {week} of {year}. Defaulting to monthly.")
+    else:
+        logger.warning(f"Invalid period: {period}. Defaulting to monthly.")
+
+    return monthly_date_range(month, year)
+
+
+def get_quarter(month: int) -> int:
+    """Returns the quarter (1-4) of a calendar month or fiscal period (1-12)."""
+    return (month - 1) // 3 + 1
+
+
+def fiscal_date_range(period: str, fiscal_period: int, fiscal_year: int) -> tuple[datetime, datetime]:
+    """
+    Generates the start and end dates of a fiscal period, its quarter, or the fiscal year through it.
+
+    Args:
+        period (str): "fiscal_monthly", "fiscal_quarterly" or "fiscal_ytd".
+        fiscal_period (int): The fiscal period (1-12).
+        fiscal_year (int): The fiscal year.
+
+    Returns:
+        tuple[datetime, datetime]: The start and end dates, end exclusive.
+    """
+    periods = get_period_table("fiscal_period", fiscal_year)
+    if period == "fiscal_quarterly":
+        quarter = get_quarter(fiscal_period)
+        return periods[quarter * 3 - 3].start, periods[quarter * 3 - 1].end
+    if period == "fiscal_ytd":
+        return periods[0].start, periods[fiscal_period - 1].end
+    return periods[fiscal_period - 1].start, periods[fiscal_period - 1].end
+
+
+def get_fiscal_year_end(fiscal_year: int) -> datetime:
+    """Returns the last day of a fiscal year (the last FISCAL_YEAR_END_WEEKDAY of its end month)."""
+    _, month_end = monthly_date_range(FISCAL_YEAR_END_MONTH, fiscal_year)
+    last_day = month_end - timedelta(days=1)
+    return last_day - timedelta(days=(last_day.weekday() - FISCAL_YEAR_END_WEEKDAY) % 7)
+
+
+@lru_cache(maxsize=256)
+def get_period_table(kind: str, year: int) -> tuple[Period, ...]:
+    """
+    Computes the periods of one kind in a year.
+
+    Args:
+        kind (str): The period kind, one of PERIOD_KINDS.
+        year (int): The calendar year, or the ISO year for weeks and the fiscal year for fiscal kinds.
+
+    Returns:
+        tuple[Period, ...]: The year's periods in order, keyed as get_period_key() keys dates.
+
+    Raises:
+        ValueError: If the period kind is not recognized.
+    """
+    if kind == "month":
+        return tuple(Period(yyyymm(month, year), *monthly_date_range(month, year)) for month in range(1, 13))
+
+    if kind == "quarter":
+        months = get_period_table("month", year)
+        return tuple(
+            Period(year * 10 + quarter, months[quarter * 3 - 3].start, months[quarter * 3 - 1].end)
+            for quarter in range(1, 5)
+        )
+
+    if kind == "week":
+        weeks = date(year, 12, 28).isocalendar().week
+        first = datetime.combine(date.fromisocalendar(year, 1, 1), datetime.min.time())
+        return tuple(
+            Period(year * 100 + week, first + timedelta(weeks=week - 1), first + timedelta(weeks=week))
+            for week in range(1, weeks + 1)
+        )
+
+    if kind == "fiscal_period":
+        start = get_fiscal_year_end(year - 1) + timedelta(days=1)
+        end = get_fiscal_year_end(year) + timedelta(days=1)
+        period_weeks = list(FISCAL_QUARTER_WEEKS) * 4
+        # a 53 week year adds its extra week to the last period
+        period_weeks[-1] += (end - start).days // 7 - sum(period_weeks)
+
+        periods = []
+        for fiscal_period, weeks in enumerate(period_weeks, start=1):
+            period_end = start + timedelta(weeks=weeks)
+            periods.append(Period(year * 100 + fiscal_period, start, period_end))
+            start = period_end
+        return tuple(periods)
+
+    if kind == "fiscal_quarter":
+        periods = get_period_table("fiscal_period", year)
+        return tuple(
+            Period(year * 10 + quarter, periods[quarter * 3 - 3].start, periods[quarter * 3 - 1].end)
+            for quarter in range(1, 5)
+        )
+
+    raise ValueError(f"Invalid period kind: {kind}")
+
+
+def get_period_tables(kind: str, start_year: int, end_year: int) -> list[Period]:
+    """
+    Returns the periods of one kind in a range of years, in order.
+
+    Args:
+        kind (str): The period kind, one of PERIOD_KINDS.
+        start_year (int): The first year.
+        end_year (int): The last year (inclusive).
+
+    Returns:
+        list[Period]: The periods of every year in the range.
+    """
+    return [period for year in range(start_year, end_year + 1) for period in get_period_table(kind, year)]
+
+
+def get_period_key(value: date, kind: str) -> int:
+    """
+    Returns the key of the period of a kind a date falls in.
+
+    Keys are yyyymm for months, yyyyq for quarters, ISO yyyyww for weeks, and
+    the fiscal year's yyyypp and yyyyq for fiscal periods and quarters.
+
+    Args:
+        value (date): The date.
+        kind (str): The period kind, one of PERIOD_KINDS.
+
+    Returns:
+        int: The period key.
+    """
+    if kind == "month":
+        return yyyymm(value.month, value.year)
+    if kind == "quarter":
+        return value.year * 10 + get_quarter(value.month)
+    if kind == "week":
+        iso_year, iso_week, _ = value.isocalendar()
+        return iso_year * 100 + iso_week
+    if kind in ("fiscal_period", "fiscal_quarter"):
+        moment = value if isinstance(value, datetime) else datetime.combine(value, datetime.min.time())
+        # the fiscal year is the calendar year, or the next one after the fiscal year end
+        fiscal_year = value.year + 1 if moment >= get_fiscal_year_end(value.year) + timedelta(days=1) else value.year
+        periods = get_period_table(kind, fiscal_year)
+        return periods[bisect_right([period.start for period in periods], moment) - 1].key
+    raise ValueError(f"Invalid period kind: {kind}")
+
+
+def period_key_expression(kind: str, date_field: str, years: tuple[int, int] | None = None) -> dict:
+    """
+    Builds the aggregation expression computing get_period_key() on the server.
+
+    Calendar kinds are computed from the date. Fiscal kinds are looked up in the
+    period tables of the given years with $switch; for grouping, $bucket on
+    get_period_boundaries() is usually simpler.
+
+    Args:
+        kind (str): The period kind, one of PERIOD_KINDS.
+        date_field (str): The name of the document's date field.
+        years (tuple[int, int] | None): The first and last fiscal years, required for fiscal kinds.
+            Dates outside them have a null key. Defaults to None.
+
+    Returns:
+        dict: The expression evaluating to the document's period key.
+
+    Raises:
+        ValueError: If the period kind is not recognized, or fiscal years are missing.
+    """
+    field = f"${date_field}"
+    if kind == "month":
+        return date_parts_expression(date_field)["yyyymm"]
+    if kind == "quarter":
+        return {"$add": [
+            {"$multiply": [{"$year": field}, 10]},
+            {"$ceil": {"$divide": [{"$month": field}, 3]}}
+        ]}
+    if kind == "week":
+        return {"$add": [{"$multiply": [{"$isoWeekYear": field}, 100]}, {"$isoWeek": field}]}
+    if kind in ("fiscal_period", "fiscal_quarter") and years is not None:
+        periods = get_period_tables(kind, *years)
+        return {"$switch": {
+            "branches": [
+                {"case": {"$and": [{"$gte": [field, period.start]}, {"$lt": [field, period.end]}]}, "then": period.key}
+                for period in periods
+            ],
+            "default": None
+        }}
+    raise ValueError(f"Invalid period kind or missing fiscal years: {kind}")
+
 
-    return monthly_date_range(month, year)
\ No newline at end of file
+def get_period_boundaries(kind: str, start_year: int, end_year: int) -> tuple[list[datetime], dict[datetime, int]]:
+    """
+    Returns $bucket boundaries grouping dates into the periods of a range of years.
+
+    Args:
+        kind (str): The period kind, one of PERIOD_KINDS.
+        start_year (int): The first year.
+        end_year (int): The last year (inclusive).
+
+    Returns:
+        tuple[list[datetime], dict[datetime, int]]: The bucket boundaries (every period start
+        and the last period's end), and the period key of each bucket by its lower boundary,
+        which $bucket returns as the bucket _id.
+    """
+    periods = get_period_tables(kind, start_year, end_year)
+    return [period.start for period in periods] + [periods[-1].end], {period.start: period.key for period in periods}
+
+
+def get_date_parts(value: date) -> dict:
+    """
+    Computes the derived date fields stored on dated documents (sales, events).
+
+    The values match MongoDB's date operators, so documents written here and
+    documents backfilled with date_parts_expression() are identical.
+
+    Args:
+        value (date): The document date.
+
+    Returns:
+        dict: The year, month, ISO week-numbering year, ISO week, day of week
+        (1 = Sunday to 7 = Saturday, as $dayOfWeek) and yyyymm (e.g. 202506).
+    """
+    iso_year, iso_week, _ = value.isocalendar()
+    return {
+        "year": value.year,
+        "month": value.month,
+        "iso_year": iso_year,
+        "iso_week": iso_week,
+        "day_of_week": value.isoweekday() % 7 + 1,
+        "yyyymm": value.year * 100 + value.month,
+    }
+
+
+def date_parts_expression(date_field: str) -> dict:
+    """
+    Builds the aggregation expressions that compute get_date_parts() on the server.
+
+    Args:
+        date_field (str): The name of the document's date field.
+
+    Returns:
+        dict: A $set stage body computing the derived date fields from the date field.
+    """
+    field = f"${date_field}"
+    return {
+        "year": {"$year": field},
+        "month": {"$month": field},
+        "iso_year": {"$isoWeekYear": field},
+        "iso_week": {"$isoWeek": field},
+        "day_of_week": {"$dayOfWeek": field},
+        "yyyymm": {"$add": [{"$multiply": [{"$year": field}, 100]}, {"$month": field}]},
+    }
+
+
+def yyyymm(month: int, year: int) -> int:
+    """
+    Returns the yyyymm key of a month (e.g. 202506), as stored on dated documents.
+
+    Args:
+        month (int): The calendar month (1-12).
+        year (int): The calendar year.
+
+    Returns:
+        int: The yyyymm key.
+    """
+    return year * 100 + month
+
+
+def shift_month(month: int, year: int, months: int) -> tuple[int, int]:
+    """
+    Shifts a calendar month by a number of months, rolling over years.
+
+    Args:
+        month (int): The calendar month (1-12).
+        year (int): The calendar year.
+        months (int): The number of months to shift by, negative to shift back.
+
+    Returns:
+        tuple[int, int]: The shifted (month, year).
+    """
+    index = year * 12 + month - 1 + months
+    return index % 12 + 1, index // 12
+
+
+def get_comparison_range(
+    comparison: str | tuple[datetime, datetime],
+    period: str,
+    month: int,
+    year: int
+) -> tuple[datetime, datetime]:
+    """
+    Retrieves the date range of a comparison window for a period (monthly or ytd).
+
+    Comparisons are:
+        - "current": the period itself
+        - "previous_period": the period before it (the previous month, or the
+          prior year's YTD for a ytd period)
+        - "same_period_last_year": the same period of the prior year
+        - "trailing_<n>": the n months before the period (e.g. "trailing_3")
+        - a (start, end) tuple: a custom baseline, returned as is
+
+    Args:
+        comparison (str | tuple[datetime, datetime]): The comparison window.
+        period (str): The period compared. Can be "monthly" or "ytd".
+        month (int): The period's calendar month (1-12).
+        year (int): The period's calendar year.
+
+    Returns:
+        tuple[datetime, datetime]: The start and end dates of the comparison window, end exclusive.
+
+    Raises:
+        ValueError: If the comparison is not recognized.
+    """
+    if isinstance(comparison, tuple):
+        return comparison
+
+    if comparison == "current":
+        return get_period_range(period, month, year)
+    if comparison == "same_period_last_year" or (comparison == "previous_period" and period.lower() == "ytd"):
+        return get_period_range(period, month, year - 1)
+    if comparison == "previous_period":
+        return get_period_range(period, *shift_month(month, year, -1))
+    if comparison.startswith("trailing_") and comparison.removeprefix("trailing_").isdigit():
+        period_start, _ = get_period_range(period, month, year)
+        months = int(comparison.removeprefix("trailing_"))
+        start_month, start_year = shift_month(period_start.month, period_start.year, -months)
+        return datetime(start_year, start_month, 1), period_start
+
+    raise ValueError(f"Invalid comparison: {comparison}")
+
+
+def get_comparison_ranges(
+    comparisons: dict[str, str | tuple[datetime, datetime]],
+    period: str,
+    month: int,
+    year: int
+) -> dict[str, tuple[datetime, datetime]]:
+    """
+    Retrieves the date ranges of several named comparison windows of the same period.
+
+    Args:
+        comparisons (dict[str, str | tuple[datetime, datetime]]): The comparison of each window, by window name.
+        period (str): The period compared. Can be "monthly" or "ytd".
+        month (int): The period's calendar month (1-12).
+        year (int): The period's calendar year.
+
+    Returns:
+        dict[str, tuple[datetime, datetime]]: The start and end dates of each window, by window name.
+    """
+    return {
+        name: get_comparison_range(comparison, period, month, year)
+        for name, comparison in comparisons.items()
+    }
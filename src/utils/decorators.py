@@ -2,12 +2,151 @@
 
 # adapted from: https://community.plotly.com/t/error-handling-for-callbacks-and-layouts/83586
 
+import copy
+import inspect
 import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Any, Callable, Optional, Tuple
+from typing import Any, Callable, Hashable, Iterator, Optional, Tuple
+
+import pymongo
+
+from src.utils.resilience import (
+    QUERY_MAX_ATTEMPTS,
+    QUERY_TIMEOUT_SECONDS,
+    backoff_delay,
+    db_breaker,
+    is_retryable_error,
+    is_unhealthy_error,
+    last_good_values,
+    make_query_key,
+)
+from src.utils.tracing import current_span, span
 
 logger = logging.getLogger(__name__)
 
+# set while a safe_query function runs, so nested queries share the outer query's deadline
+inside_query: ContextVar[bool] = ContextVar("inside_query", default=False)
+
+# names of queries that fell back during the current tracked computation (see track_query_failures)
+query_failures: ContextVar[Optional[list]] = ContextVar("query_failures", default=None)
+
+
+def record_query_failure(name: str) -> None:
+    """Records that a query returned a fallback instead of a result, if failures are being tracked."""
+    failures = query_failures.get()
+    if failures is not None:
+        failures.append(name)
+
+    # flag the query's span, if it is being traced
+    query_span = current_span.get()
+    if query_span is not None:
+        query_span.error = True
+
+
+@contextmanager
+def track_query_failures() -> Iterator[list]:
+    """
+    Tracks the safe_query calls that fall back while the block runs.
+
+    Page data functions never raise on database errors, so callers that need
+    to know whether a result is complete (e.g. caches) check this list instead.
+
+    Yields:
+        list: The names of the queries that returned a fallback or a last good value.
+    """
+    token = query_failures.set([])
+    try:
+        yield query_failures.get()
+    finally:
+        query_failures.reset(token)
+
+class QueryMemo:
+    """The results of the safe_query calls made during one page computation."""
+    __slots__ = ("results", "calls", "eliminated")
+
+    def __init__(self):
+        self.results: dict[Hashable, Any] = {}
+        # calls per query function, and how many of them were answered from results
+        self.calls = Counter()
+        self.eliminated = Counter()
+
+
+# the memo of the page computation running in the current context (see memoize_queries)
+query_memo: ContextVar[Optional[QueryMemo]] = ContextVar("query_memo", default=None)
+
+# duplicate elimination counters per page function, for /stats/queries
+memo_stats: dict[str, Counter] = defaultdict(Counter)
+memo_stats_lock = threading.Lock()
+
+
+def memoize_queries(func: Callable) -> Callable:
+    """
+    A decorator to run every distinct safe_query call of a computation once.
+
+    While the decorated function runs, safe_query results are kept, keyed by
+    the query function and its normalized arguments, and identical calls
+    return a copy of the first result instead of querying again. Nested
+    decorated functions share the outermost memo.
+
+    Args:
+        func (Callable): The page data function.
+
+    Returns:
+        Callable: The function with request-scoped query memoization.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if query_memo.get() is not None:
+            return func(*args, **kwargs)
+
+        memo = QueryMemo()
+        token = query_memo.set(memo)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            query_memo.reset(token)
+            record_memo_stats(name, memo)
+    return wrapper
+
+
+def record_memo_stats(name: str, memo: QueryMemo) -> None:
+    """Adds one computation's query counts to the page's counters and logs its duplicates."""
+    calls = sum(memo.calls.values())
+    eliminated = sum(memo.eliminated.values())
+    with memo_stats_lock:
+        stats = memo_stats[name]
+        stats["computations"] += 1
+        stats["calls"] += calls
+        stats["executed"] += calls - eliminated
+        stats["eliminated"] += eliminated
+        for query_name, count in memo.eliminated.items():
+            stats[f"eliminated.{query_name}"] += count
+
+    if eliminated:
+        logger.debug(
+            f"{name}: {calls} query calls, {eliminated} duplicates eliminated: {dict(memo.eliminated)}"
+        )
+
+
+def get_memo_stats() -> dict[str, dict[str, int]]:
+    """
+    Returns a snapshot of the duplicate query elimination counters of this worker.
+
+    Returns:
+        dict[str, dict[str, int]]: For each page function, the number of computations,
+        query calls, calls executed and duplicate calls eliminated (in total and per query).
+    """
+    with memo_stats_lock:
+        return {name: dict(counts) for name, counts in memo_stats.items()}
+
+
 def safe_query(fallback: Optional[Any] = None) -> Callable:
     """
     A decorator to catch and log exceptions.
@@ -15,6 +154,13 @@ def safe_query(fallback: Optional[Any] = None) -> Callable:
     If an exception occurs, it logs the error and
     returns the fallback value if provided.
 
+    The outermost safe_query call of a request also bounds its database time:
+    the call runs under a deadline (sent to the server as maxTimeMS), transient
+    connection errors are retried with jittered backoff, and once the circuit
+    breaker opens, calls skip the database. When the database is unhealthy the
+    last good result of the same query is returned instead of the fallback, if
+    there is one. Nested calls leave database errors to the outer call.
+
     Args:
         fallback (Any, optional): The value to return if an exception occurs.
 
@@ -22,19 +168,95 @@ def safe_query(fallback: Optional[Any] = None) -> Callable:
         Callable: A decorator that catches and logs exceptions in a callback.
     """
     def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def get_memo_key(args: tuple, kwargs: dict) -> Hashable:
+            # the same call made with positional, keyword or default arguments gets the same key
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return make_query_key(func, args, kwargs)
+            bound.apply_defaults()
+            return make_query_key(func, (), bound.arguments)
+
+        def run_query(*args: Any, **kwargs: Any) -> Any:
+            if inside_query.get():
+                try:
+                    # execute the original function
+                    return func(*args, **kwargs)
+                # catch and log exceptions
+                except Exception as e:
+                    # let the outer query retry or record database failures
+                    if is_unhealthy_error(e):
+                        raise
+                    logger.error(
+                        f"Error in {func.__name__}: {e}",
+                        exc_info=True,
+                    )
+                    record_query_failure(func.__name__)
+                    # return the fallback value
+                    return fallback
+
+            key = make_query_key(func, args, kwargs)
+
+            # skip the database while the circuit breaker is open
+            if not db_breaker.allow_request():
+                logger.debug(f"DB circuit breaker open, skipping {func.__name__}")
+                record_query_failure(func.__name__)
+                return copy.deepcopy(last_good_values.get(key, fallback))
+
+            token = inside_query.set(True)
+            try:
+                for attempt in range(1, QUERY_MAX_ATTEMPTS + 1):
+                    try:
+                        # execute the original function within the query deadline
+                        with pymongo.timeout(QUERY_TIMEOUT_SECONDS):
+                            result = func(*args, **kwargs)
+                    # catch and log exceptions
+                    except Exception as e:
+                        if is_retryable_error(e) and attempt < QUERY_MAX_ATTEMPTS:
+                            logger.warning(f"Retrying {func.__name__} after transient error: {e}")
+                            time.sleep(backoff_delay(attempt))
+                            continue
+
+                        logger.error(
+                            f"Error in {func.__name__}: {e}",
+                            exc_info=True,
+                        )
+                        record_query_failure(func.__name__)
+                        if is_unhealthy_error(e):
+                            db_breaker.record_failure()
+                            # serve the last good value of this query if there is one
+                            return copy.deepcopy(last_good_values.get(key, fallback))
+
+                        db_breaker.release_trial()
+                        # return the fallback value
+                        return fallback
+
+                    db_breaker.record_success()
+                    last_good_values.set(key, result)
+                    return result
+            finally:
+                inside_query.reset(token)
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            try:
-                # execute the original function
-                return func(*args, **kwargs)
-            # catch and log exceptions
-            except Exception as e:
-                logger.error(
-                    f"Error in {func.__name__}: {e}",
-                    exc_info=True,
-                )
-                # return the fallback value
-                return fallback
+            memo = query_memo.get()
+            if memo is None:
+                with span(f"query.{func.__name__}"):
+                    return run_query(*args, **kwargs)
+
+            key = get_memo_key(args, kwargs)
+            memo.calls[func.__name__] += 1
+            if key in memo.results:
+                memo.eliminated[func.__name__] += 1
+                return copy.deepcopy(memo.results[key])
+
+            with span(f"query.{func.__name__}"):
+                result = run_query(*args, **kwargs)
+            # keep a copy, so a caller changing its result does not change later duplicates
+            memo.results[key] = copy.deepcopy(result)
+            return result
         return wrapper
     return decorator
 
@@ -56,20 +278,23 @@ def handle_callback_errors(fallback_outputs: Tuple[Any, ...]) -> Callable:
     def decorator(callback_func: Callable) -> Callable:
         @wraps(callback_func)
         def wrapper(*args: Any, **kwargs: Any) -> Tuple[Any, ...]:
-            try:
-                # execute the original callback function
-                return callback_func(*args, **kwargs)
-            # catch and log exceptions
-            except Exception as e:
-                callback_name = callback_func.__name__
-                logger.error(
-                    f"Error in Dash Callback: '{callback_name}'", 
-                    exc_info=True, 
-                    # include the inputs that triggered the failure
-                    extra={'inputs': args} 
-                )
-                
-                # return the predefined safe fallback outputs
-                return fallback_outputs
+            callback_name = callback_func.__name__
+            with span(f"callback.{callback_name}") as callback_span:
+                try:
+                    # execute the original callback function
+                    return callback_func(*args, **kwargs)
+                # catch and log exceptions
+                except Exception as e:
+                    if callback_span is not None:
+                        callback_span.error = True
+                    logger.error(
+                        f"Error in Dash Callback: '{callback_name}'", 
+                        exc_info=True, 
+                        # include the inputs that triggered the failure
+                        extra={'inputs': args} 
+                    )
+                    
+                    # return the predefined safe fallback outputs
+                    return fallback_outputs
         return wrapper
     return decorator
\ No newline at end of file
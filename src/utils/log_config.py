@@ -1,23 +1,145 @@
 # configure logging for the app
 # reference: https://docs.python.org/3/howto/logging.html
+# reference: https://docs.python.org/3/howto/logging-cookbook.html#dealing-with-handlers-that-block
+#
+# records are put on an in-memory queue by the calling thread and written to
+# stdout by a QueueListener thread, so log I/O and traceback formatting stay off
+# the request path. Configured with environment variables (defaults in brackets):
+#   LOG_FORMAT                       text or json [text]
+#   LOG_DUPLICATE_WINDOW_SECONDS     repeats of the same exception within this window are suppressed [60]
 
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
+from typing import Optional
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_DUPLICATE_WINDOW_SECONDS = float(os.getenv("LOG_DUPLICATE_WINDOW_SECONDS", "60"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# attributes every LogRecord has; anything else was passed with extra={...}
+STANDARD_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# the running queue listener (set by setup_logging)
+listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        # include fields passed with extra={...}
+        for key, value in vars(record).items():
+            if key not in STANDARD_RECORD_ATTRS:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class DeferredFormatQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that leaves traceback formatting to the listener thread.
+
+    The default QueueHandler formats the whole record, including the traceback,
+    on the calling thread before queueing it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge the message arguments now, they may change after the call returns
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class DuplicateExceptionFilter(logging.Filter):
+    """
+    Suppresses repeats of the same exception log within a time window.
+
+    The first occurrence is logged in full. Repeats within the window are
+    dropped and counted, and the count is added to the next occurrence that
+    is logged after the window.
+    """
+
+    def __init__(self, window_seconds: float):
+        super().__init__()
+        self.window_seconds = window_seconds
+        # key -> [time first logged in the current window, suppressed count]
+        self.seen: dict[tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not record.exc_info or self.window_seconds <= 0:
+            return True
+
+        error = record.exc_info[1]
+        key = (record.name, str(record.msg), type(error), str(error))
+        now = time.monotonic()
+
+        with self.lock:
+            state = self.seen.get(key)
+            if state is not None and now - state[0] < self.window_seconds:
+                state[1] += 1
+                return False
+
+            suppressed = state[1] if state else 0
+            self.seen[key] = [now, 0]
+            # keep the table bounded during long outages with many distinct errors
+            if len(self.seen) > 1000:
+                self.seen = {k: v for k, v in self.seen.items() if now - v[0] < self.window_seconds}
+
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} identical errors suppressed in the last {self.window_seconds:.0f}s)"
+        return True
+
 
 def setup_logging():
     """
     Configure logging for the app.
 
-    This function sets up logging to the standard output with a logging
-    level of INFO and a format of '%(asctime)s - %(name)s - %(levelname)s - %(message)s'.
+    This function routes all records through a queue to a background listener
+    that writes to the standard output with a logging level of INFO, either as
+    text in the format '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    or as JSON lines (LOG_FORMAT=json). Repeated exceptions are rate limited.
     """
-    logging.basicConfig(
-        stream=sys.stdout,
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-)
+    global listener
+    if listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT))
+
+    queue_handler = DeferredFormatQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(DuplicateExceptionFilter(LOG_DUPLICATE_WINDOW_SECONDS))
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(queue_handler)
+    root.setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    # flush queued records on shutdown
+    atexit.register(listener.stop)
 
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
     logging.getLogger('dash').setLevel(logging.WARNING)
-    logging.info("Logging initialized")
\ No newline at end of file
+    logging.info("Logging initialized")
@@ -0,0 +1,47 @@
+# per-callback response size counters
+#
+# the body of every Dash callback response is measured as sent (after
+# serialization), keyed by the callback's outputs, to find oversized figures
+# and tables
+
+import logging
+import threading
+from collections import Counter, defaultdict
+
+# create logger
+logger = logging.getLogger(__name__)
+
+# response counters (calls, bytes, max_bytes), keyed by callback output
+payload_stats: dict[str, Counter] = defaultdict(Counter)
+payload_stats_lock = threading.Lock()
+
+
+def record_payload(output: str, size: int) -> None:
+    """
+    Records the size of one callback response.
+
+    Args:
+        output (str): The callback's output id (e.g. "event-type-pie-chart.figure").
+        size (int): The response body size in bytes.
+    """
+    with payload_stats_lock:
+        stats = payload_stats[output]
+        stats["calls"] += 1
+        stats["bytes"] += size
+        stats["max_bytes"] = max(stats["max_bytes"], size)
+    logger.debug(f"Callback {output} sent {size} bytes")
+
+
+def get_payload_stats() -> dict[str, dict[str, int]]:
+    """
+    Returns a snapshot of the callback response sizes of this worker.
+
+    Returns:
+        dict[str, dict[str, int]]: The number of responses, total and average
+        bytes, and largest response per callback output, largest total first.
+    """
+    with payload_stats_lock:
+        snapshot = {output: dict(counts) for output, counts in payload_stats.items()}
+    for counts in snapshot.values():
+        counts["avg_bytes"] = counts["bytes"] // counts["calls"]
+    return dict(sorted(snapshot.items(), key=lambda item: item[1]["bytes"], reverse=True))
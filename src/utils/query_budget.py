@@ -0,0 +1,121 @@
+# per-page database round-trip budgets
+#
+# page data functions declare how many MongoDB commands one computation may
+# send. QUERY_BUDGET_MODE controls what happens at runtime:
+#   warn (default)   log a warning when a computation exceeds its budget
+#   off              do not count at runtime
+# `python -m src.tools.check_query_budgets` checks every budget against a database
+# and exits nonzero if one is exceeded.
+
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+from pymongo import monitoring
+
+# create logger
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn").lower()
+
+# commands sent during the current counted block, by command name
+round_trips: ContextVar[Optional[Counter]] = ContextVar("round_trips", default=None)
+
+# declared budgets, keyed by qualified function name
+declared_budgets: dict[str, int] = {}
+
+
+def get_qualified_name(func: Callable) -> str:
+    """Returns the module-qualified name of a function."""
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """
+    Counts MongoDB commands sent while a counted block runs on the current thread.
+
+    pymongo calls started on the thread that sends the command, so commands are
+    attributed to the request that sent them. Commands outside a counted block
+    (e.g. from server monitors) are ignored.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        counter = round_trips.get()
+        if counter is not None:
+            counter[event.command_name] += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+
+@contextmanager
+def count_round_trips() -> Iterator[Counter]:
+    """
+    Counts the MongoDB commands sent while the block runs.
+
+    Nested blocks count separately; commands in a nested block are also added
+    to the outer block when it ends.
+
+    Yields:
+        Counter: The number of commands sent, by command name.
+    """
+    outer = round_trips.get()
+    counter = Counter()
+    token = round_trips.set(counter)
+    try:
+        yield counter
+    finally:
+        round_trips.reset(token)
+        if outer is not None:
+            outer.update(counter)
+
+
+def round_trip_budget(budget: int) -> Callable:
+    """
+    A decorator to declare the maximum number of MongoDB commands a function may send.
+
+    In warn mode, every call that exceeds the budget logs a warning with the
+    commands it sent.
+
+    Args:
+        budget (int): The maximum number of commands per call.
+
+    Returns:
+        Callable: A decorator that records and checks the budget.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = get_qualified_name(func)
+        declared_budgets[name] = budget
+
+        if QUERY_BUDGET_MODE == "off":
+            return func
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with count_round_trips() as counter:
+                result = func(*args, **kwargs)
+            sent = sum(counter.values())
+            if sent > budget:
+                logger.warning(
+                    f"{func.__name__}{args} sent {sent} MongoDB commands, budget is {budget}: {dict(counter)}"
+                )
+            return result
+        return wrapper
+    return decorator
+
+
+def get_event_listeners() -> list[monitoring.CommandListener]:
+    """
+    Returns the pymongo command listeners to register when connecting.
+
+    Returns:
+        list[monitoring.CommandListener]: The round-trip counter.
+    """
+    return [RoundTripCounter()]
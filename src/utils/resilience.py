@@ -0,0 +1,215 @@
+# query deadlines, retry with backoff, circuit breaker and last-known-good values for database reads
+#
+# configured with environment variables (defaults in brackets):
+#   DB_QUERY_TIMEOUT_MS        deadline for one service query, including nested queries [2000]
+#   DB_QUERY_MAX_ATTEMPTS      attempts per service query for transient connection errors [2]
+#   DB_RETRY_BASE_DELAY_MS     base delay for jittered exponential backoff between attempts [50]
+#   DB_BREAKER_THRESHOLD       consecutive failed queries that open the circuit breaker [5]
+#   DB_BREAKER_RESET_SECONDS   seconds the breaker stays open before a trial query is allowed [30]
+#   DB_LAST_GOOD_CACHE_SIZE    number of last-known-good query results kept for fallbacks [1024]
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError
+
+# create logger
+logger = logging.getLogger(__name__)
+
+
+def get_env_number(name: str, default: float) -> float:
+    """
+    Reads a numeric setting from the environment.
+
+    Args:
+        name (str): The environment variable name.
+        default (float): The value to use if the variable is missing or invalid.
+
+    Returns:
+        float: The configured value, or the default.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Invalid value for {name}: '{value}', using default {default}")
+        return default
+
+
+QUERY_TIMEOUT_SECONDS = get_env_number("DB_QUERY_TIMEOUT_MS", 2000) / 1000
+QUERY_MAX_ATTEMPTS = max(1, int(get_env_number("DB_QUERY_MAX_ATTEMPTS", 2)))
+RETRY_BASE_DELAY_SECONDS = get_env_number("DB_RETRY_BASE_DELAY_MS", 50) / 1000
+# upper bound for a single backoff delay
+RETRY_MAX_DELAY_SECONDS = 1.0
+BREAKER_THRESHOLD = max(1, int(get_env_number("DB_BREAKER_THRESHOLD", 5)))
+BREAKER_RESET_SECONDS = get_env_number("DB_BREAKER_RESET_SECONDS", 30)
+LAST_GOOD_CACHE_SIZE = int(get_env_number("DB_LAST_GOOD_CACHE_SIZE", 1024))
+
+
+def is_unhealthy_error(error: Exception) -> bool:
+    """
+    Checks whether an error means the database is unreachable or too slow.
+
+    Query bugs (e.g. an invalid pipeline) are not counted against database health.
+
+    Args:
+        error (Exception): The error raised by a query.
+
+    Returns:
+        bool: True for connection failures and exceeded deadlines.
+    """
+    if isinstance(error, (ConnectionFailure, ExecutionTimeout)):
+        return True
+    return isinstance(error, PyMongoError) and error.timeout
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Checks whether a failed query is worth retrying.
+
+    Dropped connections and primary step-downs usually succeed on a second try.
+    Timeouts are not retried because the query's deadline is already spent.
+
+    Args:
+        error (Exception): The error raised by a query.
+
+    Returns:
+        bool: True for transient connection errors that are not timeouts.
+    """
+    return isinstance(error, ConnectionFailure) and not error.timeout
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Returns the delay before the next attempt, using exponential backoff with full jitter.
+
+    Args:
+        attempt (int): The number of the attempt that just failed, starting at 1.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Stops sending queries to the database once it is clearly unhealthy.
+
+    The breaker opens after a number of consecutive failed queries. While open,
+    queries are short-circuited to their fallbacks. After the reset timeout a
+    single trial query is let through: success closes the breaker, failure
+    opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Checks whether a query may be sent to the database.
+
+        Returns:
+            bool: True if the breaker is closed, or if this caller gets the trial query.
+        """
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                # let one trial query through, everything else keeps short-circuiting
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Records a successful query and closes the breaker."""
+        with self.lock:
+            if self.state != self.CLOSED:
+                logger.info("DB circuit breaker closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        """Records a failed query and opens the breaker once the threshold is reached."""
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"DB circuit breaker opened after {self.failures} failed queries")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Reopens the breaker if a trial query ended without a database result either way."""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class LastGoodCache:
+    """A bounded, thread-safe LRU of the most recent successful result per query."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.values: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the last good value for a query, or the default if there is none."""
+        with self.lock:
+            if key not in self.values:
+                return default
+            self.values.move_to_end(key)
+            return self.values[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores the latest good value for a query, evicting the least recently used one."""
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.values[key] = value
+            self.values.move_to_end(key)
+            if len(self.values) > self.max_size:
+                self.values.popitem(last=False)
+
+
+def make_query_key(func: Callable, args: tuple, kwargs: dict) -> Hashable:
+    """
+    Builds a cache key for a query from the function and its arguments.
+
+    Args:
+        func (Callable): The query function.
+        args (tuple): The positional arguments.
+        kwargs (dict): The keyword arguments.
+
+    Returns:
+        Hashable: A key identifying the query. Unhashable arguments (e.g. filter
+        dictionaries) are keyed by their repr.
+    """
+    key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return repr(key)
+
+
+# shared by all service queries, since they all use the same database
+db_breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_RESET_SECONDS)
+last_good_values = LastGoodCache(LAST_GOOD_CACHE_SIZE)
@@ -0,0 +1,296 @@
+# lightweight in-process tracing from Dash callbacks down to MongoDB commands
+#
+# tracing is off unless TRACE_DIR is set. Each finished root span (usually one
+# callback) is written to TRACE_DIR as one file:
+#   TRACE_FORMAT=chrome (default)  Chrome trace event JSON, opens in https://ui.perfetto.dev,
+#                                  chrome://tracing or speedscope as a flame chart
+#   TRACE_FORMAT=otlp              OTLP/JSON (ExportTraceServiceRequest), for OpenTelemetry tooling
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+from pymongo import monitoring
+
+# create logger
+logger = logging.getLogger(__name__)
+
+TRACE_DIR = os.getenv("TRACE_DIR")
+TRACE_FORMAT = os.getenv("TRACE_FORMAT", "chrome").lower()
+TRACING_ENABLED = bool(TRACE_DIR)
+
+# service name reported in exported traces
+SERVICE_NAME = "venueiq"
+
+
+@dataclass(slots=True)
+class Span:
+    """A timed operation within a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    thread_id: int = 0
+    error: bool = False
+    attributes: dict = field(default_factory=dict)
+    # finished spans of the whole trace, shared by every span in it
+    finished: list = field(default_factory=list, repr=False)
+
+
+# the innermost open span of the current request or thread
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def new_id(bits: int) -> str:
+    """Returns a random hex id with the given number of bits."""
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def start_span(name: str, parent: Optional[Span], attributes: Optional[dict] = None) -> Span:
+    """
+    Creates a span as a child of parent, or as the root of a new trace.
+
+    Args:
+        name (str): The span name.
+        parent (Optional[Span]): The parent span, or None to start a new trace.
+        attributes (dict, optional): Attributes to attach to the span.
+
+    Returns:
+        Span: The started span.
+    """
+    return Span(
+        name=name,
+        trace_id=parent.trace_id if parent else new_id(128),
+        span_id=new_id(64),
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        thread_id=threading.get_ident(),
+        attributes=attributes or {},
+        finished=parent.finished if parent else [],
+    )
+
+
+def end_span(span: Span, end_ns: Optional[int] = None) -> None:
+    """Finishes a span and exports its trace once the root span is finished."""
+    span.end_ns = end_ns or time.time_ns()
+    span.finished.append(span)
+    if span.parent_id is None:
+        export_queue.put(span.finished)
+
+
+@contextmanager
+def traced_span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Opens a span as the current span for the duration of the block."""
+    span = start_span(name, current_span.get(), attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException:
+        span.error = True
+        raise
+    finally:
+        current_span.reset(token)
+        end_span(span)
+
+
+def span(name: str, **attributes: Any):
+    """
+    Returns a context manager that traces the block as a span.
+
+    When tracing is disabled this is a no-op context manager that yields None.
+
+    Args:
+        name (str): The span name.
+        **attributes (Any): Attributes to attach to the span.
+
+    Returns:
+        A context manager yielding the Span, or None when tracing is disabled.
+    """
+    if not TRACING_ENABLED:
+        return nullcontext()
+    return traced_span(name, **attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    A decorator to trace every call of a function as a span.
+
+    Args:
+        name (str, optional): The span name. Defaults to the function's qualified name.
+
+    Returns:
+        Callable: A decorator that traces the function.
+    """
+    def decorator(func: Callable) -> Callable:
+        if not TRACING_ENABLED:
+            return func
+
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with traced_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracingCommandListener(monitoring.CommandListener):
+    """
+    Records every MongoDB command as a span under the current span.
+
+    pymongo calls started and succeeded/failed on the thread that runs the
+    command, so the current span of the request is available here.
+    """
+
+    def __init__(self):
+        self.open_spans: dict[tuple, Span] = {}
+        self.lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        parent = current_span.get()
+        if parent is None:
+            return
+        collection = event.command.get(event.command_name)
+        command_span = start_span(
+            f"mongo.{event.command_name}",
+            parent,
+            {
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.collection": collection if isinstance(collection, str) else None,
+            },
+        )
+        with self.lock:
+            self.open_spans[(event.connection_id, event.request_id)] = command_span
+
+    def finish(self, event: monitoring.CommandSucceededEvent | monitoring.CommandFailedEvent, error: bool) -> None:
+        with self.lock:
+            command_span = self.open_spans.pop((event.connection_id, event.request_id), None)
+        if command_span is None:
+            return
+        command_span.error = error
+        # use the driver's measured duration rather than listener call times
+        end_span(command_span, command_span.start_ns + event.duration_micros * 1000)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.finish(event, error=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.finish(event, error=True)
+
+
+def to_chrome_trace(spans: list[Span]) -> dict:
+    """Converts a trace to the Chrome trace event format (complete events, microseconds)."""
+    return {
+        "displayTimeUnit": "ms",
+        "traceEvents": [
+            {
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": span.thread_id,
+                "args": {**span.attributes, "error": span.error, "trace_id": span.trace_id},
+            }
+            for span in spans
+        ],
+    }
+
+
+def to_otlp_value(value: Any) -> dict:
+    """Converts an attribute value to an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp_trace(spans: list[Span]) -> dict:
+    """Converts a trace to OTLP/JSON (an ExportTraceServiceRequest)."""
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}],
+            },
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        # SPAN_KIND_CLIENT for database commands, SPAN_KIND_INTERNAL otherwise
+                        "kind": 3 if span.name.startswith("mongo.") else 1,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [
+                            {"key": key, "value": to_otlp_value(value)}
+                            for key, value in span.attributes.items() if value is not None
+                        ],
+                        # STATUS_CODE_ERROR or STATUS_CODE_UNSET
+                        "status": {"code": 2 if span.error else 0},
+                    }
+                    for span in spans
+                ],
+            }],
+        }],
+    }
+
+
+def write_trace(spans: list[Span]) -> None:
+    """Writes one finished trace to TRACE_DIR in the configured format."""
+    root = spans[-1]
+    payload = to_otlp_trace(spans) if TRACE_FORMAT == "otlp" else to_chrome_trace(spans)
+    timestamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(root.start_ns / 1e9))
+    safe_name = "".join(char if char.isalnum() or char in "-_" else "_" for char in root.name)
+    path = os.path.join(TRACE_DIR, f"{timestamp}-{safe_name}-{root.trace_id[:8]}.json")
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(payload, file)
+
+
+def export_traces() -> None:
+    """Writes finished traces off the request threads."""
+    while True:
+        spans = export_queue.get()
+        try:
+            write_trace(spans)
+        except Exception:
+            logger.error("Error writing trace file", exc_info=True)
+
+
+# finished traces waiting to be written
+export_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+if TRACING_ENABLED:
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    threading.Thread(target=export_traces, name="trace-exporter", daemon=True).start()
+    logger.info(f"Tracing enabled, writing {TRACE_FORMAT} traces to {TRACE_DIR}")
+
+
+def get_event_listeners() -> list[monitoring.CommandListener]:
+    """
+    Returns the pymongo command listeners to register when connecting.
+
+    Returns:
+        list[monitoring.CommandListener]: The tracing listener if tracing is enabled, else an empty list.
+    """
+    return [TracingCommandListener()] if TRACING_ENABLED else []
@@ -0,0 +1,30 @@
+# shared pytest fixtures
+#
+# tests run against an in-memory MongoDB (mongomock), so no server is needed:
+#   pip install pytest mongomock
+#   python -m pytest
+
+import mongomock
+import pytest
+from mongoengine import connect, disconnect
+
+from src.utils.cache import page_caches
+
+
+@pytest.fixture
+def db():
+    """Connects MongoEngine to an empty in-memory database for one test."""
+    disconnect()
+    connect("venueiq_test", mongo_client_class=mongomock.MongoClient)
+    yield
+    disconnect()
+
+
+@pytest.fixture
+def empty_page_caches():
+    """Clears every page cache before and after a test."""
+    for cache in page_caches.values():
+        cache.clear()
+    yield
+    for cache in page_caches.values():
+        cache.clear()
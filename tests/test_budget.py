@@ -0,0 +1,65 @@
+import pytest
+
+from src.models import Budget
+from src.models.budget import BUDGET_LINES
+
+
+@pytest.fixture(autouse=True)
+def running_sum_ytd(db, monkeypatch):
+    """Recomputes the YTD lines in Python, since mongomock has no $setWindowFields or $merge."""
+    def recompute_ytd(cls, year=None):
+        collection = cls._get_collection()
+        totals = {}
+        for doc in collection.find({} if year is None else {'year': year}, sort=[('year', 1), ('month', 1)]):
+            running = totals.setdefault(doc['year'], dict.fromkeys(BUDGET_LINES, 0.0))
+            for line in BUDGET_LINES:
+                running[line] += doc.get(line, 0.0)
+            collection.update_one({'_id': doc['_id']}, {'$set': {f'ytd_{line}': running[line] for line in BUDGET_LINES}})
+
+    monkeypatch.setattr(Budget, 'recompute_ytd', classmethod(recompute_ytd))
+
+
+def insert_months(year: int, food_sales: list[float]) -> None:
+    Budget.objects.insert([
+        Budget(month=month, year=year, food_sales=sales)
+        for month, sales in enumerate(food_sales, start=1)
+    ])
+
+
+def get_ytd_food_sales(year: int) -> list[float]:
+    return [budget.ytd_food_sales for budget in Budget.objects(year=year).order_by('month')]
+
+
+def test_bulk_insert_computes_totals_and_ytd():
+    insert_months(2025, [100.0, 200.0, 300.0])
+
+    assert get_ytd_food_sales(2025) == [100.0, 300.0, 600.0]
+    assert Budget.objects.get(year=2025, month=3).ytd_total_sales == 600.0
+
+
+def test_bulk_delete_recomputes_ytd():
+    insert_months(2025, [100.0, 200.0, 300.0])
+    insert_months(2024, [10.0, 20.0])
+
+    Budget.objects(year=2025, month__lte=1).delete()
+
+    assert get_ytd_food_sales(2025) == [200.0, 500.0]
+    assert get_ytd_food_sales(2024) == [10.0, 30.0]
+
+
+def test_document_delete_recomputes_ytd():
+    insert_months(2025, [100.0, 200.0, 300.0])
+
+    Budget.objects.get(year=2025, month=2).delete()
+
+    assert get_ytd_food_sales(2025) == [100.0, 400.0]
+
+
+def test_modify_moving_a_month_recomputes_both_years():
+    insert_months(2025, [100.0, 200.0])
+    insert_months(2026, [50.0])
+
+    Budget.objects(year=2025, month=2).modify(set__year=2026, set__month=2)
+
+    assert get_ytd_food_sales(2025) == [100.0]
+    assert get_ytd_food_sales(2026) == [50.0, 250.0]
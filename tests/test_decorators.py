@@ -0,0 +1,54 @@
+from src.utils.decorators import get_memo_stats, memoize_queries, safe_query
+
+# arguments each query function below was executed with
+executed = []
+
+
+@safe_query(fallback=[])
+def get_items(month: int, year: int, limit: int = 5) -> list[dict]:
+    executed.append((month, year, limit))
+    return [{"month": month, "year": year, "rank": rank} for rank in range(limit)]
+
+
+def test_identical_queries_run_once_per_computation():
+    executed.clear()
+
+    @memoize_queries
+    def get_page(month: int, year: int) -> tuple:
+        # the same query, with positional, keyword and default arguments
+        return get_items(month, year), get_items(month=month, year=year, limit=5), get_items(month, year, 3)
+
+    first, duplicate, other = get_page(6, 2025)
+
+    assert executed == [(6, 2025, 5), (6, 2025, 3)]
+    assert duplicate == first and len(other) == 3
+    stats = get_memo_stats()[f"{get_page.__module__}.{get_page.__qualname__}"]
+    assert (stats["calls"], stats["executed"], stats["eliminated"]) == (3, 2, 1)
+    assert stats["eliminated.get_items"] == 1
+
+
+def test_memo_is_scoped_to_one_computation():
+    executed.clear()
+
+    @memoize_queries
+    def get_page(month: int, year: int) -> list[dict]:
+        return get_items(month, year)
+
+    get_page(6, 2025)
+    get_page(6, 2025)
+
+    assert executed == [(6, 2025, 5), (6, 2025, 5)]
+
+
+def test_changing_a_result_does_not_change_its_duplicates():
+    @memoize_queries
+    def get_page(month: int, year: int) -> tuple:
+        first = get_items(month, year)
+        first[0]["rank"] = 99
+        first.append({"month": 0})
+        return first, get_items(month, year), get_items(month, year)
+
+    first, second, third = get_page(6, 2025)
+
+    assert second == third == [{"month": 6, "year": 2025, "rank": rank} for rank in range(5)]
+    assert second is not third
@@ -0,0 +1,20 @@
+from dataclasses import asdict
+
+from src.metrics.metric_types import (
+    CostBlock, MtdYtd, ProfitBlock, RevenueBlock, StatementMetrics, StatementScenario
+)
+
+
+def make_scenario(scale: float) -> StatementScenario:
+    return StatementScenario(
+        revenue=MtdYtd(RevenueBlock(1.0 * scale, 2.0 * scale, 3.0 * scale), RevenueBlock(4.0 * scale, 5.0 * scale, 9.0 * scale)),
+        cost=MtdYtd(CostBlock(0.5 * scale, 1.0 * scale, 1.5 * scale, 50.0, None), CostBlock()),
+        profit=MtdYtd(ProfitBlock(1.5 * scale), ProfitBlock(7.5 * scale)),
+    )
+
+
+def test_statement_metrics_to_dict_matches_asdict():
+    metrics = StatementMetrics(make_scenario(1), make_scenario(2), make_scenario(0.5))
+
+    assert metrics.to_dict() == asdict(metrics)
+    assert metrics.to_dict()["budgeted"]["cost"]["mtd"]["beverage_cost_pct"] is None
@@ -0,0 +1,59 @@
+import pytest
+from dash import Dash, html
+
+from src.callbacks.restaurant.statement_callbacks import get_restaurant_statement_callbacks
+from src.utils import background
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    """Records the background jobs the statement app starts and terminates, without forking them."""
+    monkeypatch.setattr(background, "BACKGROUND_CACHE_DIR", str(tmp_path))
+    manager = background.make_background_callback_manager()
+
+    started, terminated = [], []
+
+    def call_job_fn(key, job_fn, args, context):
+        started.append(args)
+        return str(len(started))
+
+    monkeypatch.setattr(manager, "call_job_fn", call_job_fn)
+    monkeypatch.setattr(manager, "terminate_job", terminated.append)
+
+    app = Dash(__name__, background_callback_manager=manager, suppress_callback_exceptions=True)
+    app.layout = html.Div()
+    get_restaurant_statement_callbacks(app)
+    return app.server.test_client(), started, terminated
+
+
+def change_year(client, year: int, running_job: str | None = None) -> dict:
+    """Posts a year-dropdown change the way the browser does, naming the job still running."""
+    query = f"?oldJob={running_job}" if running_job else ""
+    response = client.post(f"/_dash-update-component{query}", json={
+        "output": "restaurant-statement-store.data",
+        "outputs": {"id": "restaurant-statement-store", "property": "data"},
+        "inputs": [{"id": "year-dropdown", "property": "value", "value": year}],
+        "changedPropIds": ["year-dropdown.value"],
+        "state": [],
+    })
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_year_change_cancels_the_running_job(jobs):
+    client, started, terminated = jobs
+
+    first = change_year(client, 2024)
+    second = change_year(client, 2025, running_job=first["job"])
+
+    assert started == [[2024], [2025]]
+    assert terminated == [first["job"]]
+    assert second["job"] != first["job"]
+
+
+def test_leaving_the_page_cancels_the_job(jobs):
+    client, _, _ = jobs
+
+    job = change_year(client, 2025)
+
+    assert job["cancel"] == [{"id": "_pages_location", "property": "pathname"}]
@@ -0,0 +1,15 @@
+import src.callbacks.register_callbacks  # noqa: F401 (registers every page cache the app uses)
+from src.metrics.warmup import WARMED_CACHE_NAMES, warm_page_caches
+from src.utils.cache import get_cache_status, page_caches
+
+
+def test_warm_page_caches_fills_every_warmed_cache(db, empty_page_caches):
+    warm_page_caches(6, 2025)
+
+    status = get_cache_status()
+    assert {name: status[name]["entries"] for name in WARMED_CACHE_NAMES} == dict.fromkeys(WARMED_CACHE_NAMES, 1)
+
+
+def test_every_page_cache_is_warmed():
+    # readiness only waits for the warmed caches, so any other cache would start cold
+    assert set(page_caches) <= WARMED_CACHE_NAMES